@@ -0,0 +1,102 @@
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from domain.DomainData import DomainData
+from domain.TranslatorAPIProlog import TranslatorAPIProlog
+
+# Benchmark of the Prolog translation (TranslatorAPIProlog.writeProgram) with 1 to N worker processes.
+# Usage: python benchmark_prolog.py [file.gbs] [--tops 64] [--fanout 4] [--depth 4] [--relationships 200]
+#                                   [--references 200] [--workers 1 2 4 8] [--repeat 3]
+# Without a .gbs file a synthetic domain is generated with the given sizes.
+
+
+def writeSyntheticDomain(path: str, tops: int, fanout: int, depth: int, relationships: int, references: int) -> None:
+    """Writes a .gbs file with tops entity trees of the given fanout and depth, and the given references."""
+    random.seed(1)
+    names = []
+    lines = ['<?xml version="1.0"?>', '<domain name="benchmark">', '\t<entities>']
+
+    def emit(name: str, level: int) -> None:
+        names.append(name)
+        indent = "\t" * (level + 2)
+        lines.append(f'{indent}<entity name="{name}">')
+        for k in range(3):
+            lines.append(f'{indent}\t<attribute name="{name}a{k}" datatype="string" mandatory="{str(k == 0).lower()}"/>')
+        if level < depth:
+            for c in range(fanout):
+                emit(f"{name}_{c}", level + 1)
+        lines.append(f'{indent}</entity>')
+
+    for t in range(tops):
+        emit(f"E{t}", 0)
+    lines.append('\t</entities>')
+    lines.append('\t<relationships>')
+    for r in range(relationships):
+        lines.append(f'\t\t<relationship name="r{r}" inverse="inv{r}">')
+        for _ in range(references):
+            lines.append(f'\t\t\t<reference subject="{random.choice(names)}" object="{random.choice(names)}"/>')
+        lines.append('\t\t</relationship>')
+    lines.append('\t</relationships>')
+    lines.append('</domain>')
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times the Prolog translation of a domain with 1 to N processes.")
+    parser.add_argument("gbs", nargs="?", help="The .gbs file to translate (default: a synthetic domain)")
+    parser.add_argument("--tops", type=int, default=64, help="Top-level entities of the synthetic domain")
+    parser.add_argument("--fanout", type=int, default=4, help="Children of each entity of the synthetic domain")
+    parser.add_argument("--depth", type=int, default=4, help="Depth of the entity trees of the synthetic domain")
+    parser.add_argument("--relationships", type=int, default=200, help="Relationships of the synthetic domain")
+    parser.add_argument("--references", type=int, default=200, help="References of each synthetic relationship")
+    parser.add_argument("--workers", type=int, nargs="+", help="Process counts to time (default: 1, 2, 4, ... up to the CPUs)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per process count, the best one is reported")
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()): # The loader reports every entity it creates
+        if args.gbs:
+            domain_data = DomainData(args.gbs)
+        else:
+            with tempfile.TemporaryDirectory() as folder:
+                path = os.path.join(folder, "benchmark.gbs")
+                writeSyntheticDomain(path, args.tops, args.fanout, args.depth, args.relationships, args.references)
+                domain_data = DomainData(path)
+
+    workers = args.workers
+    if not workers:
+        cpus = os.cpu_count() or 1
+        workers = [1]
+        while workers[-1] * 2 <= cpus:
+            workers.append(workers[-1] * 2)
+        if workers[-1] != cpus:
+            workers.append(cpus)
+
+    print(f"Domain: {domain_data.getDomain()}, {len(domain_data.getAllEntities())} entities, "
+          f"{len(domain_data.getAllRelationships())} relationships, {os.cpu_count()} CPUs")
+    expected = None
+    serial = None
+    for n in workers:
+        best = None
+        for _ in range(args.repeat):
+            out = io.StringIO()
+            start = time.perf_counter()
+            facts = TranslatorAPIProlog.writeProgram(domain_data, out, workers=n)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+            if expected is None:
+                expected = out.getvalue()
+            elif out.getvalue() != expected:
+                print(f"Error: the output with {n} processes differs from the serial one", file=sys.stderr)
+                sys.exit(1)
+        serial = serial or best
+        print(f"{n:3d} process(es): {best:8.3f}s  {facts} facts  speedup {serial / best:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
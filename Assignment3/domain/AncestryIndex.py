@@ -0,0 +1,77 @@
+from __future__ import annotations
+from bisect import bisect_right
+from typing import Dict, List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Entity import Entity
+    from .SymbolTable import SymbolTable
+
+
+class AncestryIndex:
+    """
+    Pre-order interval numbering of an entity tree, kept by the root of the tree (see Entity.getAncestryIndex).
+    Each entity gets its pre-order number (preOrder) and the number of the last entity of its subtree
+    (lastDescendant), so Y is a descendant of X exactly when X.preOrder < Y.preOrder <= X.lastDescendant.
+    The index is dropped by any structural change of the tree (addChild, removeChild, setChildren, setName)
+    and rebuilt the next time it is needed.
+    """
+
+    def __init__(self, root: Entity):
+        """
+        Numbers the tree of root.
+
+        Args:
+            root: The root of the tree.
+        """
+        self.symbols: SymbolTable = root.symbolTable()
+        self.byName: Dict[int, List[int]] = {} # Name ID -> pre-order numbers, ascending
+        counter = 0
+        stack = [(root, False)]
+        while stack:
+            e, visited = stack.pop()
+            if visited:
+                e.lastDescendant = counter - 1
+                continue
+            e.preOrder = counter
+            self.byName.setdefault(e.getNameId(self.symbols), []).append(counter)
+            counter += 1
+            stack.append((e, True))
+            stack.extend((child, False) for child in reversed(e.children))
+        self.size: int = counter
+
+    def isDescendant(self, entity: Entity, ancestor: Entity) -> bool:
+        """
+        Checks if entity is a proper descendant of ancestor. Both must belong to the indexed tree.
+
+        Args:
+            entity: The candidate descendant.
+            ancestor: The candidate ancestor.
+
+        Returns:
+            bool: True if entity is in the subtree of ancestor (and is not ancestor itself).
+        """
+        return ancestor.preOrder < entity.preOrder <= ancestor.lastDescendant
+
+    def numbersNamed(self, name: str) -> List[int]:
+        """Gets the pre-order numbers of the entities with the given name (case-insensitive), ascending."""
+        nameId = self.symbols.lookup(name)
+        return self.byName.get(nameId, []) if nameId is not None else []
+
+    def hasDescendantNamed(self, ancestor: Entity, name: str) -> bool:
+        """
+        Checks if an entity with the given name (case-insensitive) is a proper descendant of ancestor,
+        like DomainData.findInTree(ancestor, name) is not None.
+
+        Args:
+            ancestor: The entity whose subtree is checked. It must belong to the indexed tree.
+            name: The name to look for.
+
+        Returns:
+            bool: True if such a descendant exists.
+        """
+        numbers = self.numbersNamed(name)
+        if not numbers:
+            return False
+        # First entity with that name after the ancestor in pre-order: inside the subtree iff <= lastDescendant
+        i = bisect_right(numbers, ancestor.preOrder)
+        return i < len(numbers) and numbers[i] <= ancestor.lastDescendant
@@ -1,7 +1,10 @@
 from .Tag import Tag
 from .TreeNode import TreeNode
 from copy import copy
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    from .Entity import Entity
 
 class Attribute(Tag):
     """
@@ -9,6 +12,8 @@ class Attribute(Tag):
     An attribute can have various properties such as mandatory, distinguishing, display, data type, and values.
     """
 
+    owner: Optional['Entity'] = None  # Entity that last added this attribute to its direct ones (see changed)
+
     def __init__(self, name: str | None = None, data_type: str | None = None,
                  mandatory: bool | str | None = None, distinguishing: bool = False,
                  display: bool = False, values: List[str] | TreeNode | None = None):
@@ -91,6 +96,7 @@ class Attribute(Tag):
             mandatory: True if the attribute is mandatory, False otherwise.
         """
         self.mandatory = mandatory
+        self.changed()
 
     def isDistinguishing(self) -> bool:
         """
@@ -109,6 +115,7 @@ class Attribute(Tag):
             distinguishing: True if the attribute is distinguishing, False otherwise.
         """
         self.distinguishing = distinguishing
+        self.changed()
 
     def getDataType(self) -> Optional[str]:
         """
@@ -127,6 +134,7 @@ class Attribute(Tag):
             dataType: The data type of the attribute.
         """
         self.data_type = dataType
+        self.changed()
     
     def setTarget(self, target: str) -> None:
         """
@@ -136,6 +144,7 @@ class Attribute(Tag):
             target: The target of the attribute.
         """
         self._target = target
+        self.changed()
     
     def getValues(self) -> List[str]:
         """
@@ -163,12 +172,14 @@ class Attribute(Tag):
             values: The values of the attribute.
         """
         self.values = values
+        self.changed()
 
     def removeValues(self) -> None:
         """
         Removes all values from the attribute.
         """
         self.values = []
+        self.changed()
 
     def setValuesString(self, values: List[str]) -> None:
         """
@@ -187,6 +198,7 @@ class Attribute(Tag):
             value: The value to add.
         """
         self.values.append(value)
+        self.changed()
 
     def removeValue(self, value: str) -> None:
         """
@@ -196,6 +208,7 @@ class Attribute(Tag):
             value: The value to remove.
         """
         self.values.remove(value)
+        self.changed()
 
     def getSubClasses(self) -> Optional[TreeNode]:
         """
@@ -214,6 +227,7 @@ class Attribute(Tag):
             sub_classes: The sub-classes of the attribute.
         """
         self._sub_classes = sub_classes
+        self.changed()
 
     def isDisplay(self) -> bool:
         """
@@ -232,6 +246,7 @@ class Attribute(Tag):
             display: True if the attribute is displayable, False otherwise.
         """
         self.display = display
+        self.changed()
 
     def getDisplay(self) -> bool:
         """
@@ -268,6 +283,7 @@ class Attribute(Tag):
             sub_classes_select: The sub-classes select of the attribute.
         """
         self._sub_classes_select = sub_classes_select
+        self.changed()
 
     def getValuesToString(self) -> Optional[str]:
         """
@@ -281,6 +297,15 @@ class Attribute(Tag):
     def __str__(self) -> str:
         return self.name
 
+    def changed(self) -> None:
+        """
+        Records an in-place change of this attribute: the attributes version of the owner's tree is bumped,
+        so the caches derived from the attributes of the tree (getAllAttributes, DomainData.getEntityShape)
+        are rebuilt. The owner is set by the entity methods adding attributes.
+        """
+        if self.owner is not None:
+            self.owner.attributesChanged()
+
     def clone(self) -> 'Attribute':
         """
         Creates a shallow copy of the Attribute object.
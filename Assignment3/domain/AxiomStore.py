@@ -0,0 +1,182 @@
+from __future__ import annotations
+import re
+from collections.abc import MutableSet
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .Axiom import Axiom
+from .DatalogEngine import DatalogEngine, Var
+
+Dependencies = Tuple[FrozenSet[str], FrozenSet[str], bool] # (names mentioned, predicates defined, reads every element)
+
+
+class AxiomStore(MutableSet):
+    """
+    The axioms of a domain (Java: HashSet<Axiom>): like the set it replaces, an axiom is identified by
+    its name only. Axioms are stored in dictionaries by name and by domain, so finding the one with
+    a given name or the ones of a domain doesn't scan the store.
+
+    The store also indexes the axioms by the names they mention (see dependencies), so that after an
+    edit of some entities or relationships only the axioms that may read them are checked again (see
+    affected and DomainData.checkAxioms). The index is built on first use and rebuilt after add or
+    discard; an axiom whose expression is changed in place must be discarded and added again.
+    add and discard also bump version, which the caches of DomainData built from the axioms depend on.
+    """
+
+    IDENTIFIER = re.compile(r"[^\W\d]\w*")
+
+    def __init__(self, axioms: Iterable[Axiom] = ()):
+        """
+        Initializes the store with the given axioms.
+
+        Args:
+            axioms: The axioms to add; of axioms with the same name, the first one is kept, like in a set.
+        """
+        self.byName: Dict[str, Axiom] = {}
+        self.byDomain: Dict[str, Dict[str, Axiom]] = {} # Domain -> name -> axiom
+        self.mentions: Optional[Dict[str, Set[str]]] = None # Lowercase name -> axioms mentioning it, None if stale
+        self.definitions: Dict[str, Set[str]] = {} # Lowercase predicate -> axioms with rules deriving it
+        self.wildcards: Set[str] = set() # Axioms reading the facts of every entity or relationship
+        self.mentioned: Dict[str, FrozenSet[str]] = {} # Axiom -> lowercase names it mentions
+        self.heads: Dict[str, FrozenSet[str]] = {} # Axiom -> lowercase predicates it derives
+        self.version: int = 0 # Bumped by every change of the axioms
+        for axiom in axioms:
+            self.add(axiom)
+
+    def __contains__(self, axiom: object) -> bool:
+        return isinstance(axiom, Axiom) and axiom.getName() in self.byName
+
+    def __iter__(self) -> Iterator[Axiom]:
+        return iter(self.byName.values())
+
+    def __len__(self) -> int:
+        return len(self.byName)
+
+    def add(self, axiom: Axiom) -> None:
+        """Adds an axiom, unless the store has one with the same name."""
+        if axiom.getName() in self.byName:
+            return
+        self.byName[axiom.getName()] = axiom
+        self.byDomain.setdefault(axiom.domain, {})[axiom.getName()] = axiom # getDomain reads DomainTag's field
+        self.mentions = None
+        self.version += 1
+
+    def discard(self, axiom: Axiom) -> None:
+        """Removes the axiom with the name of the given one, if any."""
+        stored = self.byName.pop(axiom.getName(), None)
+        if stored is None:
+            return
+        inDomain = self.byDomain.get(stored.domain, {})
+        inDomain.pop(stored.getName(), None)
+        if not inDomain:
+            self.byDomain.pop(stored.domain, None)
+        self.mentions = None
+        self.version += 1
+
+    def get(self, name: str) -> Optional[Axiom]:
+        """Gets the axiom with the given name, or None."""
+        return self.byName.get(name)
+
+    def forDomain(self, domain: str) -> List[Axiom]:
+        """Gets the axioms of a domain, in the order they were added."""
+        return list(self.byDomain.get(domain, {}).values())
+
+    @classmethod
+    def dependencies(cls, axiom: Axiom) -> Dependencies:
+        """
+        Gets what an axiom depends on. For an axiom compiled by DatalogEngine: the predicates of its atoms
+        and the constants of their arguments, the predicates of its heads, and whether an atom reads a
+        predicate of the translation (entity/2, relationship/4, ...) with a variable for the element its
+        facts belong to (TranslatorAPIProlog.ownerPosition), so an edit of any element may change its result.
+        E.g. attribute(D, person, A, T) only reads the facts of person, while parent(D, agent, C) reads those
+        of every child of agent, so it makes the axiom read every element. The derived tables (ancestor/3,
+        ...) depend on other elements than their owner: a variable anywhere makes the axiom read every element.
+        For other formalisms, every identifier of the expression.
+
+        Returns:
+            Dependencies: (lowercase names mentioned, lowercase predicates derived, reads every element).
+        """
+        from .TranslatorAPIProlog import TranslatorAPIProlog # Imports DomainData, which imports this module
+        expression = axiom.getExpression() or ""
+        try:
+            clauses = DatalogEngine.compileAxiom(axiom) if DatalogEngine.isCompiled(axiom) else None
+        except ValueError:
+            clauses = None # Reported when the axiom is compiled for a check
+        if clauses is None:
+            return frozenset(name.lower() for name in cls.IDENTIFIER.findall(expression)), frozenset(), False
+
+        translated = {predicate for predicate, _ in TranslatorAPIProlog.INDEXED_PREDICATES}
+        mentioned: Set[str] = set()
+        wildcard = False
+        for rule in clauses:
+            for literal in ((rule.head,) if rule.head else ()) + rule.body:
+                if literal.predicate in DatalogEngine.COMPARISONS:
+                    continue
+                if literal.predicate in TranslatorAPIProlog.CLOSURE_PREDICATES:
+                    # The domain is the first argument (see TranslatorAPIProlog.programArgs)
+                    wildcard = wildcard or any(isinstance(a, Var) for a in literal.args[1:])
+                elif literal.predicate in translated:
+                    position = TranslatorAPIProlog.ownerPosition(literal.predicate)
+                    wildcard = wildcard or (position is not None and len(literal.args) > position
+                                            and isinstance(literal.args[position], Var))
+                else:
+                    mentioned.add(literal.predicate.lower())
+                mentioned.update(a.lower() for a in literal.args if isinstance(a, str))
+        heads = frozenset(rule.head.predicate.lower() for rule in clauses if rule.head)
+        return frozenset(mentioned), heads, wildcard
+
+    def buildIndex(self) -> Dict[str, Set[str]]:
+        """Indexes the axioms by the names they mention and the predicates they derive, if stale."""
+        if self.mentions is None:
+            mentions: Dict[str, Set[str]] = {}
+            self.definitions = {}
+            self.wildcards = set()
+            self.mentioned = {}
+            self.heads = {}
+            for name, axiom in self.byName.items():
+                mentioned, heads, wildcard = self.dependencies(axiom)
+                self.mentioned[name] = mentioned
+                for key in mentioned:
+                    mentions.setdefault(key, set()).add(name)
+                for key in heads:
+                    self.definitions.setdefault(key, set()).add(name)
+                if wildcard:
+                    self.wildcards.add(name)
+                self.heads[name] = heads
+            self.mentions = mentions
+        return self.mentions
+
+    def mentioning(self, names: Iterable[str]) -> Set[str]:
+        """Gets the names of the axioms mentioning any of the given names (case-insensitive)."""
+        mentions = self.buildIndex()
+        return {axiom for name in names for axiom in mentions.get(name.lower(), ())}
+
+    def affected(self, changed: Iterable[str]) -> Set[str]:
+        """
+        Gets the names of the axioms whose result may change when the given entities or relationships
+        change: the axioms mentioning them or reading every element, then, repeatedly, the axioms
+        mentioning a predicate derived by an affected one. Nothing changed, no axiom is affected.
+        """
+        changed = list(changed)
+        if not changed:
+            return set()
+        result = self.mentioning(changed) | self.wildcards
+        pending = list(result)
+        while pending:
+            for name in self.mentioning(self.heads.get(pending.pop(), ())):
+                if name not in result:
+                    result.add(name)
+                    pending.append(name)
+        return result
+
+    def required(self, names: Iterable[str]) -> Set[str]:
+        """Gets the names of the given axioms and of the axioms deriving a predicate they read, repeatedly."""
+        self.buildIndex()
+        result = set(names)
+        pending = list(result)
+        while pending:
+            for key in self.mentioned[pending.pop()]:
+                for name in self.definitions.get(key, ()):
+                    if name not in result:
+                        result.add(name)
+                        pending.append(name)
+        return result
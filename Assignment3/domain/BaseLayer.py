@@ -0,0 +1,72 @@
+import threading
+from typing import Any, Callable, ClassVar, Dict, List
+
+from .SchemaSnapshotCache import SchemaSnapshotCache
+
+
+class BaseLayer:
+    """
+    Read-only DomainData of an imported .gbs file, built once per process and shared by every domain
+    importing that file (see DomainData's sharedImports option).
+    Dependent domains never modify it: DomainData.forkBaseLayer gives each of them its own copy of the
+    entity and relationship trees, sharing with the layer what the domain can't modify in place (symbols,
+    reference indexes, Reference objects without attributes), and a domain that already has elements
+    loads the file again without validating it. Only the DomainData is kept, not the parsed file.
+    A layer is rebuilt when the content of its file, or of one of the files it imports, changes.
+    """
+
+    layers: ClassVar[Dict[str, "BaseLayer"]] = {} # Absolute path of the imported file -> layer
+    lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(self, path: str, data: Any, fileHashes: Dict[str, str]):
+        """
+        Initializes a layer. Use BaseLayer.get instead.
+
+        Args:
+            path: The absolute path of the imported file.
+            data: The DomainData loaded from that file alone.
+            fileHashes: Content hash of the file and of each file it imported, by absolute path.
+        """
+        self.path: str = path
+        self.data: Any = data
+        self.fileHashes: Dict[str, str] = fileHashes
+
+    @classmethod
+    def get(cls, path: str, build: Callable[[], Any]) -> "BaseLayer":
+        """
+        Gets the shared layer of an imported file, building it with build() if there is none yet
+        or if one of its files changed since it was built.
+
+        Args:
+            path: The absolute path of the imported file.
+            build: Loads the file into a new DomainData.
+
+        Returns:
+            BaseLayer: The up to date layer.
+        """
+        with cls.lock:
+            layer = cls.layers.get(path)
+            if layer is None or not layer.isUpToDate():
+                data = build()
+                files: List[str] = [path] + list(data.importedFiles)
+                layer = BaseLayer(path, data, {f: SchemaSnapshotCache.fileHash(f) for f in files})
+                cls.layers[path] = layer
+            return layer
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drops every shared layer. Domains already forked from them are not affected."""
+        with cls.lock:
+            cls.layers.clear()
+
+    def isUpToDate(self) -> bool:
+        """
+        Checks that none of the files of this layer changed since it was built.
+
+        Returns:
+            bool: True if all the content hashes still match.
+        """
+        try:
+            return all(SchemaSnapshotCache.fileHash(f) == h for f, h in self.fileHashes.items())
+        except OSError:
+            return False
@@ -0,0 +1,302 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .RelationTriple import RelationTriple
+
+Cycle = Tuple[Any, ...] # The nodes of a cycle, in order, without repeating the first one at the end
+
+
+class CycleFinder:
+    """
+    Cycle enumeration over a graph given as a list of arcs, e.g. the references of a domain
+    (see DomainData.findCycles) or the relation triples of instances (see fromTriples).
+    This is the Python counterpart of Assignment4's simpleCycle.pl (directed graphs) and
+    simpleCycleUndirected.pl (undirected graphs, where every arc can be walked both ways).
+
+    Elementary cycles (no node visited twice) are enumerated with Johnson's algorithm, one strongly
+    connected component at a time, so the cost grows with the number of cycles instead of the number
+    of paths. In an undirected graph each cycle is produced once, in one orientation, and an arc walked
+    back and forth is not a cycle. Every cycle is normalized like in the Prolog programs: rotated to
+    start from its smallest node and, in an undirected graph, oriented towards its smallest neighbour.
+
+    Cycles are streamed by generators: the caller can stop at any point, bound the length of the cycles
+    or pass a cancel callable (e.g. threading.Event.is_set) checked at every step of the search.
+    Node labels must be hashable and comparable to each other (e.g. all strings).
+    """
+
+    def __init__(self, arcs: Iterable[Tuple[Any, Any]], directed: bool = True):
+        """
+        Builds the graph.
+
+        Args:
+            arcs: The (source, destination) pairs. Duplicates are ignored.
+            directed: False to walk every arc in both directions (like generate_edges_from_arcs
+                      in simpleCycleUndirected.pl).
+        """
+        self.directed: bool = directed
+        successors: Dict[Any, Set[Any]] = {}
+        for source, destination in arcs:
+            successors.setdefault(source, set()).add(destination)
+            successors.setdefault(destination, set())
+            if not directed:
+                successors[destination].add(source)
+        self.nodes: List[Any] = sorted(successors)
+        self.rank: Dict[Any, int] = {node: i for i, node in enumerate(self.nodes)}
+        self.successors: Dict[Any, List[Any]] = {node: sorted(nodes) for node, nodes in successors.items()}
+
+    @classmethod
+    def fromTriples(cls, triples: Iterable[RelationTriple], directed: bool = True) -> "CycleFinder":
+        """
+        Builds the graph of a set of instances, with an arc from the subject to the object of each triple.
+        Nodes are the instance IDs (Instance.getSelectedInstanceId).
+
+        Args:
+            triples: The subject-relation-object triples.
+            directed: False for an undirected graph.
+
+        Returns:
+            CycleFinder: The finder over the instance graph.
+        """
+        return cls(((t.getSubject().getSelectedInstanceId(), t.getObject().getSelectedInstanceId())
+                    for t in triples if t.getSubject() is not None and t.getObject() is not None), directed)
+
+    def normalize(self, path: List[Any]) -> Cycle:
+        """Rotates a cycle to start from its smallest node and, if undirected, picks its smaller orientation."""
+        first = min(range(len(path)), key=lambda i: self.rank[path[i]])
+        forward = tuple(path[first:] + path[:first])
+        if self.directed or len(forward) < 3:
+            return forward
+        backward = (forward[0],) + forward[:0:-1]
+        return min(forward, backward, key=lambda cycle: [self.rank[node] for node in cycle])
+
+    def components(self, nodes: Set[Any]) -> List[Set[Any]]:
+        """
+        Gets the strongly connected components of the subgraph induced by nodes that can hold a cycle
+        (more than one node, or a node with a self-loop), with an iterative Tarjan's algorithm.
+        """
+        index: Dict[Any, int] = {}
+        low: Dict[Any, int] = {}
+        onStack: Set[Any] = set()
+        stack: List[Any] = []
+        result: List[Set[Any]] = []
+        for root in sorted(nodes, key=self.rank.__getitem__):
+            if root in index:
+                continue
+            work = [(root, iter(self.successors[root]))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            onStack.add(root)
+            while work:
+                node, neighbours = work[-1]
+                advanced = False
+                for nxt in neighbours:
+                    if nxt not in nodes:
+                        continue
+                    if nxt not in index:
+                        index[nxt] = low[nxt] = len(index)
+                        stack.append(nxt)
+                        onStack.add(nxt)
+                        work.append((nxt, iter(self.successors[nxt])))
+                        advanced = True
+                        break
+                    if nxt in onStack:
+                        low[node] = min(low[node], index[nxt])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component: Set[Any] = set()
+                    while True:
+                        member = stack.pop()
+                        onStack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.successors[node]:
+                        result.append(component)
+        return result
+
+    def cycles(self, maxLength: Optional[int] = None, cancel: Optional[Callable[[], bool]] = None) -> Iterator[Cycle]:
+        """
+        Yields the elementary cycles of the graph (the cycles found in step 1 of the Prolog programs), normalized.
+
+        Args:
+            maxLength: The maximum number of nodes of a cycle, or None for no limit.
+            cancel: A callable returning True when the enumeration must stop, or None.
+
+        Yields:
+            Cycle: The nodes of each cycle.
+        """
+        minLength = 1 if self.directed else 3
+        if maxLength is not None and maxLength < minLength:
+            return
+        pending = self.components(set(self.nodes))
+        while pending:
+            component = pending.pop()
+            start = min(component, key=self.rank.__getitem__)
+            if maxLength is None:
+                found = self.circuits(start, component, cancel)
+            else:
+                found = self.boundedCircuits(start, component, maxLength, cancel)
+            for path in found:
+                if len(path) < minLength:
+                    continue
+                # An undirected cycle is found once per orientation: keep the one leaving start to the smaller node
+                if not self.directed and self.rank[path[1]] > self.rank[path[-1]]:
+                    continue
+                yield self.normalize(path)
+            if cancel is not None and cancel():
+                return
+            component.discard(start)
+            pending.extend(self.components(component))
+
+    def circuits(self, start: Any, component: Set[Any], cancel: Optional[Callable[[], bool]]) -> Iterator[List[Any]]:
+        """Johnson's CIRCUIT procedure: yields the paths from start that close a cycle inside component."""
+        path = [start]
+        blocked = {start}
+        closed: Set[Any] = set() # Nodes of the path with a cycle found below them
+        blockers: Dict[Any, Set[Any]] = {}
+        stack = [(start, iter(self.successors[start]))]
+        while stack:
+            if cancel is not None and cancel():
+                return
+            node, neighbours = stack[-1]
+            advanced = False
+            for nxt in neighbours:
+                if nxt not in component:
+                    continue
+                if nxt == start:
+                    yield list(path)
+                    closed.update(path)
+                elif nxt not in blocked:
+                    path.append(nxt)
+                    blocked.add(nxt)
+                    closed.discard(nxt)
+                    stack.append((nxt, iter(self.successors[nxt])))
+                    advanced = True
+                    break
+            if advanced:
+                continue
+            # Every neighbour was tried: unblock the node if it led to a cycle, else wait for its successors
+            if node in closed:
+                unblock = [node]
+                while unblock:
+                    member = unblock.pop()
+                    if member in blocked:
+                        blocked.discard(member)
+                        unblock.extend(blockers.pop(member, ()))
+            else:
+                for nxt in self.successors[node]:
+                    if nxt in component:
+                        blockers.setdefault(nxt, set()).add(node)
+            stack.pop()
+            path.pop()
+
+    def boundedCircuits(self, start: Any, component: Set[Any], maxLength: int,
+                        cancel: Optional[Callable[[], bool]]) -> Iterator[List[Any]]:
+        """
+        Yields the paths from start that close a cycle of at most maxLength nodes inside component.
+        Johnson's blocking does not hold with a length limit, so this is a depth-first search pruned
+        with the distance from each node back to start.
+        """
+        distances = {start: 0}
+        predecessors: Dict[Any, List[Any]] = {}
+        for node in component:
+            for nxt in self.successors[node]:
+                if nxt in component:
+                    predecessors.setdefault(nxt, []).append(node)
+        front = [start]
+        while front:
+            nextFront = []
+            for node in front:
+                for previous in predecessors.get(node, ()):
+                    if previous not in distances:
+                        distances[previous] = distances[node] + 1
+                        nextFront.append(previous)
+            front = nextFront
+
+        path = [start]
+        onPath = {start}
+        stack = [iter(self.successors[start])]
+        while stack:
+            if cancel is not None and cancel():
+                return
+            advanced = False
+            for nxt in stack[-1]:
+                if nxt == start:
+                    yield list(path)
+                elif nxt in component and nxt not in onPath and len(path) + distances.get(nxt, maxLength) <= maxLength:
+                    path.append(nxt)
+                    onPath.add(nxt)
+                    stack.append(iter(self.successors[nxt]))
+                    advanced = True
+                    break
+            if not advanced:
+                stack.pop()
+                onPath.discard(path.pop())
+
+    def distancesFrom(self, node: Any, depth: int, cache: Dict[Any, Tuple[int, Dict[Any, int]]]) -> Dict[Any, int]:
+        """Gets the shortest distances (in arcs) from node to the nodes at most depth arcs away, with a BFS."""
+        cached = cache.get(node)
+        if cached is not None and cached[0] >= depth:
+            return cached[1]
+        distances = {node: 0}
+        front = [node]
+        for d in range(1, depth + 1):
+            nextFront = []
+            for current in front:
+                for nxt in self.successors[current]:
+                    if nxt not in distances:
+                        distances[nxt] = d
+                        nextFront.append(nxt)
+            front = nextFront
+        cache[node] = (depth, distances)
+        return distances
+
+    def isSimple(self, cycle: Cycle, cache: Optional[Dict[Any, Tuple[int, Dict[Any, int]]]] = None) -> bool:
+        """
+        Checks the filter of step 2 of the Prolog programs (is_simple_cycle_candidate): no two nodes of the
+        cycle are closer in the graph than along the cycle, so the cycle has no chord nor any shortcut.
+
+        Args:
+            cycle: The nodes of the cycle.
+            cache: BFS distances to reuse between calls (see distancesFrom), or None.
+
+        Returns:
+            bool: True if the cycle is simple.
+        """
+        if cache is None:
+            cache = {}
+        n = len(cycle)
+        position = {node: i for i, node in enumerate(cycle)}
+        depth = n - 1 if self.directed else n // 2
+        for i, node in enumerate(cycle):
+            distances = self.distancesFrom(node, depth, cache)
+            for other, j in position.items():
+                along = (j - i) % n
+                if not self.directed:
+                    along = min(along, n - along)
+                if along > 1 and distances.get(other, along) < along:
+                    return False
+        return True
+
+    def simpleCycles(self, maxLength: Optional[int] = None, cancel: Optional[Callable[[], bool]] = None) -> Iterator[Cycle]:
+        """
+        Yields the simple cycles, i.e. the SimpleCycles of find_simple_cycles in the Prolog programs:
+        the elementary cycles that pass isSimple, normalized. Sorting them gives the Prolog (setof) order.
+
+        Args:
+            maxLength: The maximum number of nodes of a cycle, or None for no limit.
+            cancel: A callable returning True when the enumeration must stop, or None.
+
+        Yields:
+            Cycle: The nodes of each simple cycle.
+        """
+        cache: Dict[Any, Tuple[int, Dict[Any, int]]] = {}
+        for cycle in self.cycles(maxLength, cancel):
+            if self.isSimple(cycle, cache):
+                yield cycle
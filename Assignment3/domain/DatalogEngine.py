@@ -0,0 +1,536 @@
+from __future__ import annotations
+import re
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Axiom import Axiom
+    from .DomainData import DomainData
+
+Predicate = Tuple[str, int] # (name, arity)
+Binding = Dict[str, Any] # Variable name -> value
+
+
+class Var(NamedTuple):
+    """A variable of a rule (a name starting with an uppercase letter or _)."""
+    name: str
+
+    def isAnonymous(self) -> bool:
+        return self.name.startswith("_#") # See DatalogEngine.parse
+
+
+class Literal(NamedTuple):
+    """An atom of a rule, possibly negated (\\+), or a comparison (= or \\=) between two terms."""
+    predicate: str
+    args: Tuple[Any, ...]
+    negated: bool = False
+
+    def key(self) -> Predicate:
+        return self.predicate, len(self.args)
+
+    def variables(self) -> Set[str]:
+        return {a.name for a in self.args if isinstance(a, Var)}
+
+    def requiredVariables(self) -> Set[str]:
+        """Gets the variables that must be bound before the literal is checked (for \\+ p(X, _), only X)."""
+        return {a.name for a in self.args if isinstance(a, Var) and not (self.negated and a.isAnonymous())}
+
+
+class Rule(NamedTuple):
+    """A clause Head :- Body, or a constraint :- Body (head None) whose solutions are violations."""
+    head: Optional[Literal]
+    body: Tuple[Literal, ...]
+    name: Optional[str] = None # Name of the axiom the rule comes from
+
+
+class DatalogEngine:
+    """
+    In-process Datalog evaluation over the facts of a domain, as TranslatorAPIProlog translates them
+    (entity/2, parent/3, relationship/4, inverse/3, ...), without going through the text of the program
+    (see fromDomain). Rules are written in Prolog syntax (Head :- Body.), or as Body -> Head1, Head2;
+    \\+ negates an atom and = / \\= compare two terms. A clause without head (:- Body.) is a constraint,
+    reported by violations.
+
+    Rules are stratified on negation: a predicate is computed after every predicate it depends on
+    negatively, so \\+ always reads a complete relation; a negation inside a recursion is rejected.
+    Each stratum is evaluated bottom-up and semi-naively: after the first round a rule is only joined
+    again with the facts derived in the previous round (the delta). Joins read hash indexes built per
+    predicate and set of bound arguments on first use, and updated as facts are derived.
+    """
+
+    COMPARISONS: FrozenSet[str] = frozenset(("=", "\\="))
+    FORMALISMS: FrozenSet[str] = frozenset(("datalog",)) # Axiom formalisms always compiled by addAxiom
+    PROLOG_FORMALISMS: FrozenSet[str] = frozenset(("prolog",)) # Compiled only when the rule is safe Datalog
+    compiled: Dict[str, Tuple[Rule, ...]] = {} # Expression -> its clauses (unnamed), shared by every engine
+    invalid: Dict[str, str] = {} # Expression -> why it is not valid Datalog, so it is not parsed again
+    TOKEN = re.compile(r"\s*(?:(%[^\n]*)|(:-|->|\\\+|\\=|[(),.=])|('(?:[^'\\]|\\.)*')|([^\W\d]\w*|-?\d+(?:\.\d+)?))")
+
+    def __init__(self):
+        """Initializes an engine with no facts and no rules."""
+        self.facts: Dict[Predicate, Set[Tuple[Any, ...]]] = {} # The given facts
+        self.rules: List[Rule] = []
+        self.constraints: List[Rule] = []
+        self.relations: Dict[Predicate, Set[Tuple[Any, ...]]] = {} # Given and derived facts, see evaluate
+        # Predicate -> bound positions -> values at those positions -> facts
+        self.indexes: Dict[Predicate, Dict[Tuple[int, ...], Dict[Tuple[Any, ...], List[Tuple[Any, ...]]]]] = {}
+        self.plans: Dict[Tuple[Rule, int], List[Tuple[Literal, Tuple[int, ...]]]] = {} # (rule, delta position) -> join order
+        self.evaluated: bool = False
+
+    @classmethod
+    def fromDomain(cls, domain: DomainData, indexed: bool = False, closure: bool = False) -> "DatalogEngine":
+        """
+        Builds an engine holding the facts of a domain, taken from the records of the translator.
+
+        Args:
+            domain: The domain.
+            indexed: True for the argument order of the indexed profile (TranslatorAPIProlog.INDEXED_PREDICATES),
+                     False for the one of the program of the constructor (domain first).
+            closure: True to also load ancestor/3, inherited_attribute/4 and top_relationship/3.
+
+        Returns:
+            DatalogEngine: The engine, with no rules yet.
+        """
+        from .TranslatorAPIProlog import TranslatorAPIProlog
+        engine = cls()
+        for predicate, args in TranslatorAPIProlog.iterIndexedRecords(domain, closure):
+            engine.addFact(predicate, args if indexed else TranslatorAPIProlog.programArgs(predicate, args))
+        return engine
+
+    @classmethod
+    def fromFacts(cls, facts: Iterable[Tuple[Predicate, Iterable[Tuple[Any, ...]]]]) -> "DatalogEngine":
+        """
+        Builds an engine holding the given facts, e.g. those of a domain kept by DomainData.getDatalogFacts.
+
+        Args:
+            facts: (predicate, arity) -> its facts, as pairs; they are copied.
+
+        Returns:
+            DatalogEngine: The engine, with no rules yet.
+        """
+        engine = cls()
+        engine.facts = {predicate: set(tuples) for predicate, tuples in facts}
+        return engine
+
+    def addFact(self, predicate: str, args: Iterable[Any]) -> None:
+        """Adds a given fact, e.g. addFact("parent", ("general", "agent", "person"))."""
+        args = tuple(args)
+        self.facts.setdefault((predicate, len(args)), set()).add(args)
+        self.evaluated = False
+
+    def addRule(self, rule: Rule) -> None:
+        """
+        Adds a rule or a constraint.
+
+        Raises:
+            ValueError: If a variable of the head, of a negated atom or of a comparison is not bound
+                        by a positive atom of the body (the rule would not be range-restricted).
+                        An anonymous variable (_) of a negated atom is existential and may stay unbound.
+        """
+        self.checkSafety(rule)
+        (self.rules if rule.head else self.constraints).append(rule)
+        self.evaluated = False
+
+    @classmethod
+    def checkSafety(cls, rule: Rule) -> None:
+        """Raises a ValueError if the rule is not range-restricted (see addRule)."""
+        bound: Set[str] = set()
+        for literal in rule.body:
+            if not literal.negated and literal.predicate not in cls.COMPARISONS:
+                bound |= literal.variables()
+        for literal in ((rule.head,) if rule.head else ()) + rule.body:
+            unbound = literal.requiredVariables() - bound
+            if unbound and (literal is rule.head or literal.negated or literal.predicate in cls.COMPARISONS):
+                raise ValueError(f"Unsafe rule{' ' + rule.name if rule.name else ''}: variable(s) {sorted(unbound)} "
+                                 f"of {literal.predicate} are not bound by a positive atom of the body")
+
+    def addRules(self, text: str, name: Optional[str] = None) -> int:
+        """
+        Parses clauses and adds them: rules, constraints and ground facts (Head.).
+
+        Args:
+            text: The clauses, each ending with a dot (the last one may omit it).
+            name: The name recorded in the rules, e.g. the axiom they come from.
+
+        Returns:
+            int: The number of clauses added.
+        """
+        clauses = self.parse(text, name)
+        self.addClauses(clauses)
+        return len(clauses)
+
+    def addClauses(self, clauses: Iterable[Rule]) -> None:
+        """Adds parsed clauses: a clause without body is a fact and must be ground."""
+        for rule in clauses:
+            if rule.head and not rule.body:
+                if rule.head.variables():
+                    raise ValueError(f"Fact {rule.head.predicate} must be ground")
+                self.addFact(rule.head.predicate, rule.head.args)
+            else:
+                self.addRule(rule)
+
+    def addAxiom(self, axiom: Axiom) -> bool:
+        """
+        Compiles an axiom into rules and constraints, if isCompiled.
+
+        Returns:
+            bool: False if the formalism is not supported, or the Prolog rule is not Datalog, and the
+                  axiom was skipped.
+        """
+        if not self.isCompiled(axiom):
+            return False
+        self.addClauses(self.compileAxiom(axiom))
+        return True
+
+    @classmethod
+    def isCompiled(cls, axiom: Axiom) -> bool:
+        """
+        Tells whether addAxiom compiles an axiom: its formalism is Datalog (FORMALISMS), or Prolog
+        (PROLOG_FORMALISMS) and its rule is safe Datalog. A Prolog rule using builtins (is/2, >, lists, ...)
+        is left to the Prolog translation, while an invalid Datalog rule raises a ValueError when added.
+        """
+        formalism = (axiom.getFormalism() or "").lower()
+        if formalism in cls.FORMALISMS:
+            return True
+        if formalism not in cls.PROLOG_FORMALISMS:
+            return False
+        try:
+            for rule in cls.compileAxiom(axiom):
+                if rule.body:
+                    cls.checkSafety(rule)
+                elif rule.head.variables():
+                    return False
+        except ValueError:
+            return False
+        return True
+
+    @classmethod
+    def compileAxiom(cls, axiom: Axiom) -> Tuple[Rule, ...]:
+        """
+        Gets the clauses of an axiom, named after it. An expression is parsed once: its clauses are cached
+        by expression (compiled), so axioms with the same rule, e.g. in forked domains, share them, and
+        so is the error of an invalid one (invalid).
+
+        Raises:
+            ValueError: If the expression is not valid Datalog.
+        """
+        expression = axiom.getExpression() or ""
+        clauses = cls.compiled.get(expression)
+        if clauses is None:
+            if expression in cls.invalid:
+                raise ValueError(cls.invalid[expression])
+            try:
+                clauses = cls.compiled[expression] = tuple(cls.parse(expression))
+            except ValueError as e:
+                cls.invalid[expression] = str(e)
+                raise
+        return tuple(rule._replace(name=axiom.getName()) for rule in clauses)
+
+    @classmethod
+    def parse(cls, text: str, name: Optional[str] = None) -> List[Rule]:
+        """
+        Parses clauses: Head :- Body. / :- Body. / Body -> Head, ... / Head.
+        Names starting with an uppercase letter or _ are variables, other names, numbers and quoted atoms
+        are constants (strings). An atom is a name followed by its arguments in parentheses.
+        """
+        tokens: List[str] = []
+        position = 0
+        text = text.strip()
+        while position < len(text):
+            match = cls.TOKEN.match(text, position)
+            if not match:
+                raise ValueError(f"Invalid Datalog syntax at {text[position:position + 20]!r}")
+            position = match.end()
+            if match.group(1) is None: # Not a comment
+                tokens.append(match.group(2) or match.group(3) or match.group(4))
+
+        rules: List[Rule] = []
+        i = 0
+        anonymous = 0
+
+        def term(token: str) -> Any:
+            nonlocal anonymous
+            if token == "_": # Each _ is a distinct variable
+                anonymous += 1
+                return Var(f"_#{anonymous}")
+            if token.startswith("'"):
+                return re.sub(r"\\(.)", r"\1", token[1:-1])
+            if token[0].isupper() or token[0] == "_":
+                return Var(token)
+            return token
+
+        def literal() -> Literal:
+            nonlocal i
+            negated = tokens[i] == "\\+"
+            if negated:
+                i += 1
+            first = tokens[i]
+            i += 1
+            args: List[Any] = []
+            if i < len(tokens) and tokens[i] == "(":
+                i += 1
+                while tokens[i] != ")":
+                    args.append(term(tokens[i]))
+                    i += 1
+                    if tokens[i] == ",":
+                        i += 1
+                i += 1
+            if i < len(tokens) and tokens[i] in cls.COMPARISONS:
+                operator = tokens[i]
+                i += 2
+                return Literal(operator, (term(first), term(tokens[i - 1])), negated)
+            return Literal(first, tuple(args), negated)
+
+        def conjunction() -> List[Literal]:
+            nonlocal i
+            literals = [literal()]
+            while i < len(tokens) and tokens[i] == ",":
+                i += 1
+                literals.append(literal())
+            return literals
+
+        try:
+            while i < len(tokens):
+                if tokens[i] == ":-":
+                    i += 1
+                    rules.append(Rule(None, tuple(conjunction()), name))
+                else:
+                    left = conjunction()
+                    if i < len(tokens) and tokens[i] == ":-":
+                        i += 1
+                        body = tuple(conjunction())
+                        rules.extend(Rule(head, body, name) for head in left)
+                    elif i < len(tokens) and tokens[i] == "->":
+                        i += 1
+                        rules.extend(Rule(head, tuple(left), name) for head in conjunction())
+                    else:
+                        rules.extend(Rule(head, (), name) for head in left)
+                if i < len(tokens):
+                    if tokens[i] != ".":
+                        raise ValueError(f"Expected '.' but found {tokens[i]!r}")
+                    i += 1
+        except IndexError:
+            raise ValueError(f"Unexpected end of Datalog clause in {text!r}") from None
+        for rule in rules:
+            if rule.head is not None and (rule.head.negated or rule.head.predicate in cls.COMPARISONS):
+                raise ValueError(f"Invalid head {rule.head.predicate} in {text!r}")
+        return rules
+
+    def stratify(self) -> List[List[Rule]]:
+        """
+        Groups the rules by stratum: the rules of a predicate come after those of every predicate it
+        depends on, strictly after for a negated dependency.
+
+        Raises:
+            ValueError: If a predicate depends negatively on itself through recursion.
+        """
+        stratum: Dict[Predicate, int] = {rule.head.key(): 0 for rule in self.rules}
+        limit = len(stratum)
+        changed = True
+        while changed:
+            changed = False
+            for rule in self.rules:
+                head = rule.head.key()
+                for literal in rule.body:
+                    if literal.predicate in self.COMPARISONS or literal.key() not in stratum:
+                        continue
+                    needed = stratum[literal.key()] + (1 if literal.negated else 0)
+                    if needed > stratum[head]:
+                        if needed > limit:
+                            raise ValueError(f"Rules are not stratifiable: {head[0]}/{head[1]} depends negatively "
+                                             f"on itself through {literal.predicate}/{len(literal.args)}")
+                        stratum[head] = needed
+                        changed = True
+        strata: List[List[Rule]] = [[] for _ in range(max(stratum.values(), default=-1) + 1)]
+        for rule in self.rules:
+            strata[stratum[rule.head.key()]].append(rule)
+        return strata
+
+    def evaluate(self) -> None:
+        """Computes every relation from the facts and the rules, stratum by stratum (see the class docstring)."""
+        self.relations = {predicate: set(facts) for predicate, facts in self.facts.items()}
+        self.indexes = {}
+        self.plans = {}
+        for rules in self.stratify():
+            self.evaluateStratum(rules)
+        self.evaluated = True
+
+    def evaluateStratum(self, rules: List[Rule]) -> None:
+        """Semi-naive fixpoint of the rules of one stratum."""
+        heads = {rule.head.key() for rule in rules}
+        delta = self.derive(rules, None)
+        while delta:
+            self.insert(delta)
+            delta = self.derive(rules, delta, heads)
+
+    def derive(self, rules: List[Rule], delta: Optional[Dict[Predicate, Set[Tuple[Any, ...]]]],
+               heads: FrozenSet[Predicate] = frozenset()) -> Dict[Predicate, Set[Tuple[Any, ...]]]:
+        """
+        Runs one round of the rules and gets the new facts. Without delta every rule is joined on the full
+        relations; with it, each rule is joined once per body atom of this stratum read from the delta.
+        """
+        new: Dict[Predicate, Set[Tuple[Any, ...]]] = {}
+        for r, rule in enumerate(rules):
+            head = rule.head
+            key = head.key()
+            known = self.relations.get(key, set())
+            if delta is None:
+                positions: List[Optional[int]] = [None]
+            else:
+                positions = [i for i, literal in enumerate(rule.body) if not literal.negated
+                             and literal.predicate not in self.COMPARISONS and literal.key() in heads and literal.key() in delta]
+            for position in positions:
+                for binding in self.join(rule, position, delta[rule.body[position].key()] if position is not None else None):
+                    fact = tuple(binding[a.name] if isinstance(a, Var) else a for a in head.args)
+                    if fact not in known:
+                        new.setdefault(key, set()).add(fact)
+        return new
+
+    def insert(self, facts: Dict[Predicate, Set[Tuple[Any, ...]]]) -> None:
+        """Adds derived facts to the relations and to the indexes already built on them."""
+        for predicate, tuples in facts.items():
+            self.relations.setdefault(predicate, set()).update(tuples)
+            for positions, index in self.indexes.get(predicate, {}).items():
+                for fact in tuples:
+                    index.setdefault(tuple(fact[p] for p in positions), []).append(fact)
+
+    def index(self, predicate: Predicate, positions: Tuple[int, ...]) -> Dict[Tuple[Any, ...], List[Tuple[Any, ...]]]:
+        """Gets the hash index of a relation on the given argument positions, building it on first use."""
+        byPositions = self.indexes.setdefault(predicate, {})
+        index = byPositions.get(positions)
+        if index is None:
+            index = byPositions[positions] = {}
+            for fact in self.relations.get(predicate, ()):
+                index.setdefault(tuple(fact[p] for p in positions), []).append(fact)
+        return index
+
+    def plan(self, rule: Rule, first: Optional[int]) -> List[Tuple[Literal, Tuple[int, ...]]]:
+        """
+        Orders the body of a rule for a join: the delta atom first (if any), then at each step a filter
+        (negated atom or comparison) as soon as its variables are bound, else the positive atom with the
+        most bound arguments. Each step comes with the argument positions bound when it is reached.
+        """
+        bound: Set[str] = set()
+        steps: List[Tuple[Literal, Tuple[int, ...]]] = []
+        pending = list(range(len(rule.body)))
+        if first is not None:
+            pending.remove(first)
+            steps.append((rule.body[first], ()))
+            bound |= rule.body[first].variables()
+        while pending:
+            filters = [i for i in pending if (rule.body[i].negated or rule.body[i].predicate in self.COMPARISONS)
+                       and rule.body[i].requiredVariables() <= bound]
+            if filters:
+                chosen = filters[0]
+            else:
+                def boundCount(i: int) -> int:
+                    return sum(1 for a in rule.body[i].args if not isinstance(a, Var) or a.name in bound)
+                chosen = max((i for i in pending if not rule.body[i].negated and rule.body[i].predicate not in self.COMPARISONS),
+                             key=boundCount)
+            literal = rule.body[chosen]
+            pending.remove(chosen)
+            steps.append((literal, tuple(p for p, a in enumerate(literal.args) if not isinstance(a, Var) or a.name in bound)))
+            bound |= literal.variables()
+        return steps
+
+    def join(self, rule: Rule, first: Optional[int] = None,
+             delta: Optional[Set[Tuple[Any, ...]]] = None) -> Iterator[Binding]:
+        """
+        Yields the bindings of the variables that satisfy the body of a rule, reading the atom at
+        position first from delta instead of from its relation.
+        """
+        planKey = (rule, -1 if first is None else first)
+        steps = self.plans.get(planKey)
+        if steps is None:
+            steps = self.plans[planKey] = self.plan(rule, first)
+        binding: Binding = {}
+
+        def value(term: Any) -> Any:
+            return binding[term.name] if isinstance(term, Var) else term
+
+        def step(k: int) -> Iterator[Binding]:
+            if k == len(steps):
+                yield dict(binding)
+                return
+            literal, positions = steps[k]
+            if literal.predicate in self.COMPARISONS:
+                holds = (value(literal.args[0]) == value(literal.args[1])) == (literal.predicate == "=")
+                if holds != literal.negated:
+                    yield from step(k + 1)
+                return
+            if literal.negated:
+                if len(positions) == len(literal.args):
+                    found = tuple(value(a) for a in literal.args) in self.relations.get(literal.key(), ())
+                else: # Anonymous variables: is there any fact with the bound arguments?
+                    found = bool(self.index(literal.key(), positions).get(tuple(value(literal.args[p]) for p in positions)) if positions
+                                 else self.relations.get(literal.key()))
+                if not found:
+                    yield from step(k + 1)
+                return
+            if k == 0 and delta is not None:
+                candidates: Iterable[Tuple[Any, ...]] = delta
+            elif positions:
+                candidates = self.index(literal.key(), positions).get(tuple(value(literal.args[p]) for p in positions), ())
+            else:
+                candidates = self.relations.get(literal.key(), ())
+            for fact in candidates:
+                added: List[str] = []
+                matched = True
+                for a, v in zip(literal.args, fact):
+                    if isinstance(a, Var):
+                        if a.name in binding:
+                            if binding[a.name] != v:
+                                matched = False
+                                break
+                        else:
+                            binding[a.name] = v
+                            added.append(a.name)
+                    elif a != v:
+                        matched = False
+                        break
+                if matched:
+                    yield from step(k + 1)
+                for name in added:
+                    del binding[name]
+
+        return step(0)
+
+    def query(self, text: str) -> Iterator[Binding]:
+        """
+        Yields the solutions of a conjunction, e.g. query("ancestor(D, E, agent), \\+ parent(D, agent, E)").
+        The relations are evaluated first if facts or rules changed.
+        """
+        if not self.evaluated:
+            self.evaluate()
+        rules = self.parse(f":- {text.rstrip().rstrip('.')}.")
+        if len(rules) != 1:
+            raise ValueError(f"Invalid query {text!r}")
+        self.checkSafety(rules[0])
+        return self.join(rules[0])
+
+    def relation(self, predicate: str, arity: int) -> FrozenSet[Tuple[Any, ...]]:
+        """Gets the facts, given and derived, of a predicate."""
+        if not self.evaluated:
+            self.evaluate()
+        return frozenset(self.relations.get((predicate, arity), ()))
+
+    def violations(self, names: Optional[Iterable[str]] = None) -> Dict[str, List[Binding]]:
+        """
+        Checks the constraints (clauses :- Body.).
+
+        Args:
+            names: The axioms whose constraints are checked, or None for every constraint.
+
+        Returns:
+            Dict[str, List[Binding]]: Name of the constraint (its axiom, else its position) -> the bindings that
+            satisfy its body, for every violated constraint.
+        """
+        if not self.evaluated:
+            self.evaluate()
+        result: Dict[str, List[Binding]] = {}
+        names = set(names) if names is not None else None
+        for i, constraint in enumerate(self.constraints):
+            if names is not None and constraint.name not in names:
+                continue
+            found = list(self.join(constraint))
+            if found:
+                result.setdefault(constraint.name or f"constraint_{i}", []).extend(found)
+        return result
@@ -4,20 +4,38 @@ import xml.etree.ElementTree as ET
 from pathlib import Path
 import io
 import codecs
-from typing import List, Dict, Set, Optional, Tuple, cast, Any # Added Any for DefaultTreeNode compatibility
+from typing import List, Dict, Set, FrozenSet, Optional, Tuple, cast, Any, ClassVar, Collection, Sequence, Callable, Iterator, Iterable, TYPE_CHECKING # Added Any for DefaultTreeNode compatibility
 from collections import defaultdict
+from collections.abc import Mapping
+from types import MappingProxyType
 import copy
 import traceback
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 
 # Assuming domain classes are in the same directory or accessible via PYTHONPATH
 from .Attribute import Attribute
 from .Entity import Entity
 from .Union import Union
 from .Axiom import Axiom
+from .AxiomStore import AxiomStore
 from .Relationship import Relationship
 from .Reference import Reference
 from .TreeNode import TreeNode # Assuming TreeNode is the base or interface
 from .DefaultTreeNode import DefaultTreeNode # Assuming this is the implementation used
+from .SchemaSnapshotCache import SchemaSnapshotCache
+from .BaseLayer import BaseLayer
+from .ReferenceIndex import ReferenceIndex
+from .PostingIndex import PostingIndex
+from .SymbolTable import SymbolTable
+from .SubjObjRelView import SubjObjRelView
+from .PathFinder import PathFinder, EntityPath
+from .CycleFinder import CycleFinder, Cycle
+from .TripleIndex import TripleIndex, Triple
+from .EntityShape import EntityShape
+from .ValidationRule import ValidationRule
+if TYPE_CHECKING:
+    from .ReferenceAdjacency import ReferenceAdjacency # Needs NumPy, imported lazily by getReferenceAdjacency
+    from .DatalogEngine import DatalogEngine # Imported lazily by getDatalogEngine
 # from .UType import UType # Assuming UType might be needed based on Java code
 
 # Helper Pair class (can be replaced by tuple if preferred, kept for Java similarity)
@@ -32,6 +50,13 @@ class Pair:
     def getValue(self) -> Any:
         return self.value
 
+# Module level so that it can be sent to a ProcessPoolExecutor
+def parseGbsFile(file_path: str) -> ET.ElementTree:
+    """Parses a .gbs file into an ElementTree. Worker function used by DomainData.prefetchImportClosure."""
+    if not Path(file_path).is_file():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    return ET.parse(file_path)
+
 class DomainData:
     """
     This class represents the domain data for a specific domain.
@@ -47,20 +72,26 @@ class DomainData:
     domain: Optional[str] # Java: String
     entityTree: Entity # Java: Entity
     unions: Set[Union] # Java: HashSet<Union>
-    axioms: Set[Axiom] # Java: HashSet<Axiom>
+    axioms: AxiomStore # Java: HashSet<Axiom>
     relationshipTree: Relationship # Java: Relationship
     subjects: List[str] # Java: Vector<String>
     objects: List[str] # Java: Vector<String>
     subjRelObjs: Set[str] # Java: TreeSet<String> (Python set is unordered)
-    subjRels: Dict[str, List[str]] # Java: Map<String,Vector<String>>
-    subjObjs: Dict[str, List[str]] # Java: Map<String,Vector<String>>
-    relSubjs: Dict[str, List[str]] # Java: Map<String,Vector<String>>
-    relObjs: Dict[str, List[str]] # Java: Map<String,Vector<String>>
-    objSubjs: Dict[str, List[str]] # Java: Map<String,Vector<String>>
-    objRels: Dict[str, List[str]] # Java: Map<String,Vector<String>>
-    subjRel_Objs: Dict[str, List[str]] # Java: Map<String,Vector<String>>
-    subjObj_Rels: Dict[str, List[str]] # Java: Map<String,Vector<String>>
-    relObj_Subjs: Dict[str, List[str]] # Java: Map<String,Vector<String>>
+    subjRelObjsShared: bool # True while subjRelObjs is the set of a BaseLayer, see writableSubjRelObjs
+    # Java: Map<String,Vector<String>>, here set-backed with lazily sorted views (see ReferenceIndex)
+    subjRels: ReferenceIndex # subject -> relationships
+    subjObjs: ReferenceIndex # subject -> objects
+    relSubjs: ReferenceIndex # relationship -> subjects
+    relObjs: ReferenceIndex # relationship -> objects
+    objSubjs: ReferenceIndex # object -> subjects
+    objRels: ReferenceIndex # object -> relationships
+    subjRel_Objs: ReferenceIndex # (subject, relationship) -> objects; Java key: subject+"."+relationship
+    subjObj_Rels: ReferenceIndex # (subject, object) -> relationships; Java key: subject+"."+object
+    relObj_Subjs: ReferenceIndex # (relationship, object) -> subjects; Java key: relationship+"."+object
+    subjPostings: PostingIndex # subject (case-insensitive) -> relationships, with their number of references (not in Java)
+    objPostings: PostingIndex # object (case-insensitive) -> relationships, with their number of references (not in Java)
+    postingsVersion: Optional[Tuple[int, int]] # referencesKey() the postings reflect, see getPostings (not in Java)
+    symbols: SymbolTable # Casefolded names of the domain -> integer IDs (not in Java)
     inverseRels: Dict[str, str] # Java: Map<String,String>
     nRelRefs: int # Java: int
     webInfFolder: str # Java: String
@@ -70,12 +101,40 @@ class DomainData:
     inverse: Optional[str] = None # Java: String
     attrsRel: Dict[str, List[Attribute]] # Java: Map<String, Vector<Attribute>>
 
+    # Compiled validation schema: allowed child tags / XML attributes for each context of a .gbs file.
+    # Java builds these lists at every call; here they are built once (see ValidationRule).
+    TAGS_IMPORTS: ClassVar[ValidationRule] = ValidationRule("import", "deleted")
+    TAGS_DELETED: ClassVar[ValidationRule] = ValidationRule("entity", "relationship")
+    TAGS_TOP_ENTITY: ClassVar[ValidationRule] = ValidationRule("entity")
+    TAGS_SUB_ENTITY: ClassVar[ValidationRule] = ValidationRule("entity", "attribute")
+    TAGS_TOP_RELATIONSHIP: ClassVar[ValidationRule] = ValidationRule("relationship")
+    TAGS_SUB_RELATIONSHIP: ClassVar[ValidationRule] = ValidationRule("relationship", "attribute", "reference")
+    TAGS_VALUE: ClassVar[ValidationRule] = ValidationRule("value")
+    ATTRS_NONE: ClassVar[ValidationRule] = ValidationRule()
+    ATTRS_NAME: ClassVar[ValidationRule] = ValidationRule("name")
+    ATTRS_IMPORT: ClassVar[ValidationRule] = ValidationRule("schema")
+    ATTRS_AXIOM: ClassVar[ValidationRule] = ValidationRule("name", "formalism", "rule")
+    ATTRS_ENTITY: ClassVar[ValidationRule] = ValidationRule("name", "description", "abstract", "notes")
+    ATTRS_RELATIONSHIP: ClassVar[ValidationRule] = ValidationRule("name", "inverse", "description", "abstract", "notes")
+    ATTRS_REFERENCE: ClassVar[ValidationRule] = ValidationRule("subject", "object")
+    ATTRS_ATTRIBUTE: ClassVar[ValidationRule] = ValidationRule("name", "datatype", "description", "mandatory",
+                                                               "distinguishing", "display", "target", "notes")
+
+    # Content hashes of the files that passed validation in this process (trusted mode)
+    validatedFiles: ClassVar[Set[str]] = set()
+
     # Unified constructor mimicking Java overloaded constructors
     def __init__(self,
                  path_or_bytearray: Optional[str | bytes] = None,
                  webInfFolder: Optional[str] = None,
                  domainName: Optional[str] = None,
-                 file: Optional[str | Path] = None):
+                 file: Optional[str | Path] = None,
+                 streaming: bool = False,
+                 cacheFolder: Optional[str | Path] = None,
+                 parallelImports: Optional[str] = None,
+                 importWorkers: Optional[int] = None,
+                 sharedImports: bool = False,
+                 trusted: bool = False):
         """
         Initializes the DomainData object. Mimics Java overloaded constructors:
         1. DomainData(): Default constructor (call with no arguments).
@@ -83,6 +142,26 @@ class DomainData:
            Requires webInfFolder if path is just a domain name.
         3. DomainData(byteArray, webInfFolder): Loads from byte array (byte[] byteArray, String webInfFolder).
         4. DomainData(domainName, file): Loads an arbitrary file with a given domain name (String domainName, File file).
+
+        With streaming=True every .gbs file (including imports) is loaded incrementally with
+        ET.iterparse via streamFile(), instead of building the whole document tree first.
+
+        With cacheFolder set, loading from a path (cases 2 and 4) goes through a SchemaSnapshotCache:
+        the loaded state is stored there and restored directly while neither the root file nor any
+        of its imports change.
+
+        With parallelImports set to "thread" or "process", loading from a path first discovers the whole
+        import closure and parses all its files concurrently in a pool of importWorkers workers; the parsed
+        files are then merged in the usual DFS order, so the result is the same as a serial load.
+        Ignored when streaming.
+
+        With sharedImports=True the files imported by the domain are taken from process-wide read-only
+        BaseLayers (built once and shared by all the domains importing that file): the first one through
+        a copy-on-write overlay (see forkBaseLayer), the next ones from the parsed and validated document
+        of their layer (see loadImport).
+
+        With trusted=True, files whose content hash already passed validation (in this process, or
+        in the cacheFolder if set) are loaded without validateTag/validateTagAttributes checks.
         """
         # Default initializations (Common to all constructors)
         self.types = []
@@ -91,25 +170,45 @@ class DomainData:
         self.removedRelationships = []
         self.domain = None
         self.unions = set()
-        self.axioms = set()
+        self.axioms = AxiomStore()
         self.subjects = []
         self.objects = []
         self.subjRelObjs = set() # Use set, Java used TreeSet (ordered)
-        self.subjRels = defaultdict(list)
-        self.subjObjs = defaultdict(list)
-        self.relSubjs = defaultdict(list)
-        self.relObjs = defaultdict(list)
-        self.objSubjs = defaultdict(list)
-        self.objRels = defaultdict(list)
-        self.subjRel_Objs = defaultdict(list)
-        self.subjObj_Rels = defaultdict(list)
-        self.relObj_Subjs = defaultdict(list)
+        self.subjRelObjsShared = False # True while subjRelObjs is the set of a BaseLayer (see forkBaseLayer)
+        self.subjRels = ReferenceIndex()
+        self.subjObjs = ReferenceIndex()
+        self.relSubjs = ReferenceIndex()
+        self.relObjs = ReferenceIndex()
+        self.objSubjs = ReferenceIndex()
+        self.objRels = ReferenceIndex()
+        self.subjRel_Objs = ReferenceIndex()
+        self.subjObj_Rels = ReferenceIndex()
+        self.relObj_Subjs = ReferenceIndex()
+        self.symbols = SymbolTable() # Shared by the indexes keyed by name IDs and by both trees
+        self.subjPostings = PostingIndex(self.symbols)
+        self.objPostings = PostingIndex(self.symbols)
         self.inverseRels = {}
         self.nRelRefs = 0
         self.webInfFolder = webInfFolder if webInfFolder is not None else "" # Set early if provided
+        self.streaming = streaming # Load files with iterparse (streamFile) instead of ET.parse + loadFile
+        self.cacheFolder = cacheFolder # Folder of the SchemaSnapshotCache, None to always parse
+        if parallelImports not in (None, "thread", "process"):
+            raise ValueError(f"parallelImports must be None, \"thread\" or \"process\", not {parallelImports!r}")
+        self.parallelImports = parallelImports
+        self.importWorkers = importWorkers
+        self.prefetchedFiles: Dict[str, Future] = {} # Absolute path -> parse of the file (prefetchImportClosure)
+        self.sharedImports = sharedImports
+        self.trusted = trusted
+        self.skipValidation = False # True while loading a trusted file that already passed validation
+        self.referenceAdjacency = None # ReferenceAdjacency of the batch queries, built on first use
+        self.generation = 0 # Bumped by every mutating method, see memoized
+        self.memo: Dict[str, Tuple[Tuple[int, ...], Any]] = {} # Derived collection name -> (generationKey, value)
+        # (axioms version, result, parent/3 facts) of the last checkAxioms
+        self.axiomViolations: Optional[Tuple[int, Dict[str, List[Dict[str, Any]]], FrozenSet[Tuple[Any, ...]]]] = None
 
         # Initialize root Entity (matches Java constructor logic)
         self.entityTree = Entity("Entity", None)
+        self.entityTree.setSymbolTable(self.symbols)
         entity_attributes = [
             # Java uses string "true"/"false", let's stick to bool for Pythonic style
             # Ensure Attribute class handles bool or converts internally if needed
@@ -122,7 +221,9 @@ class DomainData:
 
         # Initialize root Relationship (matches Java constructor logic)
         self.relationshipTree = Relationship(name="Relationship", domain=None, inverse="Relationship")
+        self.relationshipTree.setSymbolTable(self.symbols)
         self.relationshipTree.setChildren([]) # Java uses setChildren here too
+        self.postingsVersion = self.referencesKey() # Both empty
 
         # Scaraggi attributes initialization
         self.domainList = None
@@ -137,14 +238,18 @@ class DomainData:
                     raise TypeError("Cannot provide domainName or file when using byte array constructor.")
                 self.webInfFolder = webInfFolder # Already set, but confirm
                 is_ = io.BytesIO(path_or_bytearray)
-                doc = self.parse_stream(is_)
-                root_element = doc.getroot()
-                domain_name_from_bytes = root_element.get("name")
-                if domain_name_from_bytes is None:
-                     raise ValueError("Root <domain> tag must have a 'name' attribute.")
-                self.domain = domain_name_from_bytes # Set domain early like Java
-                # Java passes the extracted domain name as domainPath to loadFile
-                self.loadFile(doc, self.domain)
+                if self.streaming:
+                    # Root name is checked and used as domainPath by streamFile when <domain> opens
+                    self.streamFile(is_, None)
+                else:
+                    doc = self.parse_stream(is_)
+                    root_element = doc.getroot()
+                    domain_name_from_bytes = root_element.get("name")
+                    if domain_name_from_bytes is None:
+                         raise ValueError("Root <domain> tag must have a 'name' attribute.")
+                    self.domain = domain_name_from_bytes # Set domain early like Java
+                    # Java passes the extracted domain name as domainPath to loadFile
+                    self.loadFile(doc, self.domain)
 
             # Case 4: DomainData(String domainName, File file)
             elif domainName is not None and file is not None:
@@ -152,9 +257,8 @@ class DomainData:
                      raise TypeError("Cannot provide path_or_bytearray when using domainName/file constructor.")
                 self.domain = domainName # Set domain explicitly like Java
                 file_path = Path(file)
-                doc = self.parseFile(file_path)
                 # Java passes the absolute path of the file
-                self.loadFile(doc, str(file_path.resolve()))
+                self.loadRootPath(file_path, str(file_path.resolve()))
 
             # Case 2: DomainData(String path)
             elif isinstance(path_or_bytearray, str):
@@ -167,8 +271,7 @@ class DomainData:
                      file_path = Path(path_str)
                      # Use absolute path for consistency and import tracking
                      domain_path_for_load = str(file_path.resolve())
-                     doc = self.parseFile(file_path)
-                     self.loadFile(doc, domain_path_for_load) # Pass absolute path
+                     self.loadRootPath(file_path, domain_path_for_load) # Pass absolute path
                  else:
                      # Assumes path is domain name and needs webInfFolder
                      if not self.webInfFolder:
@@ -176,10 +279,9 @@ class DomainData:
                      file_path = Path(self.webInfFolder) / (path_str + ".gbs")
                      # Use absolute path for consistency
                      domain_path_for_load = str(file_path.resolve())
-                     doc = self.parseFile(file_path)
                      # Java passed 'path' (the domain name) as domainPath here.
                      # Let's pass the absolute path to loadFile for consistency in getFolderPath.
-                     self.loadFile(doc, domain_path_for_load)
+                     self.loadRootPath(file_path, domain_path_for_load)
 
             # Case 1: DomainData() (Default constructor)
             elif path_or_bytearray is None and webInfFolder is None and domainName is None and file is None:
@@ -236,6 +338,266 @@ class DomainData:
             print(f"Error parsing file {file_path}: {e}")
             raise
 
+    # Attributes describing how this instance loads files, not what was loaded: never stored in snapshots
+    SNAPSHOT_EXCLUDED: ClassVar[FrozenSet[str]] = frozenset({
+        "streaming", "cacheFolder", "webInfFolder", "parallelImports", "importWorkers", "prefetchedFiles", "sharedImports",
+        "trusted", "skipValidation", "referenceAdjacency", "memo", "axiomViolations"})
+
+    # Method: loadRootPath (internal helper, not in Java)
+    def loadRootPath(self, file_path: Path, domainPath: str) -> None:
+        """
+        Loads the root .gbs file of this DomainData through loadPath, restoring the state from the
+        snapshot cache instead when one is configured and holds an up to date snapshot.
+        The snapshot is keyed by the content hashes of the root file and of every imported file.
+        """
+        if self.cacheFolder is None:
+            self.loadImportClosure(file_path, domainPath)
+            return
+
+        if not file_path.is_file():
+            raise FileNotFoundError(f"File not found: {file_path}")
+        cache = SchemaSnapshotCache(self.cacheFolder)
+        # A domain name forced by the caller (case 4) changes the loaded state, so it's part of the key
+        forcedDomain = self.domain
+        snapshot = cache.load(domainPath, forcedDomain)
+        if snapshot is not None:
+            self.__dict__.update(snapshot)
+            self.bumpGeneration()
+            return
+
+        self.loadImportClosure(file_path, domainPath)
+        state = {k: v for k, v in self.__dict__.items() if k not in self.SNAPSHOT_EXCLUDED}
+        try:
+            cache.store(domainPath, forcedDomain, self.importedFiles, state)
+        except Exception as e:
+            # The domain is loaded anyway, a cache that can't be written is not fatal
+            print(f"Warning: Could not store schema snapshot for {file_path}: {e}")
+
+    # Method: loadImportClosure (internal helper, not in Java)
+    def loadImportClosure(self, file_path: Path, domainPath: str) -> None:
+        """
+        Loads the root .gbs file and, through parseImports, all its imports with loadPath.
+        If parallelImports is set, all the files are parsed concurrently beforehand by prefetchImportClosure.
+        """
+        if self.parallelImports is None or self.streaming:
+            self.loadPath(file_path, domainPath)
+            return
+        try:
+            self.prefetchImportClosure(file_path)
+            self.loadPath(file_path, domainPath)
+        finally:
+            self.prefetchedFiles.clear()
+
+    # Method: prefetchImportClosure (internal helper, not in Java)
+    def prefetchImportClosure(self, file_path: Path) -> None:
+        """
+        Parses the root .gbs file and every file reachable through its <import> tags in a thread or
+        process pool, filling prefetchedFiles. Imports are discovered as soon as the file declaring them
+        is parsed, so the pool works on a whole level of the import graph at once.
+        Nothing is loaded here: loadPath consumes the parsed files later, in DFS order.
+        Parse errors are kept in the futures and raised by loadPath when (and if) the file is reached.
+        """
+        pool_class = ThreadPoolExecutor if self.parallelImports == "thread" else ProcessPoolExecutor
+        pending: Dict[Future, Path] = {} # Future -> folder used to resolve the imports of its file
+
+        with pool_class(max_workers=self.importWorkers) as executor:
+            def submit(path: Path) -> None:
+                abs_path_str = str(path.resolve())
+                if abs_path_str not in self.prefetchedFiles:
+                    future = executor.submit(parseGbsFile, abs_path_str)
+                    self.prefetchedFiles[abs_path_str] = future
+                    pending[future] = Path(abs_path_str).parent
+
+            submit(file_path)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    folder = pending.pop(future)
+                    if future.exception() is not None:
+                        continue
+                    imports_node = future.result().getroot().find("imports")
+                    if imports_node is None:
+                        continue
+                    for import_node in imports_node.findall("import"):
+                        schema_path_str = import_node.get("schema")
+                        if schema_path_str:
+                            submit(self.resolveImportPath(folder, schema_path_str))
+
+    # Method: loadPath (internal helper, not in Java)
+    def loadPath(self, file_path: Path, domainPath: str, validated: bool = False) -> None:
+        """
+        Loads the .gbs file at file_path into this DomainData, either by building the whole
+        ElementTree first (parseFile + loadFile) or incrementally (streamFile) if streaming is enabled.
+        In trusted mode, validation is skipped if the content hash of the file already passed it.
+
+        Args:
+            file_path: The file to load.
+            domainPath: The path recorded for the file.
+            validated: True if the current content of the file is known to be valid (e.g. a BaseLayer
+                       was just built from it), to skip validation in any mode.
+        """
+        content_hash = SchemaSnapshotCache.fileHash(file_path) if self.trusted and not validated and file_path.is_file() else None
+        already_validated = validated or (content_hash is not None and self.isValidated(content_hash))
+        previous_skip = self.skipValidation
+        self.skipValidation = already_validated
+        try:
+            if self.streaming:
+                if not file_path.is_file():
+                    raise FileNotFoundError(f"File not found: {file_path}")
+                self.streamFile(file_path, domainPath)
+            else:
+                prefetched = self.prefetchedFiles.pop(str(file_path.resolve()), None)
+                doc = prefetched.result() if prefetched is not None else self.parseFile(file_path)
+                self.loadFile(doc, domainPath)
+        finally:
+            self.skipValidation = previous_skip
+        if content_hash is not None and not already_validated:
+            self.markValidated(content_hash)
+
+    # Method: isValidated (internal helper, not in Java)
+    def isValidated(self, content_hash: str) -> bool:
+        """Checks if a file with the given content hash already passed validation (trusted mode)."""
+        if content_hash in DomainData.validatedFiles:
+            return True
+        if self.cacheFolder is not None and SchemaSnapshotCache(self.cacheFolder).isValidated(content_hash):
+            DomainData.validatedFiles.add(content_hash)
+            return True
+        return False
+
+    # Method: markValidated (internal helper, not in Java)
+    def markValidated(self, content_hash: str) -> None:
+        """Records that a file with the given content hash passed validation (trusted mode)."""
+        DomainData.validatedFiles.add(content_hash)
+        if self.cacheFolder is not None:
+            try:
+                SchemaSnapshotCache(self.cacheFolder).markValidated(content_hash)
+            except OSError as e:
+                print(f"Warning: Could not record validated file in {self.cacheFolder}: {e}")
+
+    # Method: streamFile (internal helper, not in Java)
+    def streamFile(self, source: Path | io.BytesIO, domainPath: Optional[str]) -> None:
+        """
+        Streaming counterpart of loadFile, built on ET.iterparse.
+        Entities and relationships are found or created when their start tag is read, attributes
+        and references are built when their end tag is read, and every processed element is then
+        cleared and dropped from its parent, so memory stays bounded by the nesting depth instead of
+        the document size. The small <imports>, <user-types>, <union_entities> and <axioms> sections
+        are collected whole and handed to the usual parse helpers.
+        If domainPath is None (byte array constructor) the domain name is used, like Java does.
+        """
+        section_order = ["imports", "user-types", "entities", "union_entities", "relationships", "axioms"]
+        mandatory_sections = ["entities", "relationships"]
+        next_section = 0 # Index in section_order of the first section still allowed
+
+        webInf = Path(self.webInfFolder)
+        domainName: Optional[str] = None
+        elements: List[ET.Element] = [] # Open elements, root first
+        # What to do with each open element: "root", "section", "entity", "relationship", "attribute", "reference" or "skip"
+        actions: List[str] = []
+        owners: List[Optional[Entity]] = [] # Entity/Relationship each open element belongs to (None if not applicable)
+        # Attributes read so far for each open element; added in one addAttributes call when an entity/relationship ends, like loadFile
+        attribute_batches: List[List[Attribute]] = []
+
+        source_arg = str(source) if isinstance(source, Path) else source
+        for event, elem in ET.iterparse(source_arg, events=("start", "end")):
+            if event == "start":
+                parent_action = actions[-1] if actions else None
+                owner: Optional[Entity] = owners[-1] if owners else None
+                action = "skip"
+
+                if parent_action is None:
+                    # Root <domain> tag: validate like loadFile and resolve the folder used for imports
+                    domain_name_attr = self.readDomainRoot(elem, domainPath or elem.get("name", ""))
+                    if domainPath is None:
+                        domainPath = domain_name_attr
+                    webInf = Path(self.getFolderPath(domainPath)[1])
+                    domainName = self.domain or domain_name_attr
+                    action = "root"
+
+                elif parent_action == "root":
+                    # Sections must follow loadFile's order, mandatory ones can't be skipped
+                    if elem.tag in section_order[next_section:]:
+                        section_index = section_order.index(elem.tag, next_section)
+                    else:
+                        section_index = len(section_order)
+                    missing = [t for t in section_order[next_section:section_index] if t in mandatory_sections]
+                    if missing:
+                        raise ValueError(f"Missing mandatory <{missing[0]}> section in domain '{domainName}' file: {domainPath}")
+                    if section_index == len(section_order):
+                        raise ValueError(f"Unexpected tag <{elem.tag}> found in <domain> tag in {domainPath}. Allowed order: {section_order}")
+                    next_section = section_index + 1
+                    action = "section"
+                    if elem.tag == "entities":
+                        owner = self.entityTree
+                    elif elem.tag == "relationships":
+                        owner = self.relationshipTree
+
+                elif parent_action == "section" and elem.tag == "entity" and owner is self.entityTree:
+                    action = "entity"
+                    owner = self.parseEntity(elem, owner, domainName, self.TAGS_TOP_ENTITY)
+                elif parent_action == "entity" and elem.tag == "entity":
+                    action = "entity"
+                    owner = self.parseEntity(elem, owner, domainName, self.TAGS_SUB_ENTITY)
+                elif parent_action == "section" and elem.tag == "relationship" and owner is self.relationshipTree:
+                    action = "relationship"
+                    owner = self.parseRelationship(elem, owner, domainName, self.TAGS_TOP_RELATIONSHIP)
+                elif parent_action == "relationship" and elem.tag == "relationship":
+                    action = "relationship"
+                    owner = self.parseRelationship(elem, owner, domainName, self.TAGS_SUB_RELATIONSHIP)
+                elif parent_action in ("entity", "relationship") and elem.tag == "attribute":
+                    action = "attribute"
+                elif parent_action == "relationship" and elem.tag == "reference":
+                    action = "reference"
+                elif parent_action in ("attribute", "reference", "keep") or (parent_action == "section" and owner is None):
+                    # Children of collected sections/attributes/references are kept until their parent ends
+                    action = "keep"
+
+                elements.append(elem)
+                actions.append(action)
+                owners.append(owner)
+                attribute_batches.append([])
+                continue
+
+            # --- end event ---
+            elements.pop()
+            action = actions.pop()
+            owner = owners.pop()
+            attribute_batch = attribute_batches.pop()
+
+            if action == "keep":
+                continue # Still needed by the enclosing section/attribute/reference
+            if action == "root":
+                missing = [t for t in section_order[next_section:] if t in mandatory_sections]
+                if missing:
+                    raise ValueError(f"Missing mandatory <{missing[0]}> section in domain '{domainName}' file: {domainPath}")
+                break
+
+            if action == "section":
+                if elem.tag == "imports":
+                    self.parseImports(webInf, elem)
+                elif elem.tag == "user-types":
+                    self.parseTypes(webInf, elem)
+                elif elem.tag == "union_entities":
+                    self.parseUnionEntities(elem, domainName)
+                elif elem.tag == "axioms":
+                    self.parseAxioms(elem, domainName)
+                # <entities>/<relationships> were handled child by child
+            elif action in ("entity", "relationship"):
+                owner.addAttributes(attribute_batch)
+            elif action == "attribute":
+                attribute_batches[-1].append(self.readAttribute(elem))
+            elif action == "reference":
+                self.parseReference(elem, owner)
+
+            # Free the processed element (its data now lives in the domain objects)
+            elem.clear()
+            if elements:
+                elements[-1].remove(elem)
+
+        # Sort subjects and objects (matches Java)
+        self.subjects.sort()
+        self.objects.sort()
+
     # Method: getFolderPath (private in Java) - Renamed
     # Note: Java returns Vector<String>, Python returns List[str]
     def getFolderPath(self, domainPath: str) -> List[str]:
@@ -267,12 +629,14 @@ class DomainData:
 
     # Method: validateTag (private in Java) - Renamed
     # Note: Java takes org.w3c.dom.Node, Python takes ET.Element
-    def validateTag(self, tag: ET.Element, validTags: List[str]) -> None:
+    def validateTag(self, tag: ET.Element, validTags: Collection[str]) -> None:
         """
-        Validates a tag against a list of valid tags.
+        Validates a tag against a list of valid tags (usually one of the compiled TAGS_* rules).
         Raises ValueError if the tag is not found in the list of valid tags.
         Internal helper corresponding to Java's private void validateTag(Node tag, List<String> validTags).
         """
+        if self.skipValidation:
+            return
         if tag.tag not in validTags:
             # Attempt to mimic Java error message (parent info might be hard with ET)
             # Java: "Invalid tag <"+tag.getNodeName()+"> found under <"+tag.getParentNode().getNodeName()+" "+(tag.getParentNode().getAttributes().getNamedItem("name")==null?"":tag.getParentNode().getAttributes().getNamedItem("name"))+"> where one of "+validTags+" was expected"
@@ -280,28 +644,32 @@ class DomainData:
             # Finding parent reliably in ET requires extra work (e.g., parent map or lxml)
             # For now, provide a simpler error message.
             raise ValueError(
-                f"Invalid tag <{tag.tag}> found where one of {validTags} was expected"
+                f"Invalid tag <{tag.tag}> found where one of {list(validTags)} was expected"
                 # Consider adding parent info if a parent map is maintained during parsing
             )
 
     # Method: validateTagAttributes (private in Java) - Renamed
     # Note: Java takes org.w3c.dom.Node, Python takes ET.Element
-    def validateTagAttributes(self, tag: ET.Element, validTagAttributes: List[str], identifier: str) -> None:
+    def validateTagAttributes(self, tag: ET.Element, validTagAttributes: Collection[str], identifier: str) -> None:
         """
-        Validates the attributes of a given XML tag against a list of valid attributes.
-        Raises ValueError if any invalid attribute is found.
+        Validates the attributes of a given XML tag against a list of valid attributes (usually one of
+        the compiled ATTRS_* rules). Raises ValueError if any invalid attribute is found.
+        The error message is only built when validation fails.
         Internal helper corresponding to Java's private void validateTagAttributes(Node tag, List<String> validTagAttributes, String identifier).
         """
-        tag_id_val = tag.get(identifier, "") if identifier else "" # Get identifier value if specified
-        # Java error includes identifier value if present: "<"+tag.getNodeName()+" "+(tag.getAttributes().getNamedItem(identifier)==null?"":tag.getAttributes().getNamedItem(identifier))+">"
-        tag_id_str = f"{identifier}='{tag_id_val}'" if identifier and tag_id_val else ""
-        tag_repr = f"<{tag.tag} {tag_id_str}>".strip()
-
+        if self.skipValidation:
+            return
+        if isinstance(validTagAttributes, ValidationRule) and validTagAttributes.allows(tag.attrib):
+            return
         for attr_name in tag.attrib:
             if attr_name not in validTagAttributes:
+                tag_id_val = tag.get(identifier, "") if identifier else "" # Get identifier value if specified
+                # Java error includes identifier value if present: "<"+tag.getNodeName()+" "+(tag.getAttributes().getNamedItem(identifier)==null?"":tag.getAttributes().getNamedItem(identifier))+">"
+                tag_id_str = f"{identifier}='{tag_id_val}'" if identifier and tag_id_val else ""
+                tag_repr = f"<{tag.tag} {tag_id_str}>".strip()
                 raise ValueError(
                     f"Invalid attribute \"{attr_name}\" found in {tag_repr} "
-                    f"where one of {validTagAttributes} was expected"
+                    f"where one of {list(validTagAttributes)} was expected"
                 )
 
     # Method: loadFile (private in Java) - Renamed
@@ -319,23 +687,7 @@ class DomainData:
         root_element = doc.getroot()
 
         # --- Validation ---
-        # Validate root tag is <domain>
-        if root_element.tag != "domain":
-             raise ValueError(f"Expected root tag <domain>, but found <{root_element.tag}> in {domainPath}") # Java throws Exception
-
-        # Validate domain name attribute
-        domain_name_attr = root_element.get("name")
-        if domain_name_attr is None:
-             # Java gets attribute and checks null later, but error message implies it checks here
-             raise ValueError(f"Root tag <domain> must have a 'name' attribute in {domainPath}") # Java throws Exception
-
-        # Set domain if not already set (matches Java logic)
-        if self.domain is None:
-            self.domain = domain_name_attr
-        # Java doesn't explicitly check for domain mismatch here, seems to allow overwriting/merging later.
-        # Let's keep the warning for clarity in Python.
-        elif self.domain != domain_name_attr and domainPath not in self.importedFiles:
-             print(f"Warning: Loading file with domain '{domain_name_attr}' into existing domain '{self.domain}' from {domainPath}")
+        domain_name_attr = self.readDomainRoot(root_element, domainPath)
 
         # --- Process Child Elements ---
         # Java uses index-based access and checks node names. Python uses iteration and tag checks.
@@ -395,17 +747,40 @@ class DomainData:
         self.subjects.sort()
         self.objects.sort()
 
+    # Method: readDomainRoot (internal helper, not in Java)
+    def readDomainRoot(self, root_element: ET.Element, domainPath: str) -> str:
+        """
+        Validates the root <domain> tag and sets the domain name if not already set.
+        Shared by loadFile and streamFile. Returns the 'name' attribute of the root tag.
+        """
+        # Validate root tag is <domain>
+        if root_element.tag != "domain":
+             raise ValueError(f"Expected root tag <domain>, but found <{root_element.tag}> in {domainPath}") # Java throws Exception
+
+        # Validate domain name attribute
+        domain_name_attr = root_element.get("name")
+        if domain_name_attr is None:
+             # Java gets attribute and checks null later, but error message implies it checks here
+             raise ValueError(f"Root tag <domain> must have a 'name' attribute in {domainPath}") # Java throws Exception
+
+        # Set domain if not already set (matches Java logic)
+        if self.domain is None:
+            self.domain = domain_name_attr
+        # Java doesn't explicitly check for domain mismatch here, seems to allow overwriting/merging later.
+        # Let's keep the warning for clarity in Python.
+        elif self.domain != domain_name_attr and domainPath not in self.importedFiles:
+             print(f"Warning: Loading file with domain '{domain_name_attr}' into existing domain '{self.domain}' from {domainPath}")
+        return domain_name_attr
+
     # Method: parseAxioms (private in Java) - Renamed
     def parseAxioms(self, axioms_tag: ET.Element, domainName: str) -> None:
         """
         Parses the axioms from the given XML node and adds them to the set of axioms.
         Internal helper for Java's private void parseAxioms(Node axioms_tag, String domainName).
         """
-        # Java valid attributes: "name","formalism","rule"
-        valid_axiom_attrs = ["name", "formalism", "rule"]
         for axiom_node in axioms_tag.findall("axiom"):
             self.validateTag(axiom_node, ["axiom"])
-            self.validateTagAttributes(axiom_node, valid_axiom_attrs, "name")
+            self.validateTagAttributes(axiom_node, self.ATTRS_AXIOM, "name") # Java: "name","formalism","rule"
 
             name = axiom_node.get("name")
             formalism = axiom_node.get("formalism")
@@ -424,7 +799,7 @@ class DomainData:
             # Python set add doesn't return value, check membership first
             if new_axiom in self.axioms:
                  # Check if the existing one has the same domain (Java error condition)
-                 existing = next((a for a in self.axioms if a == new_axiom), None)
+                 existing = self.axioms.get(name)
                  if existing and existing.getDomain() == domainName:
                       raise ValueError(f"Duplicate Axiom: \"{name}\" in domain \"{domainName}\"")
                  # If domains differ, Java logic seems unclear. Python set will just ignore the duplicate.
@@ -438,12 +813,10 @@ class DomainData:
         Internal helper for Java's private void parseUnionEntities(Node union_entities, String domainName).
         """
         unions_to_add: List[Union] = []
-        valid_union_attrs = ["name"]
-        valid_uvalue_attrs = ["name"] # For <uvalue> tag
 
         for union_node in union_entities_tag.findall("union"):
             self.validateTag(union_node, ["union"])
-            self.validateTagAttributes(union_node, valid_union_attrs, "name")
+            self.validateTagAttributes(union_node, self.ATTRS_NAME, "name")
 
             union_name = union_node.get("name")
             if not union_name:
@@ -469,6 +842,7 @@ class DomainData:
         Adds a list of Union objects to the domain, checking for duplicates and valid entity references.
         Internal helper for Java's private void addUnions(List<Union> _unions).
         """
+        self.bumpGeneration()
         # Check that all uvalues are existing entities
         for union_obj in _unions:
             for entity_name in union_obj.getValues():
@@ -497,6 +871,7 @@ class DomainData:
     # Method: addEntity (public in Java)
     def addEntity(self, entity: Entity) -> None:
         """Adds a top-level entity to the domain, replacing any existing top-level entity with the same name."""
+        self.bumpGeneration()
         if not isinstance(entity, Entity):
             raise TypeError("Can only add Entity objects")
 
@@ -520,8 +895,10 @@ class DomainData:
     # Method: addRelationship (public in Java)
     def addRelationship(self, relationship: Relationship) -> None:
         """Adds a top-level relationship to the domain, replacing any existing top-level relationship with the same name."""
+        self.bumpGeneration()
         if not isinstance(relationship, Relationship):
             raise TypeError("Can only add Relationship objects")
+        inSync = self.postingsInSync()
 
         # Java logic: find existing, remove if found, then add.
         existing_rel = next((r for r in self.getTopRelationships() if r.getName() == relationship.getName()), None)
@@ -537,9 +914,62 @@ class DomainData:
                  print(f"Warning: Could not remove existing relationship '{relationship.getName()}' during replacement: {e}")
             # Detach old relationship?
             # existing_rel.setParent(None) # Optional cleanup
+            self.updatePostings(existing_rel, removed=True)
 
         # Java uses addChild for relationships too
         self.relationshipTree.addChild(relationship) # Assuming addChild works for Relationships too and sets parent
+        self.updatePostings(relationship, removed=False)
+        self.postingsUpdated(inSync)
+
+    # Method: updatePostings (internal helper, not in Java)
+    def updatePostings(self, relationship: Relationship, removed: bool) -> None:
+        """
+        Adds (or removes) the references of relationship and of its sub-relationships to the posting
+        lists of getRelationshipsWithSubj/WithObj, for relationships built outside parseReference.
+        """
+        for rel in relationship.iterSubtree():
+            for ref in rel.getReferences():
+                if not ref.getSubject() or not ref.getObject():
+                    continue
+                if removed:
+                    self.subjPostings.discard(ref.getSubject(), rel.getName())
+                    self.objPostings.discard(ref.getObject(), rel.getName())
+                else:
+                    self.subjPostings.add(ref.getSubject(), rel.getName())
+                    self.objPostings.add(ref.getObject(), rel.getName())
+
+    # Method: referencesKey (internal helper, not in Java)
+    def referencesKey(self) -> Tuple[int, int]:
+        """Gets the structure and references versions of the relationship tree, which change with any reference it holds."""
+        return self.relationshipTree.structureVersion, self.relationshipTree.referencesVersion
+
+    # Method: postingsInSync (internal helper, not in Java)
+    def postingsInSync(self) -> bool:
+        """Tells whether subjPostings and objPostings reflect every reference of the relationship tree."""
+        return self.postingsVersion == self.referencesKey()
+
+    # Method: postingsUpdated (internal helper, not in Java)
+    def postingsUpdated(self, inSync: bool) -> None:
+        """
+        Marks the postings up to date after a change of the relationship tree made by this class, which
+        updated them too, if they were up to date before the change (inSync, from postingsInSync).
+        """
+        if inSync:
+            self.postingsVersion = self.referencesKey()
+
+    # Method: getPostings (internal helper, not in Java)
+    def getPostings(self) -> Tuple[PostingIndex, PostingIndex]:
+        """
+        Gets subjPostings and objPostings, rebuilt from the relationship tree first if it was changed
+        directly (e.g. with Relationship.addReference) since they were last updated.
+        """
+        if not self.postingsInSync():
+            self.subjPostings = PostingIndex(self.symbols)
+            self.objPostings = PostingIndex(self.symbols)
+            for top in self.relationshipTree.getChildren():
+                self.updatePostings(top, removed=False)
+            self.postingsVersion = self.referencesKey()
+        return self.subjPostings, self.objPostings
 
     # Method: parseRelationships (private in Java) - Renamed
     def parseRelationships(self, parentNode: ET.Element, root: Relationship, domainName: str) -> None:
@@ -547,79 +977,88 @@ class DomainData:
         Recursively constructs the relationships tree by parsing relationships and their attributes, references, and sub-relationships.
         Internal helper for Java's private void parseRelationships(Node parentNode, Relationship root, String domainName).
         """
-        # Java valid attributes: "name","inverse","description","abstract"
-        # Python version also had "notes". Let's match Java for now.
-        valid_rel_attrs = ["name", "inverse", "description", "abstract", "notes"] # Keep notes for now, Java might miss it in validation list
         # Determine allowed children based on whether we are at the top <relationships> or inside a <relationship>
-        allowed_children = ["relationship"] if root == self.relationshipTree else ["relationship", "attribute", "reference"]
+        allowed_children = self.TAGS_TOP_RELATIONSHIP if root == self.relationshipTree else self.TAGS_SUB_RELATIONSHIP
 
         # Filter for relationship elements first
         relationship_nodes = [child for child in parentNode if isinstance(child.tag, str) and child.tag == "relationship"]
 
         for rel_node in relationship_nodes: # Iterate through direct children that are <relationship>
-             self.validateTag(rel_node, allowed_children) # Validate allowed children in this context
-             self.validateTagAttributes(rel_node, valid_rel_attrs, "name") # Validate attributes of <relationship>
-
-             rel_name = rel_node.get("name")
-             rel_inverse = rel_node.get("inverse")
-             description = rel_node.get("description")
-             notes = rel_node.get("notes") # Get notes attribute
-             is_abstract_str = rel_node.get("abstract", "false") # Default to false if missing
-             is_abstract = is_abstract_str.lower() == "true"
-
-             if not rel_name or not rel_inverse:
-                  raise ValueError("<relationship> tag requires 'name' and 'inverse' attributes.") # Java doesn't check null here
-
-             # Find existing relationship anywhere in the tree first (Java logic)
-             existing_relationship = self.findInTree(self.relationshipTree, rel_name)
-             current_relationship: Optional[Relationship] = None
-
-             if existing_relationship and isinstance(existing_relationship, Relationship):
-                  # Relationship already exists somewhere
-                  existing_parent = existing_relationship.getParent()
-                  # Check if the found relationship's parent is an ancestor of the current root OR if the parent is the absolute root
-                  # AND if the domain is different (indicating it came from an import)
-                  is_ancestor = root.hasAncestor(existing_parent.getName()) if existing_parent else False
-                  is_different_domain = existing_relationship.getDomain() != domainName
-
-                  if (is_ancestor or existing_parent == self.relationshipTree) and is_different_domain:
-                       print(f"Detaching and moving relationship '{rel_name}' from '{existing_parent.getName() if existing_parent else 'root'}' (domain: {existing_relationship.getDomain()}) to '{root.getName()}' (domain: {domainName})")
-                       existing_relationship.detach() # Remove from old parent
-                       root.addChild(existing_relationship) # Add to new parent (sets parent) - Java uses addChild
-                       current_relationship = existing_relationship
-                  elif existing_parent == root:
-                       # Already in the correct place, just update properties
-                       print(f"Updating existing relationship '{rel_name}' under parent '{root.getName()}'")
-                       current_relationship = existing_relationship
-                  else:
-                       # Inconsistency: Found elsewhere but not in a compatible import/parent situation
-                       raise ValueError(f"Inconsistency: Relationship '{rel_name}' found under unexpected parent '{existing_parent.getName() if existing_parent else 'root'}'. Cannot automatically move to '{root.getName()}'.") # Java throws Exception
-             else:
-                  # Relationship is new, create it
-                  print(f"Creating new relationship '{rel_name}' under parent '{root.getName()}'")
-                  # Java constructor: new Relationship(domainName, relationName, relationInverse);
-                  current_relationship = Relationship(name=rel_name, domain=domainName, inverse=rel_inverse)
-                  root.addChild(current_relationship) # Adds to children and sets parent
-
-             # Update properties of the (potentially existing or new) relationship
-             if current_relationship:
-                  current_relationship.setDomain(domainName) # Overwrite domain like Java
-                  current_relationship.setDescription(description or "") # Use empty string if None
-                  current_relationship.setAbstract(is_abstract)
-                  current_relationship.setNotes(notes or "") # Use empty string if None
-
-                  # Add attributes defined directly within this <relationship> tag
-                  direct_attributes = self.readAttributes(rel_node)
-                  current_relationship.addAttributes(direct_attributes) # Add new attributes
-
-                  # Parse references defined directly within this <relationship> tag
-                  self.parseReferences(rel_node, current_relationship)
-
-                  # Recursively parse sub-relationships
-                  self.parseRelationships(rel_node, current_relationship, domainName)
+             current_relationship = self.parseRelationship(rel_node, root, domainName, allowed_children)
+
+             # Add attributes defined directly within this <relationship> tag
+             direct_attributes = self.readAttributes(rel_node)
+             current_relationship.addAttributes(direct_attributes) # Add new attributes
+
+             # Parse references defined directly within this <relationship> tag
+             self.parseReferences(rel_node, current_relationship)
+
+             # Recursively parse sub-relationships
+             self.parseRelationships(rel_node, current_relationship, domainName)
+
+    # Method: parseRelationship (internal helper, not in Java)
+    def parseRelationship(self, rel_node: ET.Element, root: Relationship, domainName: str, allowed_children: Collection[str]) -> Relationship:
+        """
+        Validates a single <relationship> tag, finds or creates the matching Relationship under root
+        and updates its properties. Only the tag and its XML attributes are read, not its children,
+        so streamFile can call it as soon as the tag opens.
+        """
+        # Java valid attributes: "name","inverse","description","abstract"
+        # Python version also had "notes" (ATTRS_RELATIONSHIP), Java might miss it in validation list
+
+        self.validateTag(rel_node, allowed_children) # Validate allowed children in this context
+        self.validateTagAttributes(rel_node, self.ATTRS_RELATIONSHIP, "name") # Validate attributes of <relationship>
+
+        rel_name = rel_node.get("name")
+        rel_inverse = rel_node.get("inverse")
+        description = rel_node.get("description")
+        notes = rel_node.get("notes") # Get notes attribute
+        is_abstract_str = rel_node.get("abstract", "false") # Default to false if missing
+        is_abstract = is_abstract_str.lower() == "true"
+
+        if not rel_name or not rel_inverse:
+             raise ValueError("<relationship> tag requires 'name' and 'inverse' attributes.") # Java doesn't check null
+
+        # Find existing relationship anywhere in the tree first (Java logic)
+        inSync = self.postingsInSync() # Moving or adding a relationship keeps the postings (keyed by name) valid
+        existing_relationship = self.findInTree(self.relationshipTree, rel_name)
+        current_relationship: Optional[Relationship] = None
+
+        if existing_relationship and isinstance(existing_relationship, Relationship):
+             # Relationship already exists somewhere
+             existing_parent = existing_relationship.getParent()
+             # Check if the found relationship's parent is an ancestor of the current root OR if the parent is the absolute root
+             # AND if the domain is different (indicating it came from an import)
+             is_ancestor = root.hasAncestor(existing_parent.getName()) if existing_parent else False
+             is_different_domain = existing_relationship.getDomain() != domainName
+
+             if (is_ancestor or existing_parent == self.relationshipTree) and is_different_domain:
+                  print(f"Detaching and moving relationship '{rel_name}' from '{existing_parent.getName() if existing_parent else 'root'}' (domain: {existing_relationship.getDomain()}) to '{root.getName()}' (domain: {domainName})")
+                  existing_relationship.detach() # Remove from old parent
+                  root.addChild(existing_relationship) # Add to new parent (sets parent) - Java uses addChild
+                  current_relationship = existing_relationship
+             elif existing_parent == root:
+                  # Already in the correct place, just update properties
+                  print(f"Updating existing relationship '{rel_name}' under parent '{root.getName()}'")
+                  current_relationship = existing_relationship
              else:
-                  # This case should ideally not happen if logic above is correct
-                  print(f"Error: Failed to get or create relationship '{rel_name}'")
+                  # Inconsistency: Found elsewhere but not in a compatible import/parent situation
+                  raise ValueError(f"Inconsistency: Relationship '{rel_name}' found under unexpected parent '{existing_parent.getName() if existing_parent else 'root'}'. Cannot automatically move to '{root.getName()}'.") # Java throws Exception
+        else:
+             # Relationship is new, create it
+             print(f"Creating new relationship '{rel_name}' under parent '{root.getName()}'")
+             # Java constructor: new Relationship(domainName, relationName, relationInverse);
+             current_relationship = Relationship(name=rel_name, domain=domainName, inverse=rel_inverse)
+             root.addChild(current_relationship) # Adds to children and sets parent
+
+        self.postingsUpdated(inSync)
+
+        # Update properties of the (potentially existing or new) relationship
+        current_relationship.setDomain(domainName) # Overwrite domain like Java
+        current_relationship.setDescription(description or "") # Use empty string if None
+        current_relationship.setAbstract(is_abstract)
+        current_relationship.setNotes(notes or "") # Use empty string if None
+        return current_relationship
 
     # Method: parseReferences (private in Java) - Renamed
     def parseReferences(self, parentNode: ET.Element, relation: Relationship) -> None:
@@ -627,56 +1066,69 @@ class DomainData:
         Parses the references from the given parent node (<relationship>) and adds them to the specified relationship.
         Internal helper for Java's private void parseReferences(Node parentNode, Relationship relation).
         """
-        relation_name = relation.getName()
-        # Java valid attributes: "subject","object"
-        valid_ref_attrs = ["subject", "object"]
-        # Java valid attributes for attributes within reference: "name","datatype","description","mandatory","distinguishing","display","target","notes"
-        valid_attr_attrs = ["name", "datatype", "description", "mandatory",
-                            "distinguishing", "display", "target", "notes"]
-
         for ref_node in parentNode.findall("reference"):
-             self.validateTagAttributes(ref_node, valid_ref_attrs, "") # Validate reference attributes
-
-             subject = ref_node.get("subject")
-             object_ref = ref_node.get("object") # Renamed variable to avoid conflict with keyword
-
-             if not subject or not object_ref:
-                  raise ValueError("<reference> tag requires 'subject' and 'object' attributes.") # Java doesn't check null
-
-             # Add subject/object to global lists if not present (Java logic)
-             if subject not in self.subjects:
-                  self.subjects.append(subject)
-                  # Java sorts later
-
-             if object_ref not in self.objects:
-                  self.objects.append(object_ref)
-                  # Java sorts later
-
-             # Create Reference object (Java: new Reference(subject, object))
-             ref = Reference(subject=subject, object=object_ref)
+             self.parseReference(ref_node, relation)
 
-             # Read attributes specific to this reference (Java: ref.setAttributes(readAttributes(node)))
-             ref_attributes = self.readAttributes(ref_node) # Attributes can be children of <reference>
-             if ref_attributes:
-                  ref.setAttributes(ref_attributes) # Assuming setAttributes takes a list
-
-             # Add reference to the relationship (Java: relation.addReference(ref))
-             relation.addReference(ref) # Assuming addReference handles internal storage
-
-             # Update helper dictionaries and sets (Java logic)
-             self.nRelRefs += 1
-             subj_rel_obj_str = f"{subject}.{relation_name}.{object_ref}"
-             self.subjRelObjs.add(subj_rel_obj_str) # Python set is unordered, Java TreeSet is ordered
-
-             self.addValue(self.subjRels, subject, relation_name)
-             self.addValue(self.subjObjs, subject, object_ref)
-             self.addValue(self.relSubjs, relation_name, subject)
-             self.addValue(self.relObjs, relation_name, object_ref)
-             self.addValue(self.objRels, object_ref, relation_name)
-             self.addValue(self.objSubjs, object_ref, subject)
-             self.addValue(self.subjRel_Objs, f"{subject}.{relation_name}", object_ref)
-             self.addValue(self.subjObj_Rels, f"{subject}.{object_ref}", relation_name)
-             self.addValue(self.relObj_Subjs, f"{relation_name}.{object_ref}", subject)
+    # Method: parseReference (internal helper, not in Java)
+    def parseReference(self, ref_node: ET.Element, relation: Relationship) -> None:
+        """
+        Parses a single <reference> tag (and its <attribute> children), adds the Reference to the
+        relationship and updates the helper dictionaries. Used by parseReferences and streamFile.
+        """
+        self.bumpGeneration()
+        relation_name = relation.getName()
+        # Java valid attributes: "subject","object"
+        self.validateTagAttributes(ref_node, self.ATTRS_REFERENCE, "") # Validate reference attributes
+
+        subject = ref_node.get("subject")
+        object_ref = ref_node.get("object") # Renamed variable to avoid conflict with keyword
+
+        if not subject or not object_ref:
+             raise ValueError("<reference> tag requires 'subject' and 'object' attributes.") # Java doesn't check null
+        # One shared string per name, instead of one per <reference> in every index
+        subject = self.symbols.canonical(subject)
+        object_ref = self.symbols.canonical(object_ref)
+
+        # Add subject/object to global lists if not present (Java logic)
+        if subject not in self.subjects:
+             self.subjects.append(subject)
+             # Java sorts later
+
+        if object_ref not in self.objects:
+             self.objects.append(object_ref)
+             # Java sorts later
+
+        # Create Reference object (Java: new Reference(subject, object))
+        ref = Reference(subject=subject, object=object_ref)
+
+        # Read attributes specific to this reference (Java: ref.setAttributes(readAttributes(node)))
+        ref_attributes = self.readAttributes(ref_node) # Attributes can be children of <reference>
+        if ref_attributes:
+             ref.setAttributes(ref_attributes) # Assuming setAttributes takes a list
+
+        # Add reference to the relationship (Java: relation.addReference(ref))
+        inSync = self.postingsInSync()
+        replaced = relation.getReference(subject, object_ref) is not None # addReference replaces it
+        relation.addReference(ref) # Assuming addReference handles internal storage
+        if not replaced:
+            self.subjPostings.add(subject, relation_name)
+            self.objPostings.add(object_ref, relation_name)
+        self.postingsUpdated(inSync)
+
+        # Update helper dictionaries and sets (Java logic)
+        self.nRelRefs += 1
+        subj_rel_obj_str = f"{subject}.{relation_name}.{object_ref}"
+        self.writableSubjRelObjs().add(subj_rel_obj_str) # Python set is unordered, Java TreeSet is ordered
+
+        self.addValue(self.subjRels, subject, relation_name)
+        self.addValue(self.subjObjs, subject, object_ref)
+        self.addValue(self.relSubjs, relation_name, subject)
+        self.addValue(self.relObjs, relation_name, object_ref)
+        self.addValue(self.objRels, object_ref, relation_name)
+        self.addValue(self.objSubjs, object_ref, subject)
+        self.addValue(self.subjRel_Objs, (subject, relation_name), object_ref)
+        self.addValue(self.subjObj_Rels, (subject, object_ref), relation_name)
+        self.addValue(self.relObj_Subjs, (relation_name, object_ref), subject)
 
     # Method: parseEntities (private in Java) - Renamed
     def parseEntities(self, parentNode: ET.Element, root: Entity, domainName: str) -> None:
@@ -684,68 +1136,244 @@ class DomainData:
         Recursively parses entities from the given parent node and adds them to the entity tree.
         Internal helper for Java's private void parseEntities(Node parentNode, Entity root, String domainName).
         """
-        # Java valid attributes: "name","description","abstract","notes"
-        valid_entity_attrs = ["name", "description", "abstract", "notes"]
         # Determine allowed children based on whether we are at the top <entities> or inside an <entity>
-        allowed_children = ["entity"] if root == self.entityTree else ["entity", "attribute"]
+        allowed_children = self.TAGS_TOP_ENTITY if root == self.entityTree else self.TAGS_SUB_ENTITY
 
         # Filter for entity elements first
         entity_nodes = [child for child in parentNode if isinstance(child.tag, str) and child.tag == "entity"]
 
         for entity_node in entity_nodes: # Iterate through direct children that are <entity>
-             self.validateTag(entity_node, allowed_children) # Validate allowed children in this context
-             self.validateTagAttributes(entity_node, valid_entity_attrs, "name") # Validate attributes of <entity>
-
-             entity_name = entity_node.get("name")
-             description = entity_node.get("description")
-             notes = entity_node.get("notes")
-             is_abstract_str = entity_node.get("abstract", "false")
-             is_abstract = is_abstract_str.lower() == "true"
-
-             if not entity_name:
-                  raise ValueError("<entity> tag requires a 'name' attribute.") # Java doesn't check null
-
-             # Find existing entity anywhere in the tree first (Java logic)
-             existing_entity = self.findInTree(self.entityTree, entity_name)
-             current_entity: Optional[Entity] = None
-
-             if existing_entity:
-                  # Entity already exists somewhere
-                  existing_parent = existing_entity.getParent()
-                  is_ancestor = existing_parent and root.hasAncestor(existing_parent.getName())
-                  is_different_domain = existing_entity.getDomain() != domainName
-
-                  if (is_ancestor or existing_parent == self.entityTree) and is_different_domain:
-                       print(f"Detaching and moving entity '{entity_name}' from '{existing_parent.getName() if existing_parent else 'root'}' (domain: {existing_entity.getDomain()}) to '{root.getName()}' (domain: {domainName})")
-                       existing_entity.detach()
-                       root.addChild(existing_entity) # Add to new parent
-                       current_entity = existing_entity
-                  elif existing_parent == root:
-                       print(f"Updating existing entity '{entity_name}' under parent '{root.getName()}'")
-                       current_entity = existing_entity
-                  else:
-                       raise ValueError(f"Inconsistency: Entity '{entity_name}' found under unexpected parent '{existing_parent.getName() if existing_parent else 'root'}'. Cannot automatically move to '{root.getName()}'.") # Java throws Exception
-             else:
-                  # Entity is new, create it (Java: new Entity(entityName, domainName))
-                  print(f"Creating new entity '{entity_name}' under parent '{root.getName()}'")
-                  current_entity = Entity(name=entity_name, domain=domainName)
-                  root.addChild(current_entity) # Adds to children and sets parent
-
-             # Update properties
-             if current_entity:
-                  current_entity.setDomain(domainName) # Overwrite domain like Java
-                  current_entity.setDescription(description or "")
-                  current_entity.setAbstract(is_abstract)
-                  current_entity.setNotes(notes or "")
-
-                  # Add attributes defined directly within this <entity> tag (Java: currentEntity.addAttributes(readAttributes(en)))
-                  direct_attributes = self.readAttributes(entity_node)
-                  current_entity.addAttributes(direct_attributes)
-
-                  # Recursively parse sub-entities (Java: parseEntities(en, currentEntity, domainName))
-                  self.parseEntities(entity_node, current_entity, domainName)
+             current_entity = self.parseEntity(entity_node, root, domainName, allowed_children)
+
+             # Add attributes defined directly within this <entity> tag (Java: currentEntity.addAttributes(readAttributes(en)))
+             direct_attributes = self.readAttributes(entity_node)
+             current_entity.addAttributes(direct_attributes)
+
+             # Recursively parse sub-entities (Java: parseEntities(en, currentEntity, domainName))
+             self.parseEntities(entity_node, current_entity, domainName)
+
+    # Method: parseEntity (internal helper, not in Java)
+    def parseEntity(self, entity_node: ET.Element, root: Entity, domainName: str, allowed_children: Collection[str]) -> Entity:
+        """
+        Validates a single <entity> tag, finds or creates the matching Entity under root and
+        updates its properties. Only the tag and its XML attributes are read, not its children,
+        so streamFile can call it as soon as the tag opens.
+        """
+        # Java valid attributes: "name","description","abstract","notes" (ATTRS_ENTITY)
+        self.validateTag(entity_node, allowed_children) # Validate allowed children in this context
+        self.validateTagAttributes(entity_node, self.ATTRS_ENTITY, "name") # Validate attributes of <entity>
+
+        entity_name = entity_node.get("name")
+        description = entity_node.get("description")
+        notes = entity_node.get("notes")
+        is_abstract_str = entity_node.get("abstract", "false")
+        is_abstract = is_abstract_str.lower() == "true"
+
+        if not entity_name:
+             raise ValueError("<entity> tag requires a 'name' attribute.") # Java doesn't check null
+
+        # Find existing entity anywhere in the tree first (Java logic)
+        existing_entity = self.findInTree(self.entityTree, entity_name)
+        current_entity: Optional[Entity] = None
+
+        if existing_entity:
+             # Entity already exists somewhere
+             existing_parent = existing_entity.getParent()
+             is_ancestor = existing_parent and root.hasAncestor(existing_parent.getName())
+             is_different_domain = existing_entity.getDomain() != domainName
+
+             if (is_ancestor or existing_parent == self.entityTree) and is_different_domain:
+                  print(f"Detaching and moving entity '{entity_name}' from '{existing_parent.getName() if existing_parent else 'root'}' (domain: {existing_entity.getDomain()}) to '{root.getName()}' (domain: {domainName})")
+                  existing_entity.detach()
+                  root.addChild(existing_entity) # Add to new parent
+                  current_entity = existing_entity
+             elif existing_parent == root:
+                  print(f"Updating existing entity '{entity_name}' under parent '{root.getName()}'")
+                  current_entity = existing_entity
              else:
-                  print(f"Error: Failed to get or create entity '{entity_name}'")
+                  raise ValueError(f"Inconsistency: Entity '{entity_name}' found under unexpected parent '{existing_parent.getName() if existing_parent else 'root'}'. Cannot automatically move to '{root.getName()}'.") # Java throws Exception
+        else:
+             # Entity is new, create it (Java: new Entity(entityName, domainName))
+             print(f"Creating new entity '{entity_name}' under parent '{root.getName()}'")
+             current_entity = Entity(name=entity_name, domain=domainName)
+             root.addChild(current_entity) # Adds to children and sets parent
+
+        # Update properties
+        current_entity.setDomain(domainName) # Overwrite domain like Java
+        current_entity.setDescription(description or "")
+        current_entity.setAbstract(is_abstract)
+        current_entity.setNotes(notes or "")
+        return current_entity
+
+    # Method: resolveImportPath (internal helper, not in Java)
+    def resolveImportPath(self, folder: Path, schema_path_str: str) -> Path:
+        """
+        Resolves the 'schema' attribute of an <import> tag to the path of the imported .gbs file.
+        Internal helper, extracted from parseImports.
+        """
+        # Resolve import path (Java logic: check "/", else use folder)
+        # Check if schema_path_str is already absolute or contains separators
+        if Path(schema_path_str).is_absolute() or "/" in schema_path_str or os.path.sep in schema_path_str:
+             # Ensure .gbs extension? Java seems to assume it's there or adds it later.
+             # Let's assume the path is correct if it contains separators.
+             return Path(schema_path_str)
+        # Relative path (likely just domain name), resolve against the folder of the *current* file
+        return folder / (schema_path_str + ".gbs")
+
+    # Method: loadImport (internal helper, not in Java)
+    def loadImport(self, import_file_path: Path, abs_import_path_str: str) -> None:
+        """
+        Loads an imported file with loadPath or, if sharedImports is enabled, from the shared BaseLayer
+        of that file: if nothing was loaded into this domain yet, by forking the layer (forkBaseLayer),
+        else by loading the file again with loadPath, without validating it since the layer validated
+        the same content (the elements of the file are merged into the existing ones, so the layer can't
+        be forked). Files imported by that file go through loadImport again, from their own layers.
+        """
+        if not self.sharedImports:
+            self.loadPath(import_file_path, abs_import_path_str)
+            return
+        if not import_file_path.is_file():
+            raise FileNotFoundError(f"File not found: {import_file_path}")
+        layer = BaseLayer.get(abs_import_path_str, lambda: self.buildBaseLayerData(import_file_path, abs_import_path_str))
+        if self.isBlank():
+            self.forkBaseLayer(layer)
+            return
+        self.loadPath(import_file_path, abs_import_path_str, validated=layer.isUpToDate())
+
+    # Method: isBlank (internal helper, not in Java)
+    def isBlank(self) -> bool:
+        """
+        Checks that no element was loaded into this domain yet, apart from the file being imported
+        (already tracked in importedFiles by parseImports).
+        """
+        return (len(self.importedFiles) <= 1 and not self.entityTree.getChildren() and not self.relationshipTree.getChildren()
+                and not self.types and not self.unions and not self.axioms and self.nRelRefs == 0
+                and not self.removedEntities and not self.removedRelationships)
+
+    # Method: buildBaseLayerData (internal helper, not in Java)
+    def buildBaseLayerData(self, import_file_path: Path, abs_import_path_str: str) -> "DomainData":
+        """
+        Loads an imported file alone into a new DomainData, to be shared as a BaseLayer.
+        The loading options of this domain are kept, except for the ones that would fork or cache it.
+        Its references are marked as shared (Reference.shared), since the forks keep the ones without attributes.
+        """
+        print(f"Building shared base layer: {abs_import_path_str}")
+        data = DomainData(webInfFolder=self.webInfFolder) if self.webInfFolder else DomainData()
+        data.streaming = self.streaming
+        data.trusted = self.trusted
+        data.cacheFolder = self.cacheFolder # Only used for validated file hashes, loadPath never caches snapshots
+        data.loadPath(import_file_path, abs_import_path_str)
+        for rel in data.getAllRelationships():
+            for ref in rel.getReferences():
+                ref.shared = True
+        return data
+
+    # Method: forkBaseLayer (internal helper, not in Java)
+    def forkBaseLayer(self, layer: BaseLayer) -> None:
+        """
+        Makes this (blank) domain a fork of a shared BaseLayer, with the same result as loading the
+        layer's file into it, without parsing and validating the file again.
+        The Entity and Relationship nodes and their Attribute objects are copied (see forkChildren), since
+        they know their parent and tree, and each domain can move them, add children and attributes, edit
+        attributes in place and delete them. What a domain can't modify in place is shared with the layer:
+        Reference objects without attributes, the symbol table (layered with SymbolTable.fork) and the
+        (subject, object) index of each relationship (Relationship.shareReferences). The reference indexes
+        and posting lists are copy-on-write overlays (ReferenceIndex.fork) over the ones of the layer.
+        Elements get the domain name of this domain, like the elements of any imported file.
+        """
+        self.bumpGeneration()
+        base = layer.data
+        # Names new to this domain get the IDs after the ones of the layer, which stay valid in the forked indexes
+        self.symbols = base.symbols.fork()
+        self.entityTree.setSymbolTable(self.symbols)
+        self.relationshipTree.setSymbolTable(self.symbols)
+        self.forkChildren(base.entityTree, self.entityTree)
+        self.forkChildren(base.relationshipTree, self.relationshipTree)
+
+        self.importedFiles.extend(f for f in base.importedFiles if f not in self.importedFiles)
+        self.types = [self.forkAttribute(attr) for attr in base.types]
+        self.removedEntities = list(base.removedEntities)
+        self.removedRelationships = list(base.removedRelationships)
+        for union_obj in base.unions:
+            forked_union = copy.copy(union_obj)
+            forked_union.domain = self.domain
+            forked_union.values = set(union_obj.values)
+            self.unions.add(forked_union)
+        for axiom in base.axioms:
+            forked_axiom = copy.copy(axiom)
+            forked_axiom.domain = self.domain
+            self.axioms.add(forked_axiom)
+
+        self.subjects = list(base.subjects)
+        self.objects = list(base.objects)
+        self.subjRelObjs = base.subjRelObjs # Copied on first change, see writableSubjRelObjs
+        self.subjRelObjsShared = True
+        self.nRelRefs = base.nRelRefs
+        self.inverseRels = dict(base.inverseRels)
+        self.attrsRel = defaultdict(list, {k: [self.forkAttribute(attr) for attr in v] for k, v in base.attrsRel.items()})
+        for map_name in ("subjRels", "subjObjs", "relSubjs", "relObjs", "objSubjs", "objRels",
+                         "subjRel_Objs", "subjObj_Rels", "relObj_Subjs"):
+            setattr(self, map_name, getattr(base, map_name).fork())
+        self.subjPostings = base.subjPostings.fork(self.symbols)
+        self.objPostings = base.objPostings.fork(self.symbols)
+        self.postingsVersion = self.referencesKey() if base.postingsInSync() else None
+
+    # Method: forkChildren (internal helper, not in Java)
+    def forkChildren(self, source: Entity, target: Entity) -> None:
+        """
+        Adds to target a copy of each subtree under source, for forkBaseLayer.
+        The nodes and their attributes are copied without recursion, and each top subtree is added to
+        target (and to its name index) once it is complete. References are shared unless they have attributes.
+        """
+        for top in source.getChildren():
+            forkedTop = self.forkNode(top)
+            relationships: List[Tuple[Relationship, Relationship]] = []
+            stack: List[Tuple[Entity, Entity]] = [(top, forkedTop)]
+            while stack:
+                node, forked = stack.pop()
+                if isinstance(node, Relationship):
+                    relationships.append((node, forked))
+                for child in node.children:
+                    forkedChild = self.forkNode(child)
+                    forkedChild.parent = forked
+                    forked.children.append(forkedChild)
+                    stack.append((child, forkedChild))
+            target.addChild(forkedTop)
+            for node, forked in relationships:
+                if any(ref.getAttributes() for ref in node.references):
+                    forked.references = [self.forkReference(ref) if ref.getAttributes() else ref for ref in node.references]
+                    forked.buildReferenceIndex(self.symbols)
+                    forked.referencesChanged()
+                else:
+                    forked.shareReferences(node)
+
+    # Method: forkNode (internal helper, not in Java)
+    def forkNode(self, node: Entity) -> Entity:
+        """Copies an entity or relationship of a BaseLayer for forkChildren, with copies of its attributes and no parent or children."""
+        forked = copy.copy(node)
+        forked.children = []
+        forked.parent = None
+        forked.attributes = [self.forkAttribute(attr) for attr in node.attributes]
+        forked.adoptAttributes(forked.attributes)
+        forked.values = list(node.values)
+        if self.domain is not None:
+            forked.setDomain(self.domain)
+        return forked
+
+    # Method: forkAttribute (internal helper, not in Java)
+    def forkAttribute(self, attr: Attribute) -> Attribute:
+        """Copies an attribute of a BaseLayer for forkBaseLayer, with its own list of values and no owner yet."""
+        forked = attr.clone()
+        forked.values = list(attr.values)
+        forked.owner = None # The base entity; forkChildren makes the forked entity adopt it
+        return forked
+
+    # Method: forkReference (internal helper, not in Java)
+    def forkReference(self, ref: Reference) -> Reference:
+        """Copies a reference of a BaseLayer for forkBaseLayer, with copies of its attributes."""
+        forked = copy.copy(ref) # Not shared anymore, see Reference.__getstate__
+        forked.setAttributes([self.forkAttribute(attr) for attr in ref.getAttributes()])
+        return forked
 
     # Method: parseImports (private in Java) - Renamed
     def parseImports(self, folder: Path, importsNode: ET.Element) -> None:
@@ -754,14 +1382,8 @@ class DomainData:
         and handles the <deleted> section.
         Internal helper for Java's private void parseImports(File folder, Node importsNode).
         """
-        # Java valid children: "import","deleted"
-        valid_import_children = ["import", "deleted"]
-        # Java valid import attributes: "schema"
-        valid_import_attrs = ["schema"]
-        # Java valid deleted children: "entity","relationship"
-        valid_deleted_children = ["entity", "relationship"]
-        # Java valid deleted item attributes: "name"
-        valid_deleted_item_attrs = ["name"]
+        # Java valid children: "import","deleted" (TAGS_IMPORTS), valid import attributes: "schema" (ATTRS_IMPORT)
+        # Java valid deleted children: "entity","relationship" (TAGS_DELETED), with attribute "name"
 
         children = [child for child in importsNode if isinstance(child.tag, str)] # Filter comments/PIs
         import_nodes: List[ET.Element] = []
@@ -769,11 +1391,11 @@ class DomainData:
 
         # Separate import and deleted nodes, validate structure (Java logic)
         for i, child in enumerate(children):
-             self.validateTag(child, valid_import_children)
+             self.validateTag(child, self.TAGS_IMPORTS)
              if child.tag == "import":
                   if deleted_node is not None:
                        raise ValueError("<import> tag cannot appear after <deleted> tag within <imports>.")
-                  self.validateTagAttributes(child, valid_import_attrs, "schema")
+                  self.validateTagAttributes(child, self.ATTRS_IMPORT, "schema")
                   import_nodes.append(child)
              elif child.tag == "deleted":
                   if deleted_node is not None:
@@ -783,7 +1405,7 @@ class DomainData:
                        # Java check: IntStream.range(0, nodes.size()-1).filter(i->nodes.get(i).getNodeName().equals("deleted"))...
                        raise ValueError("<deleted> tag must be the last child of <imports>.")
                   # No attributes expected on <deleted> itself
-                  self.validateTagAttributes(child, [], "")
+                  self.validateTagAttributes(child, self.ATTRS_NONE, "")
                   deleted_node = child # Keep track of the (last) deleted node
 
         # Process imports first (DFS)
@@ -792,18 +1414,8 @@ class DomainData:
             if not schema_path_str:
                  raise ValueError("<import> tag requires a 'schema' attribute.") # Java doesn't check null
 
-            # Resolve import path (Java logic: check "/", else use folder)
-            import_file_path: Path
+            import_file_path = self.resolveImportPath(folder, schema_path_str)
             # Use absolute path for reliable checking and loading (Java passes absolute path eventually)
-            # Check if schema_path_str is already absolute or contains separators
-            if Path(schema_path_str).is_absolute() or "/" in schema_path_str or os.path.sep in schema_path_str:
-                 import_file_path = Path(schema_path_str)
-                 # Ensure .gbs extension? Java seems to assume it's there or adds it later.
-                 # Let's assume the path is correct if it contains separators.
-            else:
-                 # Relative path (likely just domain name), resolve against the folder of the *current* file
-                 import_file_path = folder / (schema_path_str + ".gbs")
-
             abs_import_path_str = str(import_file_path.resolve())
 
             # Avoid reloading files already processed (Python version tracks importedFiles list)
@@ -811,9 +1423,8 @@ class DomainData:
                  print(f"Importing: {abs_import_path_str}")
                  self.importedFiles.append(abs_import_path_str) # Track import
                  try:
-                      imported_doc = self.parseFile(import_file_path)
                       # Recursively load the imported file (Java passes absolute path)
-                      self.loadFile(imported_doc, abs_import_path_str)
+                      self.loadImport(import_file_path, abs_import_path_str)
                  except FileNotFoundError:
                       print(f"Error: Imported file not found: {import_file_path}")
                       raise # Re-raise to stop the loading process
@@ -827,8 +1438,8 @@ class DomainData:
         if deleted_node is not None:
             for deleted_item in deleted_node:
                  if not isinstance(deleted_item.tag, str): continue # Skip comments/PIs
-                 self.validateTag(deleted_item, valid_deleted_children)
-                 self.validateTagAttributes(deleted_item, valid_deleted_item_attrs, "name")
+                 self.validateTag(deleted_item, self.TAGS_DELETED)
+                 self.validateTagAttributes(deleted_item, self.ATTRS_NAME, "name")
 
                  item_type = deleted_item.tag
                  item_name = deleted_item.get("name")
@@ -1001,6 +1612,45 @@ class DomainData:
         """
         return self.clone(docToModify, valuesNode)
 
+    # Method: bumpGeneration (internal helper, not in Java)
+    def bumpGeneration(self) -> None:
+        """
+        Records a mutation of this domain, invalidating the memoized derived collections.
+        Called by every mutating method; call it after changing the state of the domain directly.
+        """
+        self.generation += 1
+
+    # Method: generationKey (internal helper, not in Java)
+    def generationKey(self) -> Tuple[int, ...]:
+        """
+        Gets the mutation counters the memoized collections depend on: the generation of this domain,
+        plus the structure and attributes versions of both trees and the references version of the
+        relationship tree, which also catch changes made directly on Entity and Relationship objects.
+        """
+        return (self.generation, self.entityTree.structureVersion, self.relationshipTree.structureVersion,
+                self.relationshipTree.referencesVersion, self.entityTree.attributesVersion,
+                self.relationshipTree.attributesVersion)
+
+    # Method: memoized (internal helper, not in Java)
+    def memoized(self, name: str, build: Callable[[], Any], dependsOn: Tuple[int, ...] = ()) -> Any:
+        """
+        Gets a derived collection from the memo, building it with build() if the domain changed since
+        it was stored. Values must be immutable (tuples, frozensets, numbers), since they are shared
+        by every caller until the next mutation.
+
+        Args:
+            name: The name of the derived collection.
+            build: Computes the collection from the current state.
+            dependsOn: Other counters the collection depends on, e.g. the version of the axioms.
+        """
+        key = self.generationKey() + dependsOn
+        cached = self.memo.get(name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = build()
+        self.memo[name] = (key, value)
+        return value
+
     # Method: getTopEntities (public in Java)
     def getTopEntities(self) -> List[Entity]:
         """Returns a list of the top-level entities (direct children of the root Entity)."""
@@ -1009,14 +1659,19 @@ class DomainData:
         return []
 
     # Method: getTopRelationships (public in Java)
-    def getTopRelationships(self) -> List[Relationship]:
-        """Returns a list of top-level relationships (direct children of the root Relationship)."""
+    def getTopRelationships(self) -> Tuple[Relationship, ...]:
+        """Returns the top-level relationships (direct children of the root Relationship), memoized as a tuple."""
+        return self.memoized("topRelationships", self.buildTopRelationships)
+
+    # Method: buildTopRelationships (internal helper, not in Java)
+    def buildTopRelationships(self) -> Tuple[Relationship, ...]:
+        """Computes getTopRelationships."""
         if self.relationshipTree:
              # Java uses toRelationships(getRelationshipTree().getChildren())
              # Assuming getChildren returns List[Entity], filter and cast
              children = self.relationshipTree.getChildren()
-             return self.toRelationships(children) # Use static helper like Java
-        return []
+             return tuple(self.toRelationships(children)) # Use static helper like Java
+        return ()
 
     # Method: getTopRelationshipsToString (public in Java)
     def getTopRelationshipsToString(self) -> List[str]:
@@ -1061,8 +1716,8 @@ class DomainData:
         return self.removedRelationships
 
     # Method: properties (public in Java)
-    def properties(self, entity_name: str) -> List[Attribute]: # Java returns List
-        """Retrieves all attributes (including inherited) for a given entity name."""
+    def properties(self, entity_name: str) -> Sequence[Attribute]: # Java returns List
+        """Retrieves all attributes (including inherited) for a given entity name, as the tuple cached by the entity."""
         entity = self.getEntity(entity_name)
         # Java uses propertiesCommon(e)
         # Python version assumes Entity class handles inheritance in getAttributes or similar
@@ -1075,9 +1730,44 @@ class DomainData:
                   return entity.getAttributes() # Fallback to direct attributes
         return []
 
+    # Method: getEntityShape (internal helper, not in Java)
+    def getEntityShape(self, entity_name: str) -> Optional[EntityShape]:
+        """
+        Gets the compiled shape of an entity (see EntityShape): its attributes, including inherited ones, with
+        their flags, select values and targets read once. Shapes are memoized until the schema changes.
+
+        Args:
+            entity_name: The name of the entity.
+
+        Returns:
+            Optional[EntityShape]: The shape, or None if the entity does not exist.
+        """
+        def build() -> Optional[EntityShape]:
+            entity = self.getEntity(entity_name)
+            return EntityShape(entity) if entity is not None else None
+        return self.memoized("shape:" + entity_name.lower(), build)
+
+    # Method: validateInstance (internal helper, not in Java)
+    def validateInstance(self, entity_name: str, attribute_values: Mapping[str, Optional[str]]) -> List[str]:
+        """
+        Checks the attribute values of an instance against the shape of its entity: mandatory attributes
+        must have a value, every attribute must be defined and select attributes must use one of their values.
+
+        Args:
+            entity_name: The type of the instance.
+            attribute_values: Attribute name -> value, like Instance.getAttributeValues.
+
+        Returns:
+            List[str]: The problems found, empty if the instance is valid.
+        """
+        shape = self.getEntityShape(entity_name)
+        if shape is None:
+            return [f"Entity \"{entity_name}\" does not exist"]
+        return shape.validate(attribute_values)
+
     # Method: propertiesRelation (public in Java)
-    def propertiesRelation(self, relation_name: str) -> List[Attribute]: # Java returns List
-        """Retrieves all attributes (including inherited) for a given relationship name."""
+    def propertiesRelation(self, relation_name: str) -> Sequence[Attribute]: # Java returns List
+        """Retrieves all attributes (including inherited) for a given relationship name, as the tuple cached by the relationship."""
         relationship = self.getRelationship(relation_name)
         # Java uses propertiesCommon(r)
         if relationship:
@@ -1102,6 +1792,7 @@ class DomainData:
     # Method: removeEntity (public in Java)
     def removeEntity(self, name: str) -> None:
         """Removes an entity by name from the entity tree."""
+        self.bumpGeneration()
         # Java finds entity then calls detach()
         entity_to_remove = self.findInTree(self.entityTree, name)
         if entity_to_remove:
@@ -1109,28 +1800,33 @@ class DomainData:
             entity_to_remove.detach() # Detach from parent
             # Java code comments "// REMOVE REFERENCES AND RELATIONSHIPS" but doesn't implement it here.
             # Python version added removeReferencesInvolving. Keep it for correctness.
-            self.removeReferencesInvolving(name) # Call helper to clean up refs
+            self.removeReferencesInvolving(name) # Call helper to clean up refs (and the postings)
         else:
             print(f"Entity '{name}' not found for removal.")
 
     # Method: removeRelationship (public in Java)
     def removeRelationship(self, name: str) -> None:
         """Removes a relationship by name from the relationship tree."""
+        self.bumpGeneration()
         # Java finds relationship then calls detach()
         rel_to_remove = self.findInTree(self.relationshipTree, name)
         if rel_to_remove and isinstance(rel_to_remove, Relationship):
             print(f"Removing relationship: {name}")
+            inSync = self.postingsInSync()
             rel_to_remove.detach() # Detach from parent
             # Java code doesn't explicitly clean up helper dicts here.
             # Python version added cleanupRelationshipData. Keep it?
             self.cleanupRelationshipData(name) # Call helper to clean up dicts/sets
+            self.postingsUpdated(inSync)
         else:
             print(f"Relationship '{name}' not found for removal.")
 
     # Method: removeReferencesInvolving (internal helper, not in Java) - Renamed
     def removeReferencesInvolving(self, entity_name: str) -> None:
         """Internal helper to remove relationship references involving a deleted entity."""
+        self.bumpGeneration()
         print(f"Removing references involving entity: {entity_name}")
+        inSync = self.postingsInSync()
         all_rels = self.getAllRelationships()
         refs_to_remove_map: Dict[Relationship, List[Reference]] = defaultdict(list)
 
@@ -1151,11 +1847,13 @@ class DomainData:
                       rel.setReferences(updated_refs) # Assuming setReferences exists
                  except AttributeError:
                       print(f"Warning: Relationship class missing 'setReferences'. Cannot remove references involving '{entity_name}' from '{rel.getName()}'.")
+        self.postingsUpdated(inSync)
 
 
     # Method: cleanupRelationshipData (internal helper, not in Java) - Renamed
     def cleanupRelationshipData(self, rel_name: str) -> None:
         """Internal helper to remove data associated with a deleted relationship."""
+        self.bumpGeneration()
         print(f"Cleaning up data for removed relationship: {rel_name}")
         # Remove from inverse mapping
         inverse_name = self.inverseRels.pop(rel_name, None)
@@ -1173,27 +1871,34 @@ class DomainData:
         for key, values in list(self.objRels.items()):
             if rel_name in values: self.removeValue(self.objRels, key, rel_name)
         for key in list(self.subjRel_Objs.keys()):
-            if key.endswith(f".{rel_name}"): self.subjRel_Objs.pop(key, None)
+            if key[1] == rel_name: self.subjRel_Objs.pop(key, None)
         for key, values in list(self.subjObj_Rels.items()):
             if rel_name in values: self.removeValue(self.subjObj_Rels, key, rel_name)
         for key in list(self.relObj_Subjs.keys()):
-            if key.startswith(f"{rel_name}."): self.relObj_Subjs.pop(key, None)
+            if key[0] == rel_name: self.relObj_Subjs.pop(key, None)
+
+        self.subjPostings.discardRelationship(rel_name)
+        self.objPostings.discardRelationship(rel_name)
 
         # Remove from subjRelObjs set
         self.subjRelObjs = {sro for sro in self.subjRelObjs if f".{rel_name}." not in sro}
+        self.subjRelObjsShared = False
 
     # Method: cleanupReferenceData (internal helper, not in Java) - Renamed
     def cleanupReferenceData(self, subject: str, rel_name: str, object_ref: str) -> None:
         """Internal helper to remove data for a specific deleted reference."""
+        self.bumpGeneration()
         subj_rel_obj_str = f"{subject}.{rel_name}.{object_ref}"
-        subj_rel_key = f"{subject}.{rel_name}"
-        subj_obj_key = f"{subject}.{object_ref}"
-        rel_obj_key = f"{rel_name}.{object_ref}"
+        subj_rel_key = (subject, rel_name)
+        subj_obj_key = (subject, object_ref)
+        rel_obj_key = (rel_name, object_ref)
 
         if subj_rel_obj_str in self.subjRelObjs:
-             self.subjRelObjs.remove(subj_rel_obj_str)
+             self.writableSubjRelObjs().remove(subj_rel_obj_str)
              if self.nRelRefs > 0: self.nRelRefs -= 1 # Decrement count only if successfully removed
 
+        self.subjPostings.discard(subject, rel_name)
+        self.objPostings.discard(object_ref, rel_name)
         self.removeValue(self.subjRels, subject, rel_name)
         self.removeValue(self.subjObjs, subject, object_ref)
         self.removeValue(self.relSubjs, rel_name, subject)
@@ -1205,15 +1910,10 @@ class DomainData:
         self.removeValue(self.relObj_Subjs, rel_obj_key, subject)
 
     # Method: removeValue (internal helper, not in Java) - Renamed
-    def removeValue(self, map_dict: Dict[str, List[str]], key: str, value: str) -> None:
-        """ Safely removes a value from a list within a dictionary. Cleans up empty lists/keys."""
-        if key in map_dict:
-            try:
-                map_dict[key].remove(value)
-                if not map_dict[key]: # If list becomes empty
-                    del map_dict[key]
-            except ValueError:
-                pass # Value wasn't in the list
+    def removeValue(self, map_dict: ReferenceIndex, key: Any, value: str) -> None:
+        """ Safely removes a value from a key of an index. Cleans up empty keys."""
+        self.bumpGeneration()
+        map_dict.discard(key, value)
 
     # Method: readAttributes (private in Java) - Renamed
     def readAttributes(self, parentNode: ET.Element) -> List[Attribute]: # Java returns Vector
@@ -1222,79 +1922,80 @@ class DomainData:
         Handles different datatypes (string, select, tree, entity, user-types).
         Internal helper for Java's private Vector<Attribute> readAttributes(Node parentNode).
         """
-        fullAttrs: List[Attribute] = []
-        # Java valid attributes: "name","datatype","description","mandatory","distinguishing","display","target","notes"
-        valid_attr_attrs = ["name", "datatype", "description", "mandatory",
-                            "distinguishing", "display", "target", "notes"]
-
         attribute_nodes = [child for child in parentNode if isinstance(child.tag, str) and child.tag == "attribute"]
+        return [self.readAttribute(attr_node) for attr_node in attribute_nodes]
 
-        for attr_node in attribute_nodes:
-            self.validateTagAttributes(attr_node, valid_attr_attrs, "name")
-
-            attr_name = attr_node.get("name")
-            # Java defaults datatype to "" if not present, let's default to "string" for clarity
-            data_type = attr_node.get("datatype", "string")
-            description = attr_node.get("description", "") # Default to empty string like Java
-            notes = attr_node.get("notes") # Get notes (new in Python version?)
-
-            if not attr_name:
-                 raise ValueError("<attribute> tag requires a 'name' attribute.") # Java doesn't check null
-
-            # Initialize attribute (Java: new Attribute(attribute,datatype))
-            currentAttr = Attribute(name=attr_name, data_type=data_type)
-            currentAttr.setDescription(description)
-            if notes is not None: currentAttr.setNotes(notes) # Set notes if present
-
-            # Set optional boolean flags (Java uses setOptionalAttributes helper)
-            self.setOptionalAttributes(attr_node.attrib, currentAttr)
-
-            # Handle datatype specific logic (Java switch statement)
-            if data_type == "select":
-                 # Java: currentAttr.setValuesString(readValuesList(an,"value",true));
-                 values = self.readValuesList(attr_node, "value", True) # Read <value> children, add "Other"
-                 currentAttr.setValues(values) # Assuming setValues takes List[str]
-            elif data_type == "tree":
-                 # Java: currentAttr.setSubClasses(readValuesTree(an,null));
-                 # readValuesTree expects the root of the tree structure (<attribute> or <value>)
-                 # It returns a DefaultTreeNode
-                 sub_classes_tree = self.readValuesTree(attr_node, None) # Pass None as parent for the root call
-                 currentAttr.setSubClasses(sub_classes_tree) # Assuming setSubClasses takes TreeNode
-            elif data_type == "entity":
-                 # Java: currentAttr.setTarget(n.getNamedItem("target").getNodeValue());
-                 target = attr_node.get("target")
-                 if target is None: # Java would throw NullPointerException here
-                      raise ValueError("<attribute> with datatype='entity' requires a 'target' attribute.")
-                 currentAttr.setTarget(target)
-            elif data_type == "user-types":
-                 # Java: String target = n.getNamedItem("target").getNodeValue();
-                 target_type_name = attr_node.get("target")
-                 if target_type_name is None:
-                      raise ValueError("<attribute> with datatype='user-types' requires a 'target' attribute.")
-
-                 # Find the predefined type from self.types (Java: fromAttributesToString(types).contains(target))
-                 found_type = next((t for t in self.types if t.getName() == target_type_name), None)
-                 if found_type:
-                      try:
-                           # Java: currentAttr = (Attribute) type.clone();
-                           cloned_type = found_type.clone() # Assumes Attribute.clone() exists and works
-                           # Java overrides name, description, and optional flags after cloning
-                           cloned_type.setName(attr_name)
-                           cloned_type.setDescription(description)
-                           if notes is not None: cloned_type.setNotes(notes)
-                           self.setOptionalAttributes(attr_node.attrib, cloned_type)
-                           currentAttr = cloned_type # Replace the initially created attribute
-                      except Exception as e: # Catch potential clone errors (Java catches CloneNotSupportedException)
-                           print(f"Error cloning user type '{target_type_name}' for attribute '{attr_name}': {e}")
-                           raise ValueError(f"Failed to clone user type '{target_type_name}'") from e
-                 else:
-                      # Java doesn't explicitly raise error here, but clone would fail.
-                      raise ValueError(f"Target user type '{target_type_name}' not found for attribute '{attr_name}'. Ensure it's defined in <user-types>.")
-            # Add other datatypes (string, int, etc.) if needed - handled by default Attribute init
-
-            fullAttrs.append(currentAttr)
+    # Method: readAttribute (internal helper, not in Java)
+    def readAttribute(self, attr_node: ET.Element) -> Attribute:
+        """
+        Reads a single <attribute> tag (including its <value> children) into an Attribute.
+        Used by readAttributes and streamFile.
+        """
+        # Java valid attributes: "name","datatype","description","mandatory","distinguishing","display","target","notes"
+        self.validateTagAttributes(attr_node, self.ATTRS_ATTRIBUTE, "name")
+
+        attr_name = attr_node.get("name")
+        # Java defaults datatype to "" if not present, let's default to "string" for clarity
+        data_type = attr_node.get("datatype", "string")
+        description = attr_node.get("description", "") # Default to empty string like Java
+        notes = attr_node.get("notes") # Get notes (new in Python version?)
+
+        if not attr_name:
+             raise ValueError("<attribute> tag requires a 'name' attribute.") # Java doesn't check null
+        attr_name = self.symbols.canonical(attr_name)
+
+        # Initialize attribute (Java: new Attribute(attribute,datatype))
+        currentAttr = Attribute(name=attr_name, data_type=data_type)
+        currentAttr.setDescription(description)
+        if notes is not None: currentAttr.setNotes(notes) # Set notes if present
+
+        # Set optional boolean flags (Java uses setOptionalAttributes helper)
+        self.setOptionalAttributes(attr_node.attrib, currentAttr)
+
+        # Handle datatype specific logic (Java switch statement)
+        if data_type == "select":
+             # Java: currentAttr.setValuesString(readValuesList(an,"value",true));
+             values = self.readValuesList(attr_node, "value", True) # Read <value> children, add "Other"
+             currentAttr.setValues(values) # Assuming setValues takes List[str]
+        elif data_type == "tree":
+             # Java: currentAttr.setSubClasses(readValuesTree(an,null));
+             # readValuesTree expects the root of the tree structure (<attribute> or <value>)
+             # It returns a DefaultTreeNode
+             sub_classes_tree = self.readValuesTree(attr_node, None) # Pass None as parent for the root call
+             currentAttr.setSubClasses(sub_classes_tree) # Assuming setSubClasses takes TreeNode
+        elif data_type == "entity":
+             # Java: currentAttr.setTarget(n.getNamedItem("target").getNodeValue());
+             target = attr_node.get("target")
+             if target is None: # Java would throw NullPointerException here
+                  raise ValueError("<attribute> with datatype='entity' requires a 'target' attribute.")
+             currentAttr.setTarget(target)
+        elif data_type == "user-types":
+             # Java: String target = n.getNamedItem("target").getNodeValue();
+             target_type_name = attr_node.get("target")
+             if target_type_name is None:
+                  raise ValueError("<attribute> with datatype='user-types' requires a 'target' attribute.")
+
+             # Find the predefined type from self.types (Java: fromAttributesToString(types).contains(target))
+             found_type = next((t for t in self.types if t.getName() == target_type_name), None)
+             if found_type:
+                  try:
+                       # Java: currentAttr = (Attribute) type.clone();
+                       cloned_type = found_type.clone() # Assumes Attribute.clone() exists and works
+                       # Java overrides name, description, and optional flags after cloning
+                       cloned_type.setName(attr_name)
+                       cloned_type.setDescription(description)
+                       if notes is not None: cloned_type.setNotes(notes)
+                       self.setOptionalAttributes(attr_node.attrib, cloned_type)
+                       currentAttr = cloned_type # Replace the initially created attribute
+                  except Exception as e: # Catch potential clone errors (Java catches CloneNotSupportedException)
+                       print(f"Error cloning user type '{target_type_name}' for attribute '{attr_name}': {e}")
+                       raise ValueError(f"Failed to clone user type '{target_type_name}'") from e
+             else:
+                  # Java doesn't explicitly raise error here, but clone would fail.
+                  raise ValueError(f"Target user type '{target_type_name}' not found for attribute '{attr_name}'. Ensure it's defined in <user-types>.")
+        # Add other datatypes (string, int, etc.) if needed - handled by default Attribute init
 
-        return fullAttrs
+        return currentAttr
 
     # Method: fromAttributesToString (private in Java) - Renamed
     def fromAttributesToString(self, attributes: List[Attribute]) -> List[str]: # Java returns Vector
@@ -1315,13 +2016,11 @@ class DomainData:
         Internal helper for Java's private List<String> readValuesList(Node parentNode, String tag_name, boolean add_other).
         """
         values: List[str] = []
-        valid_value_attrs = ["name"] # Java validates name attribute
-
         value_nodes = [child for child in parentNode if isinstance(child.tag, str) and child.tag == tag_name]
 
         for value_node in value_nodes:
              self.validateTag(value_node, [tag_name]) # Java validates tag
-             self.validateTagAttributes(value_node, valid_value_attrs, "name") # Java validates attributes
+             self.validateTagAttributes(value_node, self.ATTRS_NAME, "name") # Java validates attributes
              value_name = value_node.get("name")
              if value_name is not None: # Java gets value, might throw NPE later if null
                   values.append(value_name)
@@ -1358,13 +2057,11 @@ class DomainData:
         # Assuming constructor handles linking. If not:
         # if parentTreeNode: parentTreeNode.add_child(currentTreeNode)
 
-        valid_value_attrs = ["name"] # Java validates name attribute
-
         value_nodes = [child for child in parentXmlNode if isinstance(child.tag, str) and child.tag == "value"]
 
         for childXmlNode in value_nodes:
-             self.validateTag(childXmlNode, ["value"]) # Java validates tag
-             self.validateTagAttributes(childXmlNode, valid_value_attrs, "name") # Java validates attributes
+             self.validateTag(childXmlNode, self.TAGS_VALUE) # Java validates tag
+             self.validateTagAttributes(childXmlNode, self.ATTRS_NAME, "name") # Java validates attributes
 
              # Recursive call to build the subtree
              childTreeNode = self.readValuesTree(childXmlNode, currentTreeNode)
@@ -1380,16 +2077,24 @@ class DomainData:
 
         return currentTreeNode
 
+    # Method: writableSubjRelObjs (internal helper, not in Java)
+    def writableSubjRelObjs(self) -> Set[str]:
+        """Gets subjRelObjs to modify it, copying it first if it is still the set of a BaseLayer."""
+        if self.subjRelObjsShared:
+            self.subjRelObjs = set(self.subjRelObjs)
+            self.subjRelObjsShared = False
+        return self.subjRelObjs
+
     # Method: addValue (private in Java) - Renamed
-    def addValue(self, map_dict: Dict[str, List[str]], key: str, value: str) -> None: # Java map value is Vector
+    def addValue(self, map_dict: ReferenceIndex, key: Any, value: str) -> None: # Java map value is Vector
         """
-        Adds a value to a list within a dictionary, ensuring no duplicates in the list. Sorts the list.
+        Adds a value to a key of an index, ensuring no duplicates.
         Internal helper for Java's private void addValue(Map<String,Vector<String>> map, String key, String value).
         """
-        # Java uses map.get(key), checks null, creates new Vector if needed. defaultdict simplifies this.
-        if value not in map_dict[key]: # Check for duplicates before adding
-            map_dict[key].append(value)
-            map_dict[key].sort() # Java sorts after adding
+        self.bumpGeneration()
+        # Java checks for duplicates and sorts the Vector after adding: ReferenceIndex stores a set
+        # and sorts lazily, when the values of the key are read
+        map_dict.add(key, value)
 
     # Method: setOptionalAttributes (private in Java) - Renamed
     def setOptionalAttributes(self, attrib_map: Dict[str, str], attr_obj: Attribute) -> None:
@@ -1439,12 +2144,17 @@ class DomainData:
         return result
 
     # Method: getAllEntities (public in Java)
-    def getAllEntities(self) -> List[Entity]: # Java returns Vector
-        """Returns a flat list of all entities in the tree (including sub-entities)."""
+    def getAllEntities(self) -> Tuple[Entity, ...]: # Java returns Vector
+        """Returns all entities in the tree (including sub-entities), memoized as a tuple."""
+        return self.memoized("allEntities", self.buildAllEntities)
+
+    # Method: buildAllEntities (internal helper, not in Java)
+    def buildAllEntities(self) -> Tuple[Entity, ...]:
+        """Computes getAllEntities, visiting the tree breadth-first."""
         # Java uses recursion via getAllChildren. Python iterative approach:
         all_entities: List[Entity] = []
         if not self.entityTree:
-            return all_entities
+            return ()
 
         queue = list(self.entityTree.getChildren()) # Start with top-level entities
         # Use id() for visited set as Entity objects are not hashable by default
@@ -1468,13 +2178,13 @@ class DomainData:
                  print(f"Error getting children for entity '{current_entity.getName()}' in getAllEntities: {e}")
 
 
-        return all_entities
+        return tuple(all_entities)
 
     # Method: getAllEntitiesToString (public in Java)
-    def getAllEntitiesToString(self) -> List[str]: # Java returns Vector
-        """Returns a flat list of names of all entities in the tree."""
+    def getAllEntitiesToString(self) -> Tuple[str, ...]: # Java returns Vector
+        """Returns the names of all entities in the tree, memoized as a tuple."""
         # Java uses recursion via getAllChildrenToString. Python using getAllEntities:
-        return [e.getName() for e in self.getAllEntities()]
+        return self.memoized("allEntitiesToString", lambda: tuple(e.getName() for e in self.getAllEntities()))
 
     # Method: getRelationship (public in Java - overloaded)
     # Version 1: getRelationship(String relName)
@@ -1490,12 +2200,17 @@ class DomainData:
     # Version 2: getRelationship(String relName, ArrayList<Relationship> topRels) - Not directly needed if findInTree works
 
     # Method: getAllRelationships (public in Java)
-    def getAllRelationships(self) -> List[Relationship]: # Java returns List
-        """Returns a flat list of all relationships in the tree (including sub-relationships)."""
+    def getAllRelationships(self) -> Tuple[Relationship, ...]: # Java returns List
+        """Returns all relationships in the tree (including sub-relationships), memoized as a tuple."""
+        return self.memoized("allRelationships", self.buildAllRelationships)
+
+    # Method: buildAllRelationships (internal helper, not in Java)
+    def buildAllRelationships(self) -> Tuple[Relationship, ...]:
+        """Computes getAllRelationships, visiting the tree depth-first."""
         # Java uses Stack based iteration.
         all_rels: List[Relationship] = []
         if not self.relationshipTree:
-            return all_rels
+            return ()
 
         stack: List[Relationship] = list(self.getTopRelationships()) # Start with top-level relationships
         visited = {self.relationshipTree} # Avoid cycles/reprocessing
@@ -1511,14 +2226,15 @@ class DomainData:
             children_rels = [child for child in current_rel.getChildren() if isinstance(child, Relationship)]
             stack.extend(reversed(children_rels)) # Add in reverse to mimic stack push order
 
-        return all_rels
+        return tuple(all_rels)
 
     # Method: getAllRelationshipsToString (public in Java)
-    def getAllRelationshipsToString(self) -> List[str]: # Java returns TreeSet (sorted set)
-        """Returns a sorted list of names of all relationships in the tree."""
+    def getAllRelationshipsToString(self) -> Tuple[str, ...]: # Java returns TreeSet (sorted set)
+        """Returns the sorted names of all relationships in the tree, memoized as a tuple."""
         # Java uses stream().map().collect(Collectors.toCollection(TreeSet::new))
-        names = {r.getName() for r in self.getAllRelationships()}
-        return sorted(list(names)) # Return sorted list to mimic TreeSet ordering
+        # Sorted tuple to mimic TreeSet ordering
+        return self.memoized("allRelationshipsToString",
+                             lambda: tuple(sorted({r.getName() for r in self.getAllRelationships()})))
 
     # Method: getAllChildren (private in Java) - Renamed
     # Note: Used internally by Java's getAllEntities. Python version uses iteration.
@@ -1580,22 +2296,22 @@ class DomainData:
         return set()
 
     # Method: getSubjects (public in Java)
-    def getSubjects(self) -> List[str]: # Java returns TreeSet (sorted set)
-        """Returns a sorted list of all unique subjects found in references."""
+    def getSubjects(self) -> Tuple[str, ...]: # Java returns TreeSet (sorted set)
+        """Returns all unique subjects found in references, sorted and memoized as a tuple."""
         # Java returns new TreeSet<String>(subjects)
-        return sorted(list(set(self.subjects))) # Ensure uniqueness and sort
+        return self.memoized("subjects", lambda: tuple(sorted(set(self.subjects)))) # Ensure uniqueness and sort
 
     # Method: getObjects (public in Java)
-    def getObjects(self) -> List[str]: # Java returns TreeSet (sorted set)
-        """Returns a sorted list of all unique objects found in references."""
+    def getObjects(self) -> Tuple[str, ...]: # Java returns TreeSet (sorted set)
+        """Returns all unique objects found in references, sorted and memoized as a tuple."""
         # Java returns new TreeSet<String>(objects)
-        return sorted(list(set(self.objects))) # Ensure uniqueness and sort
+        return self.memoized("objects", lambda: tuple(sorted(set(self.objects)))) # Ensure uniqueness and sort
 
     # Method: getSubjObj_Rels (public in Java)
     def getSubjObj_Rels(self, subject: str, object_ref: str) -> Set[str]: # Java returns Set
         """Gets the set of relationship names connecting a specific subject to a specific object."""
         # Java: return new HashSet<String>(subjObj_Rels.get(subject + "." + object));
-        key = f"{subject}.{object_ref}"
+        key = (subject, object_ref)
         # Return a copy to prevent external modification
         return set(self.subjObj_Rels.get(key, []))
 
@@ -1607,27 +2323,31 @@ class DomainData:
         return self.inverseRels
     # Method: setInverseRels (public in Java)
     def setInverseRels(self, inverseRels: Dict[str, str]) -> None:
+        self.bumpGeneration()
         self.inverseRels = inverseRels
 
     # Method: getRelSubjs (public in Java)
-    def getRelSubjs(self) -> Dict[str, List[str]]: # Java returns Map<String, Vector<String>>
+    def getRelSubjs(self) -> ReferenceIndex: # Java returns Map<String, Vector<String>>
         return self.relSubjs
     # Method: setRelSubjs (public in Java)
     def setRelSubjs(self, relSubjs: Dict[str, List[str]]) -> None: # Java takes Map<String, Vector<String>>
-        self.relSubjs = relSubjs
+        self.bumpGeneration()
+        self.relSubjs = ReferenceIndex.fromMapping(relSubjs)
 
     # Method: getRelObjs (public in Java)
-    def getRelObjs(self) -> Dict[str, List[str]]: # Java returns Map<String, Vector<String>>
+    def getRelObjs(self) -> ReferenceIndex: # Java returns Map<String, Vector<String>>
         return self.relObjs
     # Method: setRelObjs (public in Java)
     def setRelObjs(self, relObjs: Dict[str, List[str]]) -> None: # Java takes Map<String, Vector<String>>
-        self.relObjs = relObjs
+        self.bumpGeneration()
+        self.relObjs = ReferenceIndex.fromMapping(relObjs)
 
     # Method: getAttrsRel (public in Java)
     def getAttrsRel(self) -> Dict[str, List[Attribute]]: # Java returns Map<String, Vector<Attribute>>
         return self.attrsRel
     # Method: setAttrsRel (public in Java)
     def setAttrsRel(self, attrsRel: Dict[str, List[Attribute]]) -> None: # Java takes Map<String, Vector<Attribute>>
+        self.bumpGeneration()
         self.attrsRel = attrsRel
 
     # Method: getInverse (public in Java)
@@ -1705,6 +2425,7 @@ class DomainData:
     # Method: removeEntities (public in Java)
     def removeEntities(self, entities_to_remove: List[Entity]) -> None: # Java takes List
         """Removes a list of entity objects from the tree if their domain differs from the main domain."""
+        self.bumpGeneration()
         # Java iterates and removes from getTopEntities() if domain is different.
         top_entities = self.getTopEntities() # Get the list
         removed_count = 0
@@ -1727,6 +2448,7 @@ class DomainData:
     # Method: removeRelationships (public in Java)
     def removeRelationships(self, domainToRemove: str) -> None:
         """Removes all relationships belonging to a specific domain."""
+        self.bumpGeneration()
         # Java finds all relationships, filters by domain, then calls removeRelationship for each.
         rels_to_remove = [r for r in self.getAllRelationships() if r.getDomain() == domainToRemove]
         print(f"Removing {len(rels_to_remove)} relationships belonging to domain: {domainToRemove}")
@@ -1736,22 +2458,31 @@ class DomainData:
     # Method: findInTree (public in Java)
     def findInTree(self, parent: Entity, nodeName: str) -> Optional[Entity]:
         """
-        Finds the entity/relationship with the given name in the tree starting from parent (DFS).
-        Case-insensitive search matching Java behavior.
-        Includes checks for None names and visited nodes.
+        Finds the entity/relationship with the given name among the descendants of parent.
+        Case-insensitive search matching Java behavior (Java visits the tree with a DFS; here the
+        name index kept by the root of the tree is used, see Entity.findDescendant).
         """
         if not parent:
             return None
-        children = parent.getChildren()
-        for child in children:_
-            child_name = child.getName() if hasattr(child, 'getName') else str(child)
-            if child_name.lower() == nodeName.lower():
-                return child
-            else:
-                result = self.findInTree(child, nodeName)
-                if result is not None:
-                    return result
-        return None
+        return parent.findDescendant(nodeName)
+
+    # Method: isSameOrDescendant (internal helper, not in Java)
+    def isSameOrDescendant(self, name: Optional[str], targetName: str, target: Optional[Entity]) -> bool:
+        """
+        Java check: name.equals(target) || findInTree(targetEntity, name)!=null, used by the inheritance-aware
+        queries for every reference. The descendant check uses the ancestry index of the entity tree
+        (Entity.getAncestryIndex), so it takes constant time instead of a visit of the subtree of target.
+
+        Args:
+            name: The subject or object of a reference.
+            targetName: The subject or object the query asks for.
+            target: The entity found in the tree for targetName (findInTree(entityTree, targetName)), or None.
+        """
+        if not name:
+            return False
+        if self.symbols.sameName(name, targetName):
+            return True
+        return target is not None and target.getAncestryIndex().hasDescendantNamed(target, name)
 
     # Method: getnTopEntities (public in Java)
     def getnTopEntities(self) -> int:
@@ -1763,7 +2494,7 @@ class DomainData:
         """Returns the number of non-top-level entities."""
         # Java: getAllEntitiesToString().size()-getnTopEntities();
         # Note: getAllEntitiesToString includes top-level entities.
-        return len(self.getAllEntitiesToString()) - self.getnTopEntities()
+        return self.memoized("nSubEntities", lambda: len(self.getAllEntitiesToString()) - self.getnTopEntities())
 
     # Method: getnTopRels (public in Java)
     def getnTopRels(self) -> int:
@@ -1797,278 +2528,350 @@ class DomainData:
     # Method: getRelationshipsWithSubj (public in Java)
     def getRelationshipsWithSubj(self, subject: str) -> Set[str]: # Java returns TreeSet
         """Retrieves the names of top-level relationships involving the subject (or its subclasses)."""
-        relationships: Set[str] = set()
-        subj_entity = self.findInTree(self.entityTree, subject) # Find entity for inheritance check
-
-        # Get all types this subject could represent (itself + subclasses)
-        subj_types: Set[str] = {subject.lower()} # Use lower case for comparison
-        if subj_entity:
-             try:
-                  # Assuming getAllSubclassNames includes the entity itself and returns lowercase names
-                  # Java's findInTree(subjEntity, ref.getSubject()) checks if ref.getSubject() is a descendant of subjEntity
-                  # Python equivalent: check if ref.getSubject() is in the set of subclass names
-                  subclass_names = {sub.lower() for sub in subj_entity.getAllSubclassNames(subclassRestriction=False)}
-                  subj_types.update(subclass_names)
-             except AttributeError:
-                  print(f"Warning: Entity class missing 'getAllSubclassNames'. Inheritance check in getRelationshipsWithSubj might be incomplete.")
-
-        for rel in self.getAllRelationships():
-            for ref in rel.getReferences():
-                # Check if the reference's subject is the target subject or one of its subclasses
-                if ref.getSubject().lower() in subj_types:
-                    # Add the top-level ancestor relationship name
-                    try:
-                         # Java uses r.getTop() - assuming Relationship has getTop() returning name
-                         top_rel_name = rel.getTop()
-                         relationships.add(top_rel_name)
-                    except AttributeError:
-                         print(f"Warning: Relationship class missing 'getTop'. Cannot determine top relationship for '{rel.getName()}'. Using direct name.")
-                         relationships.add(rel.getName()) # Fallback
-                    break # Found one match for this relationship, move to next rel
-        # Return set (unordered), Java returns TreeSet (ordered). Sort if needed.
-        # return sorted(list(relationships))
-        return relationships
+        return self.getTopRelationshipsWith(subject, self.getPostings()[0])
 
     # Method: getRelationshipsWithObj (public in Java)
     def getRelationshipsWithObj(self, object_ref: str) -> Set[str]: # Java returns TreeSet
         """Retrieves the names of top-level relationships involving the object (or its subclasses)."""
+        return self.getTopRelationshipsWith(object_ref, self.getPostings()[1])
+
+    # Method: getTopRelationshipsWith (internal helper, not in Java)
+    def getTopRelationshipsWith(self, entity_name: str, postings: PostingIndex) -> Set[str]:
+        """
+        Shared implementation of getRelationshipsWithSubj/WithObj. Java visits every reference of every
+        relationship; here the posting lists of the entity and of its subclasses give the relationships
+        holding matching references, which are mapped to their top relationship (r.getTop() in Java).
+        """
         relationships: Set[str] = set()
-        obj_entity = self.findInTree(self.entityTree, object_ref) # Find entity for inheritance check
+        entity = self.findInTree(self.entityTree, entity_name) # Find entity for inheritance check
 
-        obj_types: Set[str] = {object_ref.lower()} # Use lower case
-        if obj_entity:
+        # Get all types this entity could represent (itself + subclasses), as name IDs (case-insensitive)
+        types: Set[Optional[int]] = {self.symbols.lookup(entity_name)}
+        if entity:
              try:
-                  # Java's findInTree(objEntity, ref.getObject()) checks for descendants
-                  subclass_names = {sub.lower() for sub in obj_entity.getAllSubclassNames(subclassRestriction=False)}
-                  obj_types.update(subclass_names)
+                  # Java's findInTree(entity, ref.getSubject()) checks if ref.getSubject() is a descendant of entity
+                  types.update(self.symbols.lookup(sub) for sub in entity.getAllSubclassNames(subclassRestriction=False))
              except AttributeError:
-                  print(f"Warning: Entity class missing 'getAllSubclassNames'. Inheritance check in getRelationshipsWithObj might be incomplete.")
-
-        for rel in self.getAllRelationships():
-            for ref in rel.getReferences():
-                # Check if the reference's object is the target object or one of its subclasses
-                if ref.getObject().lower() in obj_types:
-                    try:
-                         top_rel_name = rel.getTop()
-                         relationships.add(top_rel_name)
-                    except AttributeError:
-                         print(f"Warning: Relationship class missing 'getTop'. Cannot determine top relationship for '{rel.getName()}'.")
-                         relationships.add(rel.getName())
-                    break # Found one match for this relationship, move to next rel
+                  print(f"Warning: Entity class missing 'getAllSubclassNames'. Inheritance check for '{entity_name}' might be incomplete.")
+
+        tops = self.getRelationshipTops()
+        types.discard(None) # Names without references
+        for name_id in types:
+            for rel_name in postings.postingsById(name_id):
+                top_rel_name = tops.get(rel_name)
+                if top_rel_name is not None: # None: no longer in the relationship tree
+                    relationships.add(top_rel_name)
         # Return set (unordered), Java returns TreeSet (ordered). Sort if needed.
-        # return sorted(list(relationships))
         return relationships
 
+    # Method: getRelationshipTops (internal helper, not in Java)
+    def getRelationshipTops(self) -> Mapping[str, str]:
+        """Maps the name of every relationship in the tree to the name of its top relationship (memoized)."""
+        def build() -> Mapping[str, str]:
+            tops: Dict[str, str] = {}
+            for rel in self.getAllRelationships():
+                try:
+                     tops.setdefault(rel.getName(), rel.getTop())
+                except AttributeError:
+                     tops.setdefault(rel.getName(), rel.getName()) # Fallback
+            return MappingProxyType(tops)
+        return self.memoized("relationshipTops", build)
+
     # Method: getObjsFromRel (public in Java - overloaded)
     # Version 2: getObjsFromRel(List<String> relationships)
     def getObjsFromRel(self, relationships: List[str]) -> List[str]: # Java returns Vector
         """Retrieves unique objects from a list of relationship names."""
         # Java uses TreeSet to collect unique objects, then returns Vector
-        objects_set: Set[str] = set()
-        for rel_name in relationships:
-            rel = self.getRelationship(rel_name)
-            if rel:
-                # Java iterates only direct references in this version
-                for ref in rel.getReferences():
-                    objects_set.add(ref.getObject())
-                # If inheritance is needed here (like in getObjsFromRel(String)), the logic would be different.
-                # Based on Java code, it seems only direct references are considered in this overload.
-
+        # Java iterates only direct references in this version, hence no inheritance on the relationship
+        objects_set = {o for rel_name in relationships for _, _, o in self.match(relationship=rel_name)}
         return sorted(list(objects_set)) # Return sorted list to mimic TreeSet -> Vector
 
     # Method: getSubjsFromRel (public in Java - overloaded)
     # Version 2: getSubjsFromRel(List<String> relationships)
     def getSubjsFromRel(self, relationships: List[str]) -> List[str]: # Java returns Vector
         """Retrieves unique subjects from a list of relationship names."""
-        # Java uses HashSet to collect unique subjects, then returns Vector
-        subjects_set: Set[str] = set()
-        for rel_name in relationships:
-            rel = self.getRelationship(rel_name)
-            if rel:
-                # Java iterates only direct references in this version
-                for ref in rel.getReferences():
-                    subjects_set.add(ref.getSubject())
-                # If inheritance is needed, logic would differ. Java code suggests direct refs only.
-
+        # Java uses HashSet to collect unique subjects, then returns Vector (direct references only)
+        subjects_set = {s for rel_name in relationships for s, _, _ in self.match(relationship=rel_name)}
         return sorted(list(subjects_set)) # Return sorted list
 
     # Method: getObjsFromSubjRel (public in Java)
     def getObjsFromSubjRel(self, subject: str, relName: str) -> Set[str]: # Java returns TreeSet
         """Retrieves objects related to a subject via a specific relationship (considering inheritance)."""
-        objects_set: Set[str] = set()
-        rel = self.getRelationship(relName)
-        if not rel: return set()
-
-        subj_entity = self.findInTree(self.entityTree, subject) # Find entity for inheritance check
-
-        try:
-            direct_references = rel.getReferences()
-        except AttributeError:
-            print(f"Warning: Relationship class missing 'getReferences' for '{relName}'.")
-            return set()
-        # --- End Correction ---
-
-        for ref in direct_references: # Use direct_references now
-            # Java check: ref.getSubject().equals(subject) || findInTree(parent, ref.getSubject())!=null
-            # This means: is the ref subject the exact subject OR a descendant of the subject?
-            is_match = False
-            ref_subject_name = ref.getSubject() # Avoid multiple calls
-            if ref_subject_name: # Check if subject name is not None
-                is_match = ref_subject_name.lower() == subject.lower()
-                if not is_match and subj_entity:
-                    # Check if ref.getSubject() is a descendant of subj_entity
-                    # Ensure findInTree handles None gracefully if subj_entity is None
-                    descendant_check = self.findInTree(subj_entity, ref_subject_name)
-                    is_match = descendant_check is not None
-
-            if is_match:
-                objects_set.add(ref.getObject())
-
+        # Java check on the direct references of the relationship:
+        # ref.getSubject().equals(subject) || findInTree(parent, ref.getSubject())!=null
         # Return set (unordered), Java returns TreeSet (ordered). Sort if needed for consistency.
-        # return sorted(list(objects_set))
-        return objects_set
+        return {o for _, _, o in self.match(subject=subject, relationship=relName)}
 
     # Method: getSubjsFromObjRel (public in Java)
     def getSubjsFromObjRel(self, object_ref: str, relName: str) -> Set[str]: # Java returns TreeSet
         """Retrieves subjects related to an object via a specific relationship (considering inheritance)."""
-        subjects_set: Set[str] = set()
-        rel = self.getRelationship(relName)
-        if not rel: return set()
-
-        obj_entity = self.findInTree(self.entityTree, object_ref) # Find entity for inheritance check
-
-        try:
-            direct_references = rel.getReferences()
-        except AttributeError:
-            print(f"Warning: Relationship class missing 'getReferences' for '{relName}'.")
-            return set()
-        # --- End Correction ---
-
-        for ref in direct_references: # Use direct_references now
-            # Java check: ref.getObject().equals(object) || findInTree(parent, ref.getObject())!=null
-            is_match = False
-            ref_object_name = ref.getObject() # Avoid multiple calls
-            if ref_object_name: # Check if object name is not None
-                is_match = ref_object_name.lower() == object_ref.lower()
-                if not is_match and obj_entity:
-                    # Ensure findInTree handles None gracefully if obj_entity is None
-                    descendant_check = self.findInTree(obj_entity, ref_object_name)
-                    is_match = descendant_check is not None
-
-            if is_match:
-                subjects_set.add(ref.getSubject())
-
-        # Return set (unordered), Java returns TreeSet (ordered). Sort if needed.
-        # return sorted(list(subjects_set))
-        return subjects_set
+        # Java check: ref.getObject().equals(object) || findInTree(parent, ref.getObject())!=null
+        return {s for s, _, _ in self.match(relationship=relName, object_ref=object_ref)}
 
     # Method: getRelFromSubjObj (public in Java)
     def getRelFromSubjObj(self, subject: str, object_ref: str) -> Set[str]: # Java returns TreeSet
         """Retrieves top-level relationship names connecting a subject and object (considering inheritance)."""
-        rels_set: Set[str] = set()
+        # Java visits every reference of every relationship, checking
+        # ref.getSubject().equals(subject) || findInTree(parentSubject, ref.getSubject())!=null (and the same for the object)
+        # and adding r.getTop() on a match. The materialized view has the result for each pair of IDs.
         subj_entity = self.findInTree(self.entityTree, subject)
         obj_entity = self.findInTree(self.entityTree, object_ref)
-
-        for rel in self.getAllRelationships():
-            for ref in rel.getReferences():
-                # Check subject inheritance: ref.getSubject().equals(subject) || findInTree(parentSubject, ref.getSubject())!=null
-                subj_match = ref.getSubject().lower() == subject.lower()
-                if not subj_match and subj_entity:
-                     subj_match = self.findInTree(subj_entity, ref.getSubject()) is not None
-
-                # Check object inheritance: ref.getObject().equals(object) || findInTree(parentObject, ref.getObject())!=null
-                obj_match = ref.getObject().lower() == object_ref.lower()
-                if not obj_match and obj_entity:
-                     obj_match = self.findInTree(obj_entity, ref.getObject()) is not None
-
-                if subj_match and obj_match:
-                    try:
-                         top_rel_name = rel.getTop()
-                         rels_set.add(top_rel_name)
-                    except AttributeError:
-                         print(f"Warning: Relationship class missing 'getTop'. Cannot determine top relationship for '{rel.getName()}'.")
-                         rels_set.add(rel.getName()) # Fallback
-                    break # Found a match for this relationship, move to next rel
         # Return set (unordered), Java returns TreeSet (ordered). Sort if needed.
-        # return sorted(list(rels_set))
-        return rels_set
+        return self.getSubjObjRelView().topRelationships(subject, subj_entity, object_ref, obj_entity)
+
+    # Method: getSubjObjRelView (internal helper, not in Java)
+    def getSubjObjRelView(self) -> SubjObjRelView:
+        """Gets the materialized view of getRelFromSubjObj, built once per version of the domain (memoized)."""
+        return self.memoized("subjObjRelView", lambda: SubjObjRelView(self.entityTree, self.getAllRelationships(),
+                                                                      self.getRelationshipTops()))
 
     # Method: getObjsFromSubRels (public in Java)
     def getObjsFromSubRels(self, subject: str, relationships: List[str]) -> List[str]: # Java returns List (Vector)
         """Retrieves unique objects related to a subject via a list of relationship names (considering inheritance)."""
-        # Java logic: find subject entity, use HashSet for uniqueness, iterate relationships, iterate refs, check subject inheritance, add object. Return Vector.
-        objects_set: Set[str] = set()
-        subj_entity = self.findInTree(self.entityTree, subject)
+        # Java logic: use HashSet for uniqueness, iterate the direct references of each relationship, check subject inheritance, add object. Return Vector.
+        objects_set = {o for rel_name in relationships for _, _, o in self.match(subject=subject, relationship=rel_name)}
+        return sorted(list(objects_set)) # Return sorted list to mimic HashSet -> Vector
 
-        for rel_name in relationships:
-            rel = self.getRelationship(rel_name)
-            if rel:
-                # --- Correction: Only iterate direct references of 'rel' ---
-                try:
-                    direct_references = rel.getReferences()
-                except AttributeError:
-                    print(f"Warning: Relationship class missing 'getReferences' for '{rel_name}'.")
-                    continue # Skip this relationship if it has no getReferences
-                # --- End Correction ---
-
-                for ref in direct_references: # Use direct_references now
-                    # Java check: ref.getSubject().equals(subject) || findInTree(parent, ref.getSubject())!=null
-                    is_match = False
-                    ref_subject_name = ref.getSubject()
-                    if ref_subject_name:
-                        is_match = ref_subject_name.lower() == subject.lower()
-                        if not is_match and subj_entity:
-                            is_match = self.findInTree(subj_entity, ref_subject_name) is not None
-
-                    if is_match:
-                        objects_set.add(ref.getObject())
+    # Method: getTripleIndex (internal helper, not in Java)
+    def getTripleIndex(self) -> TripleIndex:
+        """Gets the pattern index of the references used by match, built once per version of the domain (memoized)."""
+        return self.memoized("tripleIndex", lambda: TripleIndex(self.entityTree, self.relationshipTree))
 
-        return sorted(list(objects_set)) # Return sorted list to mimic HashSet -> Vector
+    # Method: match (internal helper, not in Java)
+    def match(self, subject: Optional[str] = None, relationship: Optional[str] = None, object_ref: Optional[str] = None,
+              inherit_subject: bool = True, inherit_object: bool = True, inherit_relationship: bool = False) -> Iterator[Triple]:
+        """
+        Finds the references matching a (subject, relationship, object) pattern, where each position is a
+        name or None for any. The lookups by subject, object or relationship (getObjsFromSubjRel,
+        getSubjsFromObj, ...) are all answered here: the most selective index for the bound positions is
+        read and the others are checked on the references read (see TripleIndex). Results are streamed.
+
+        Args:
+            subject: The subject name, or None.
+            relationship: The relationship name, or None.
+            object_ref: The object name, or None.
+            inherit_subject: If True, references whose subject is a descendant of the subject entity match too
+                             (the Java check ref.getSubject().equals(subject) || findInTree(parent, ref.getSubject())!=null).
+            inherit_object: The same for the object.
+            inherit_relationship: If True, references of the sub-relationships of the relationship match too;
+                                  the Java lookups only use the direct references of a relationship.
+
+        Returns:
+            Iterator[Triple]: The (subject, relationship name, object) of each matching reference.
+        """
+        return self.getTripleIndex().match(subject, relationship, object_ref, inherit_subject, inherit_object,
+                                           inherit_relationship)
+
+    # Method: explain (internal helper, not in Java)
+    def explain(self, subject: Optional[str] = None, relationship: Optional[str] = None, object_ref: Optional[str] = None,
+                inherit_subject: bool = True, inherit_object: bool = True, inherit_relationship: bool = False) -> str:
+        """
+        Describes how match would answer a pattern (same arguments): the index read, the number of
+        references it reads, the indexes rejected and the positions checked on every reference.
+
+        Returns:
+            str: The plan, one step per line.
+        """
+        return self.getTripleIndex().plan(subject, relationship, object_ref, inherit_subject, inherit_object,
+                                          inherit_relationship).explain()
+
+    # Method: getReferenceAdjacency (internal helper, not in Java)
+    def getReferenceAdjacency(self) -> "ReferenceAdjacency":
+        """
+        Gets the CSR view of the references used by the batch queries, building it again if a tree or a
+        reference changed since it was last built. Needs NumPy, which is only imported here.
+        """
+        try:
+            from .ReferenceAdjacency import ReferenceAdjacency
+        except ImportError as e:
+            raise ImportError("Batch queries need NumPy (pip install numpy)") from e
+        if self.referenceAdjacency is None or not self.referenceAdjacency.isUpToDate(self.entityTree, self.relationshipTree):
+            self.referenceAdjacency = ReferenceAdjacency(self.entityTree, self.relationshipTree)
+        return self.referenceAdjacency
+
+    # Method: getObjsFromSubjRelBatch (internal helper, not in Java)
+    def getObjsFromSubjRelBatch(self, pairs: Sequence[Tuple[str, str]], inheritance: bool = True) -> List[Set[str]]:
+        """
+        Batch version of getObjsFromSubjRel: answers many (subject, relationship) pairs at once with a
+        vectorized pass over a CSR view of the references (see ReferenceAdjacency).
+
+        Args:
+            pairs: The (subject, relationship name) pairs.
+            inheritance: False to only match references whose subject is exactly the given one.
+
+        Returns:
+            List[Set[str]]: For each pair, the same objects getObjsFromSubjRel(subject, relName) returns.
+        """
+        return self.getReferenceAdjacency().query(pairs, bySubject=True, inheritance=inheritance)
+
+    # Method: getSubjsFromObjRelBatch (internal helper, not in Java)
+    def getSubjsFromObjRelBatch(self, pairs: Sequence[Tuple[str, str]], inheritance: bool = True) -> List[Set[str]]:
+        """
+        Batch version of getSubjsFromObjRel, see getObjsFromSubjRelBatch.
+
+        Args:
+            pairs: The (object, relationship name) pairs.
+            inheritance: False to only match references whose object is exactly the given one.
+
+        Returns:
+            List[Set[str]]: For each pair, the same subjects getSubjsFromObjRel(object, relName) returns.
+        """
+        return self.getReferenceAdjacency().query(pairs, bySubject=False, inheritance=inheritance)
+
+    # Method: findPaths (internal helper, not in Java)
+    def findPaths(self, source: str, target: str, maxHops: int = 3, inheritance: bool = True,
+                  inverse: bool = False, k: Optional[int] = None) -> Iterator[EntityPath]:
+        """
+        Finds how two entity types are connected through at most maxHops references, e.g. Person -> Place
+        through bornIn, or through an Organization. Paths are found with a bounded bidirectional BFS over
+        the reference graph (see PathFinder) and streamed shortest first, so only the paths that are
+        consumed get enumerated.
+
+        Args:
+            source: The name of the start entity.
+            target: The name of the end entity.
+            maxHops: The maximum number of references in a path.
+            inheritance: If True, references of the descendants of an entity are followed too, and
+                         paths may end on a descendant of target (like getObjsFromSubj).
+            inverse: If True, references can also be followed from object to subject, labelled
+                     with the inverse relationship (Relationship.getInverse).
+            k: The maximum number of paths (the k shortest ones), or None for all of them.
+
+        Returns:
+            Iterator[EntityPath]: The paths, each a tuple of (subject, relationship, object) hops.
+        """
+        finder = self.memoized("pathFinder", lambda: PathFinder(self.entityTree, self.getAllRelationships()))
+        return finder.findPaths(source, target, maxHops, inheritance=inheritance, inverse=inverse, k=k)
+
+    # Method: findCycles (internal helper, not in Java)
+    def findCycles(self, maxLength: Optional[int] = None, simple: bool = False, directed: bool = True,
+                   cancel: Optional[Callable[[], bool]] = None) -> Iterator[Cycle]:
+        """
+        Finds the cycles of the reference graph, whose nodes are the entity names (case-insensitive)
+        and whose arcs go from the subject to the object of each reference. The cycles are enumerated
+        with Johnson's algorithm (see CycleFinder) and streamed, so the caller can stop at any point.
+
+        Args:
+            maxLength: The maximum number of entities in a cycle, or None for no limit.
+            simple: If True, only the simple cycles of Assignment4's simpleCycle.pl, i.e. the ones
+                    with no shortcut between two of their entities (CycleFinder.isSimple).
+            directed: False to follow references in both directions (simpleCycleUndirected.pl).
+            cancel: A callable returning True when the enumeration must stop (e.g. threading.Event.is_set).
+
+        Returns:
+            Iterator[Cycle]: The cycles, each a tuple of entity names starting from the smallest one.
+        """
+        def build() -> CycleFinder:
+            names: Dict[str, str] = {} # Lowercase name -> name as first written in a reference
+            arcs: List[Tuple[str, str]] = []
+            for rel in self.getAllRelationships():
+                for ref in rel.getReferences():
+                    subject, object_ref = ref.getSubject(), ref.getObject()
+                    if subject and object_ref:
+                        arcs.append((names.setdefault(subject.lower(), subject), names.setdefault(object_ref.lower(), object_ref)))
+            return CycleFinder(arcs, directed)
+
+        finder = self.memoized("cycleFinder" if directed else "undirectedCycleFinder", build)
+        return finder.simpleCycles(maxLength, cancel) if simple else finder.cycles(maxLength, cancel)
 
     # Method: getObjsFromSubj (public in Java)
     def getObjsFromSubj(self, subject: str) -> Set[str]: # Java returns TreeSet
         """Retrieves all unique objects related to a subject across all relationships (considering inheritance)."""
-        objects_set: Set[str] = set()
-        subj_entity = self.findInTree(self.entityTree, subject)
-
-        for rel in self.getAllRelationships():
-            for ref in rel.getReferences():
-                # Java check: ref.getSubject().equals(subject) || findInTree(parent, ref.getSubject())!=null
-                is_match = ref.getSubject().lower() == subject.lower()
-                if not is_match and subj_entity:
-                     is_match = self.findInTree(subj_entity, ref.getSubject()) is not None
-
-                if is_match:
-                    objects_set.add(ref.getObject())
+        # Java check on every reference: ref.getSubject().equals(subject) || findInTree(parent, ref.getSubject())!=null
         # Return set (unordered), Java returns TreeSet (ordered). Sort if needed.
-        # return sorted(list(objects_set))
-        return objects_set
+        return {o for _, _, o in self.match(subject=subject)}
 
     # Method: getSubjsFromObj (public in Java)
     def getSubjsFromObj(self, object_ref: str) -> Set[str]: # Java returns TreeSet
         """Retrieves all unique subjects related to an object across all relationships (considering inheritance)."""
-        subjects_set: Set[str] = set()
-        obj_entity = self.findInTree(self.entityTree, object_ref)
-
-        for rel in self.getAllRelationships():
-            for ref in rel.getReferences():
-                # Java check: ref.getObject().equals(object) || findInTree(parent, ref.getObject())!=null
-                is_match = ref.getObject().lower() == object_ref.lower()
-                if not is_match and obj_entity:
-                     is_match = self.findInTree(obj_entity, ref.getObject()) is not None
-
-                if is_match:
-                    subjects_set.add(ref.getSubject())
-        # Return set (unordered), Java returns TreeSet (ordered). Sort if needed.
-        # return sorted(list(subjects_set))
-        return subjects_set
+        # Java check on every reference: ref.getObject().equals(object) || findInTree(parent, ref.getObject())!=null
+        return {s for s, _, _ in self.match(object_ref=object_ref)}
 
     # Method: getAxioms (public in Java)
-    def getAxioms(self) -> Set[Axiom]: # Java returns HashSet
+    def getAxioms(self) -> AxiomStore: # Java returns HashSet
         """Returns the set of axioms."""
         return self.axioms
 
     # Method: setAxioms (public in Java)
     def setAxioms(self, axioms: Set[Axiom]) -> None: # Java takes HashSet
         """Sets the set of axioms."""
-        self.axioms = axioms
\ No newline at end of file
+        self.bumpGeneration()
+        self.axioms = axioms if isinstance(axioms, AxiomStore) else AxiomStore(axioms)
+
+    # Method: getDatalogFacts (internal helper, not in Java)
+    def getDatalogFacts(self) -> Tuple[Tuple[Tuple[str, int], FrozenSet[Tuple[Any, ...]]], ...]:
+        """
+        Gets the facts of the Prolog translation of the domain, in the order of TranslatorAPIProlog (e.g.
+        parent(Domain, Parent, Child)), as ((predicate, arity), facts) pairs for DatalogEngine.fromFacts.
+        They are translated once per version of the domain (memoized).
+        """
+        from .DatalogEngine import DatalogEngine # Imports TranslatorAPIProlog, which imports this module
+        def build() -> Tuple[Tuple[Tuple[str, int], FrozenSet[Tuple[Any, ...]]], ...]:
+            return tuple((predicate, frozenset(facts)) for predicate, facts in DatalogEngine.fromDomain(self).facts.items())
+        return self.memoized("datalogFacts", build)
+
+    # Method: getDatalogEngine (internal helper, not in Java)
+    def getDatalogEngine(self) -> "DatalogEngine":
+        """
+        Gets a Datalog engine holding the facts of the domain (getDatalogFacts) and the rules of the axioms
+        it compiles (DatalogEngine.isCompiled), evaluated. It is built once per version of the domain and of
+        its axioms (memoized) and must not be modified: build one with DatalogEngine.fromFacts to add rules.
+        """
+        from .DatalogEngine import DatalogEngine
+        def build() -> DatalogEngine:
+            engine = DatalogEngine.fromFacts(self.getDatalogFacts())
+            for axiom in sorted(self.axioms, key=lambda a: a.getName() or ""):
+                engine.addAxiom(axiom)
+            engine.evaluate()
+            return engine
+        return self.memoized("datalogEngine", build, (self.axioms.version,))
+
+    # Method: checkAxioms (internal helper, not in Java)
+    def checkAxioms(self, changed: Optional[Iterable[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Checks the constraints (clauses :- Body.) of the Datalog axioms against the domain, in process
+        (see getDatalogEngine), instead of consulting the Prolog translation.
+        After an edit, the names of the edited entities and relationships can be given: only the axioms
+        that may read them (AxiomStore.affected) are checked again, with the rules they need, and the
+        results of the other axioms are kept from the previous check. The facts of an entity are written
+        with its parent, so the descendants of the edited entities, before and after the edit, count as
+        edited too. Every axiom is checked if there was no previous check or the axioms changed since.
+
+        Args:
+            changed: The names of the entities and relationships edited since the last check, or None
+                     to check every axiom.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Axiom name -> variable bindings violating it, for each violated axiom.
+        """
+        from .DatalogEngine import DatalogEngine
+        previous = self.axiomViolations
+        facts = self.getDatalogFacts()
+        parents = dict(facts).get(("parent", 3), frozenset())
+        if changed is None or previous is None or previous[0] != self.axioms.version:
+            result = self.getDatalogEngine().violations()
+        else:
+            affected = self.axioms.affected(self.subtreeNames(changed, previous[2] | parents))
+            result = {name: found for name, found in previous[1].items() if name not in affected}
+            if affected:
+                engine = DatalogEngine.fromFacts(facts)
+                for name in sorted(self.axioms.required(affected)):
+                    engine.addAxiom(self.axioms.get(name))
+                result.update(engine.violations(affected))
+        self.axiomViolations = (self.axioms.version, result, parents)
+        return dict(result)
+
+    # Method: subtreeNames (internal helper, not in Java)
+    def subtreeNames(self, names: Iterable[str], parents: Iterable[Tuple[Any, ...]]) -> Set[str]:
+        """Gets the given names and the names of their descendants (lowercase), from parent(Domain, Parent, Child) facts."""
+        children: Dict[str, Set[str]] = {}
+        for _, parent, child in parents:
+            children.setdefault(parent, set()).add(child)
+        result = {name.lower() for name in names}
+        pending = list(result)
+        while pending:
+            for child in children.get(pending.pop(), ()):
+                if child not in result:
+                    result.add(child)
+                    pending.append(child)
+        return result
\ No newline at end of file
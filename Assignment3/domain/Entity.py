@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import List, Optional, TYPE_CHECKING
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
 
 # Use TYPE_CHECKING to avoid circular imports for type hints
 if TYPE_CHECKING:
@@ -8,6 +8,8 @@ if TYPE_CHECKING:
 
 from .DomainTag import DomainTag
 from .DefaultTreeNode import DefaultTreeNode
+from .AncestryIndex import AncestryIndex
+from .SymbolTable import SymbolTable, DEFAULT_SYMBOLS
 
 
 class Entity(DomainTag):
@@ -22,6 +24,18 @@ class Entity(DomainTag):
     children: List[Entity] = []  # List of child entities
     parent: Optional[Entity] = None  # Parent entity
     _abstract: bool = False  # Indicates if the entity is abstract
+    nameIndex: Optional[Dict[int, List[Entity]]] = None  # Name ID -> descendants, kept only by tree roots
+    symbols: Optional[SymbolTable] = None  # Symbol table of the domain, kept only by tree roots (see symbolTable)
+    nameId: int = -1  # Cached ID of name in nameIdSymbols (see getNameId)
+    nameIdName: Optional[str] = None  # Name the cached ID was computed for
+    nameIdSymbols: Optional[SymbolTable] = None  # Table the cached ID comes from
+    ancestryIndex: Optional[AncestryIndex] = None  # Built lazily by tree roots, None when out of date
+    structureVersion: int = 0  # Bumped on the tree root by every structural change of the tree
+    attributesVersion: int = 0  # Bumped on the tree root by every change of the attributes of its entities
+    allAttributes: Optional[Tuple[Attribute, ...]] = None  # Cached result of getAllAttributes
+    allAttributesKey: Optional[Tuple[Entity, int, int]] = None  # (root, structureVersion, attributesVersion) of the cache
+    preOrder: int = -1  # Pre-order number in the ancestry index of the tree
+    lastDescendant: int = -1  # Pre-order number of the last entity of the subtree
     name: str  # Name of the entity
 
     def __init__(self, name: str, domain: Optional[str] = None):
@@ -42,6 +56,8 @@ class Entity(DomainTag):
         self.children: List[Entity] = []
         self.parent: Optional[Entity] = None
         self._abstract: bool = False
+        self.nameIndex: Optional[Dict[int, List[Entity]]] = {}  # A new entity is the root of its own tree
+        self.ancestryIndex: Optional[AncestryIndex] = None
 
     def get_domain_type(self) -> str:
         """
@@ -91,18 +107,29 @@ class Entity(DomainTag):
             return self.getName()  
         return self.parent.getTop()  
 
-    def getAllAttributes(self) -> List[Attribute]:  
+    def getAllAttributes(self) -> Tuple[Attribute, ...]:  
         """
         Gets all attributes of this entity, including inherited attributes from its ancestors.
+        The result is cached until the attributes of an entity of the tree or the tree itself change
+        (see attributesChanged and treeChanged), so it is returned as an immutable tuple.
 
         Returns:
-            List[Attribute]: A list of all attributes (inherited and direct).
-        """
-        pathAttributes: List[Attribute] = []  
+            Tuple[Attribute, ...]: All attributes (inherited first, then direct).
+        """
+        root = self.getTreeRoot()
+        key = self.allAttributesKey
+        if (self.allAttributes is None or key is None or key[0] is not root
+                or key[1] != root.structureVersion or key[2] != root.attributesVersion):
+            self.allAttributes = self.buildAllAttributes()
+            self.allAttributesKey = (root, root.structureVersion, root.attributesVersion)
+        return self.allAttributes
+
+    def buildAllAttributes(self) -> Tuple[Attribute, ...]:
+        """Computes getAllAttributes: the attributes of the parent followed by the direct ones."""
+        pathAttributes: Tuple[Attribute, ...] = ()
         if self.parent is not None:
             pathAttributes = self.parent.getAllAttributes()  
-        pathAttributes.extend(self.getAttributes())  
-        return pathAttributes
+        return pathAttributes + tuple(self.getAttributes())
 
     def getAllAttributesToString(self) -> List[str]:  
         """
@@ -136,6 +163,13 @@ class Entity(DomainTag):
         """
         self.children.append(child)
         child.setParent(self)  
+        # The subtree of child is now indexed by the root of this tree
+        child.nameIndex = None
+        child.ancestryIndex = None
+        child.symbols = None
+        root = self.getTreeRoot()
+        child.indexSubtree(root.nameIndex, root.symbolTable())
+        root.treeChanged()
 
     def removeAllAttributes(self, entity: Entity) -> None:  
         """
@@ -146,6 +180,7 @@ class Entity(DomainTag):
         """
         attributesToRemove = {attr.getName() for attr in entity.getAttributes()}
         self.attributes = [attr for attr in self.attributes if attr.getName() not in attributesToRemove]  
+        self.attributesChanged()
 
     def getChild(self, name: str) -> Optional[Entity]:  
         """
@@ -157,8 +192,12 @@ class Entity(DomainTag):
         Returns:
             Optional[Entity]: The found child entity, or None if not found.
         """
+        symbols = self.symbolTable()
+        nameId = symbols.lookup(name)
+        if nameId is None:
+            return None
         for e in self.getChildren():  
-            if e.getName().lower() == name.lower():  
+            if e.getNameId(symbols) == nameId:  
                 return e
         return None
 
@@ -194,7 +233,14 @@ class Entity(DomainTag):
         Args:
             children: The list of child entities to set.
         """
+        root = self.getTreeRoot()
+        index, symbols = root.nameIndex, root.symbolTable()
+        for child in self.children:
+            child.unindexSubtree(index, symbols)
         self.children = children
+        for child in children:
+            child.indexSubtree(index, symbols)
+        root.treeChanged()
 
     def getParent(self) -> Optional[Entity]:  
         """
@@ -212,7 +258,10 @@ class Entity(DomainTag):
         Args:
             parent: The entity to set as the parent.
         """
+        # Both the old and the new tree see the attributes of this subtree change
+        self.attributesChanged()
         self.parent = parent
+        self.attributesChanged()
 
     def getNewAttributes(self) -> List[Attribute]:  
         """
@@ -293,6 +342,8 @@ class Entity(DomainTag):
             attr: The attribute to add.
         """
         self.attributes.append(attr)
+        self.adoptAttributes([attr])
+        self.attributesChanged()
 
     def addAttributes(self, attrs: List[Attribute]) -> None:  
         """
@@ -309,6 +360,8 @@ class Entity(DomainTag):
                 self.attributes.remove(existingAttrMap[newAttrName])
             self.attributes.append(newAttr)
             existingAttrMap[newAttrName] = newAttr
+        self.adoptAttributes(attrs)
+        self.attributesChanged()
 
     def removeAttribute(self, attributeName: str) -> None:  
         """
@@ -321,6 +374,7 @@ class Entity(DomainTag):
         attributeToRemove = self.getAttribute(attributeName)  
         if attributeToRemove:
             self.attributes.remove(attributeToRemove)
+            self.attributesChanged()
 
     def setAttributes(self, attributes: List[Attribute]) -> None:  
         """
@@ -330,6 +384,16 @@ class Entity(DomainTag):
             attributes: The list of attributes to set.
         """
         self.attributes = attributes
+        self.adoptAttributes(attributes)
+        self.attributesChanged()
+
+    def adoptAttributes(self, attrs: List[Attribute]) -> None:
+        """
+        Makes this entity the owner of the given direct attributes, so that changing one of them in place
+        (e.g. with Attribute.setMandatory) invalidates the caches of this tree (see Attribute.changed).
+        """
+        for attr in attrs:
+            attr.owner = self
 
     def findSubClass(self, nameSubClass: str) -> Optional[Entity]:  
         """
@@ -461,8 +525,12 @@ class Entity(DomainTag):
         Returns:
             bool: True if a direct child with that name exists, False otherwise.
         """
+        symbols = self.symbolTable()
+        nameId = symbols.lookup(entityName)
+        if nameId is None:
+            return False
         for e in self.getChildren():  
-            if e.getName().lower() == entityName.lower():  
+            if e.getNameId(symbols) == nameId:  
                 return True
         return False
 
@@ -483,29 +551,237 @@ class Entity(DomainTag):
             e = e.getParent()  
         return False
 
-    def removeChild(self, childName: str) -> None:  
+    def removeChild(self, child: Entity | str) -> None:  
         """
-        Removes a direct child entity by its name (case-insensitive).
+        Removes a direct child entity, given either the entity itself or its name (case-insensitive).
+        The removed entity becomes the root of its own tree.
         Internal helper method.
 
         Args:
-            childName: The name of the child to remove.
+            child: The child to remove, or its name.
         """
         childToRemove = None  
-        for child in self.children:
-            if child.getName().lower() == childName.lower():  
-                childToRemove = child
+        root = self.getTreeRoot()
+        symbols = root.symbolTable()
+        nameId = None if isinstance(child, Entity) else symbols.lookup(child)
+        for i, e in enumerate(self.children):
+            if e is child if isinstance(child, Entity) else nameId is not None and e.getNameId(symbols) == nameId:  
+                childToRemove = e
+                del self.children[i]
                 break
         if childToRemove:
-            self.children.remove(childToRemove)
+            childToRemove.unindexSubtree(root.nameIndex, symbols)
+            root.treeChanged()
             childToRemove.setParent(None)  
+            childToRemove.nameIndex = {}
+            childToRemove.ancestryIndex = None
+            childSymbols = childToRemove.symbolTable()
+            for descendant in childToRemove.getChildren():
+                descendant.indexSubtree(childToRemove.nameIndex, childSymbols)
 
     def detach(self) -> None:
         """
         Detaches this entity from its parent's list of children.
         """
         if self.parent:
-            self.parent.removeChild(self.getName())
+            self.parent.removeChild(self)
+
+    def setName(self, name: str) -> None:
+        """
+        Sets the name of the entity, updating the name index of its tree.
+
+        Args:
+            name: The new name.
+        """
+        root = self.getTreeRoot()
+        root.treeChanged()
+        if self.parent is None:
+            self.name = name
+            return
+        index, symbols = root.nameIndex, root.symbolTable()
+        self.unindexNode(index, symbols)
+        self.name = name
+        self.indexNode(index, symbols)
+
+    def getTreeRoot(self) -> Entity:
+        """
+        Gets the root of the tree this entity belongs to (the entity itself if it has no parent).
+
+        Returns:
+            Entity: The root entity.
+        """
+        e = self
+        while e.parent is not None:
+            e = e.parent
+        return e
+
+    def iterSubtree(self) -> Iterator[Entity]:
+        """
+        Iterates over this entity and all its descendants, in depth-first pre-order.
+
+        Returns:
+            Iterator[Entity]: The entities of the subtree.
+        """
+        stack = [self]
+        while stack:
+            e = stack.pop()
+            yield e
+            stack.extend(reversed(e.children))
+
+    def symbolTable(self) -> SymbolTable:
+        """
+        Gets the symbol table the names of the tree of this entity are interned in: the one of the
+        domain the tree belongs to (see setSymbolTable), or a process-wide one for standalone trees.
+
+        Returns:
+            SymbolTable: The table kept by the root of the tree.
+        """
+        root = self.getTreeRoot()
+        return root.symbols if root.symbols is not None else DEFAULT_SYMBOLS
+
+    def setSymbolTable(self, symbols: SymbolTable) -> None:
+        """
+        Makes this entity, which must be a tree root, intern the names of its tree in the given table,
+        indexing the tree again with the new IDs.
+
+        Args:
+            symbols: The symbol table of the domain.
+        """
+        self.symbols = symbols
+        self.nameIndex = {}
+        for child in self.children:
+            child.indexSubtree(self.nameIndex, symbols)
+        self.treeChanged()
+
+    def getNameId(self, symbols: SymbolTable) -> int:
+        """
+        Gets the ID of the name of this entity in the given table, interning it the first time.
+        An ID cached from a table the given one is layered over (SymbolTable.fork) is still valid.
+
+        Args:
+            symbols: The symbol table of the tree.
+
+        Returns:
+            int: The ID.
+        """
+        if self.nameIdName is not self.name or self.nameIdSymbols is None or not symbols.extends(self.nameIdSymbols):
+            self.nameId = symbols.intern(self.name or "")
+            self.nameIdName = self.name
+            self.nameIdSymbols = symbols
+        return self.nameId
+
+    def indexNode(self, index: Optional[Dict[int, List[Entity]]], symbols: SymbolTable) -> None:
+        """Adds this entity (only) to the given name index."""
+        if index is not None:
+            index.setdefault(self.getNameId(symbols), []).append(self)
+
+    def unindexNode(self, index: Optional[Dict[int, List[Entity]]], symbols: SymbolTable) -> None:
+        """Removes this entity (only) from the given name index."""
+        if index is None:
+            return
+        key = self.getNameId(symbols)
+        nodes = index.get(key, [])
+        for i, e in enumerate(nodes):
+            if e is self:
+                del nodes[i]
+                break
+        if not nodes:
+            index.pop(key, None)
+
+    def indexSubtree(self, index: Optional[Dict[int, List[Entity]]], symbols: SymbolTable) -> None:
+        """Adds this entity and all its descendants to the given name index."""
+        for e in self.iterSubtree():
+            e.indexNode(index, symbols)
+
+    def unindexSubtree(self, index: Optional[Dict[int, List[Entity]]], symbols: SymbolTable) -> None:
+        """Removes this entity and all its descendants from the given name index."""
+        for e in self.iterSubtree():
+            e.unindexNode(index, symbols)
+
+    def isDescendantOf(self, ancestor: Entity) -> bool:
+        """
+        Checks if ancestor is a proper ancestor of this entity, by identity.
+
+        Args:
+            ancestor: The candidate ancestor.
+
+        Returns:
+            bool: True if ancestor is found following the parents of this entity.
+        """
+        e = self.parent
+        while e is not None:
+            if e is ancestor:
+                return True
+            e = e.parent
+        return False
+
+    def treeChanged(self) -> None:
+        """
+        Records a structural change (children or names) of the tree this entity is the root of:
+        drops its ancestry index and bumps its structure version.
+        """
+        self.structureVersion += 1
+        self.ancestryIndex = None
+
+    def attributesChanged(self) -> None:
+        """
+        Records a change of the direct attributes of this entity (or of its parent) by bumping the
+        attributes version of its tree root, which invalidates the getAllAttributes caches of the tree.
+        """
+        self.getTreeRoot().attributesVersion += 1
+
+    def getAncestryIndex(self) -> AncestryIndex:
+        """
+        Gets the ancestry index of the tree this entity belongs to, numbering the tree again
+        if it changed since the index was last built.
+
+        Returns:
+            AncestryIndex: The up to date index of the tree.
+        """
+        root = self.getTreeRoot()
+        if root.ancestryIndex is None:
+            root.ancestryIndex = AncestryIndex(root)
+        return root.ancestryIndex
+
+    def findDescendant(self, name: str) -> Optional[Entity]:
+        """
+        Finds a descendant of this entity by its name (case-insensitive) using the name index of the tree,
+        instead of visiting the subtree.
+
+        Args:
+            name: The name of the descendant to find.
+
+        Returns:
+            Optional[Entity]: The descendant, or None if not found.
+        """
+        candidates = self.entitiesNamed(name)
+        if not candidates:
+            return None
+        matches = [e for e in candidates if e.isDescendantOf(self)]
+        if len(matches) <= 1:
+            return matches[0] if matches else None
+        # Same name more than once in the subtree: the first one in depth-first order wins
+        for e in self.iterSubtree():
+            if e is not self and any(e is m for m in matches):
+                return e
+        return None
+
+    def entitiesNamed(self, name: str) -> List[Entity]:
+        """
+        Gets the entities of the tree of this entity (root excluded) with the given name (case-insensitive),
+        from the name index of the tree. The list must not be modified.
+
+        Args:
+            name: The name to look for.
+
+        Returns:
+            List[Entity]: The entities with that name, possibly empty.
+        """
+        root = self.getTreeRoot()
+        nameId = root.symbolTable().lookup(name)
+        if nameId is None or root.nameIndex is None:
+            return []
+        return root.nameIndex.get(nameId, [])
 
     def getValues(self) -> List[str]:  
         """
@@ -0,0 +1,78 @@
+from __future__ import annotations
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Attribute import Attribute
+    from .Entity import Entity
+
+
+class EntityShape:
+    """
+    Compiled, read-only description of the attributes of an entity (inherited ones included), for the code
+    that validates or displays its instances (see DomainData.getEntityShape and Instance.buildShortDescription).
+    The flags of every attribute are read once: membership checks are done on frozensets and the values
+    allowed by select attributes and the targets of entity attributes are looked up by attribute name.
+
+    A shape is a snapshot of the schema: DomainData builds it again after the entity or one of its
+    ancestors changes, instead of updating it.
+    """
+    __slots__ = ("name", "attributes", "attributeNames", "positions", "mandatory", "distinguishing",
+                 "display", "descriptive", "selectValues", "targets")
+
+    def __init__(self, entity: Entity):
+        """
+        Compiles the shape of an entity.
+
+        Args:
+            entity: The entity, whose getAllAttributes gives the attributes in order.
+        """
+        attributes = entity.getAllAttributes()
+        self.name: Optional[str] = entity.getName()
+        self.attributes: Tuple[Attribute, ...] = attributes
+        self.attributeNames: Tuple[Optional[str], ...] = tuple(a.getName() for a in attributes)
+        # Attribute name -> position in attributes; an attribute redefined by a descendant gets its last position
+        self.positions: Mapping[Optional[str], int] = MappingProxyType(
+            {name: i for i, name in enumerate(self.attributeNames)})
+        self.mandatory: FrozenSet[Optional[str]] = frozenset(a.getName() for a in attributes if a.isMandatory())
+        self.distinguishing: FrozenSet[Optional[str]] = frozenset(a.getName() for a in attributes if a.isDistinguishing())
+        self.display: FrozenSet[Optional[str]] = frozenset(a.getName() for a in attributes if a.isDisplay())
+        # Names of the descriptive attributes (Attribute.isDescriptive), in order and with repetitions, as
+        # Instance.buildShortDescription visits them
+        self.descriptive: Tuple[Optional[str], ...] = tuple(a.getName() for a in attributes if a.isDescriptive())
+        selectValues: Dict[Optional[str], FrozenSet[str]] = {}
+        targets: Dict[Optional[str], str] = {}
+        for a in attributes:
+            if a.getDataType() == "select":
+                selectValues[a.getName()] = frozenset(a.getValues())
+            if a.getTarget():
+                targets[a.getName()] = a.getTarget()
+        self.selectValues: Mapping[Optional[str], FrozenSet[str]] = MappingProxyType(selectValues)
+        self.targets: Mapping[Optional[str], str] = MappingProxyType(targets) # Entity (or user type) of each typed attribute
+
+    def __setattr__(self, name: str, value: object) -> None:
+        if hasattr(self, name):
+            raise AttributeError(f"EntityShape is read-only, can't set '{name}'")
+        object.__setattr__(self, name, value)
+
+    def validate(self, attributeValues: Mapping[str, Optional[str]]) -> List[str]:
+        """
+        Checks the attribute values of an instance of the entity.
+
+        Args:
+            attributeValues: Attribute name -> value, like Instance.getAttributeValues.
+
+        Returns:
+            List[str]: The problems found, empty if the values are valid.
+        """
+        errors: List[str] = []
+        for name in self.positions: # Each name once, even if redefined by a descendant
+            if name in self.mandatory and not attributeValues.get(name):
+                errors.append(f"Missing mandatory attribute \"{name}\" for entity \"{self.name}\"")
+        for name, value in attributeValues.items():
+            if name not in self.positions:
+                errors.append(f"Attribute \"{name}\" is not defined for entity \"{self.name}\"")
+            elif value and name in self.selectValues and value not in self.selectValues[name]:
+                errors.append(f"Invalid value \"{value}\" for attribute \"{name}\" of entity \"{self.name}\", "
+                              f"where one of {sorted(self.selectValues[name])} was expected")
+        return errors
@@ -1,10 +1,11 @@
-from typing import Dict, List
+from typing import Dict, List, Union
 from .Attribute import Attribute
+from .EntityShape import EntityShape
 
 class Instance:
     """Class representing an instance with its type, id and attributes."""
     
-    def __init__(self, type: str, selectedInstanceId: str, attrVals: Dict[str, str], fields: List[Attribute]):
+    def __init__(self, type: str, selectedInstanceId: str, attrVals: Dict[str, str], fields: Union[List[Attribute], EntityShape]):
         """
         Initialize an Instance object.
         
@@ -12,7 +13,7 @@ class Instance:
             type: The type of the instance
             selectedInstanceId: The ID of the instance
             attrVals: Dictionary of attribute values
-            fields: List of Attribute objects
+            fields: List of Attribute objects, or the shape of the entity (DomainData.getEntityShape)
         """
         self.type: str = type
         self.selectedInstanceId: str = selectedInstanceId
@@ -20,7 +21,7 @@ class Instance:
         self.shortDescription: str = self.buildShortDescription(selectedInstanceId, type, attrVals, fields)
     
     def buildShortDescription(self, id: str, type: str, myAttributeValues: Dict[str, str], 
-                             fields: List[Attribute]) -> str:
+                             fields: Union[List[Attribute], EntityShape]) -> str:
         """
         Build a short description of the instance.
         
@@ -28,15 +29,20 @@ class Instance:
             id: Instance ID
             type: Instance type
             myAttributeValues: Dictionary of attribute values
-            fields: List of Attribute objects
+            fields: List of Attribute objects, or the shape of the entity, whose descriptive
+                    attribute names are already compiled
         
         Returns:
             Short description string
         """
         shortDescription = ""
-        for a in fields:
-            if a.isDescriptive() and myAttributeValues.get(a.getName()) is not None:
-                shortDescription += myAttributeValues.get(a.getName()) + " "
+        if isinstance(fields, EntityShape):
+            descriptive = fields.descriptive
+        else:
+            descriptive = [a.getName() for a in fields if a.isDescriptive()]
+        for name in descriptive:
+            if myAttributeValues.get(name) is not None:
+                shortDescription += myAttributeValues.get(name) + " "
         
         shortDescription += f"  <{id}:{type}>"
         return shortDescription
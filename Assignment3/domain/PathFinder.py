@@ -0,0 +1,194 @@
+from __future__ import annotations
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Entity import Entity
+    from .Relationship import Relationship
+
+Step = Tuple[str, str, str] # (subject, relationship, object) of one hop, as written in the reference
+EntityPath = Tuple[Step, ...]
+
+
+class PathFinder:
+    """
+    Path queries over the graph of the references of a domain (see DomainData.findPaths).
+    Nodes are entity names (case-insensitive) and each reference is an edge from its subject to its object,
+    labelled with its relationship; optionally references are also followed backwards, labelled with the
+    inverse relationship (Relationship.getInverse).
+    With inheritance, a hop from an entity can use any reference whose subject is the entity or one of
+    its descendants, and a path reaches the target when it ends on the target or on one of its descendants,
+    like getObjsFromSubj does for a single hop.
+
+    Shortest paths are found with a bounded bidirectional BFS: the balls around the source and the target
+    are grown, always on the smaller frontier, until their radii add up to the length being searched;
+    paths are then enumerated by increasing length, pruned with the distances to the target.
+    The finder is a read-only snapshot of the domain, built once per version (memoized by DomainData).
+    """
+
+    def __init__(self, entityTree: Entity, relationships: Iterable[Relationship]):
+        """
+        Builds the reference graph.
+
+        Args:
+            entityTree: The root of the entity tree, for inheritance.
+            relationships: All the relationships of the domain.
+        """
+        self.entityTree: Entity = entityTree
+        # Lowercase name -> (step, lowercase next name), sorted for a deterministic order
+        self.forward: Dict[str, List[Tuple[Step, str]]] = {}
+        # Same, with the references also followed backwards and labelled with the inverse name. A symmetric
+        # relationship gives the same hop both ways, so the two directions are merged without duplicates.
+        self.bothWays: Dict[str, List[Tuple[Step, str]]] = {}
+        # Lowercase name -> lowercase names with an edge to it
+        self.forwardSources: Dict[str, Set[str]] = {}
+        self.backwardSources: Dict[str, Set[str]] = {}
+        self.downCache: Dict[str, FrozenSet[str]] = {}
+        self.upCache: Dict[str, FrozenSet[str]] = {}
+
+        forward: Dict[str, Set[Tuple[Step, str]]] = {}
+        backward: Dict[str, Set[Tuple[Step, str]]] = {}
+        for rel in relationships:
+            inverse = rel.getInverse()
+            for ref in rel.getReferences():
+                subject, object_ref = ref.getSubject(), ref.getObject()
+                if not subject or not object_ref:
+                    continue
+                s, o = subject.lower(), object_ref.lower()
+                forward.setdefault(s, set()).add(((subject, rel.getName(), object_ref), o))
+                self.forwardSources.setdefault(o, set()).add(s)
+                if inverse:
+                    backward.setdefault(o, set()).add(((object_ref, inverse, subject), s))
+                    self.backwardSources.setdefault(s, set()).add(o)
+        self.forward = {name: sorted(edges) for name, edges in forward.items()}
+        self.bothWays = {name: sorted(forward.get(name, set()) | backward.get(name, set()))
+                         for name in forward.keys() | backward.keys()}
+
+    def down(self, name: str, inheritance: bool) -> FrozenSet[str]:
+        """
+        Gets the lowercase names matched by an entity name: the name itself and, with inheritance,
+        the names of the descendants of the entity (findInTree(entityTree, name)).
+        """
+        key = name.lower()
+        if not inheritance:
+            return frozenset((key,))
+        names = self.downCache.get(key)
+        if names is None:
+            entity = self.entityTree.findDescendant(name)
+            subtree = entity.iterSubtree() if entity is not None else ()
+            names = self.downCache[key] = frozenset([key] + [(e.getName() or "").lower() for e in subtree])
+        return names
+
+    def up(self, name: str, inheritance: bool) -> FrozenSet[str]:
+        """Gets the lowercase names whose down() set contains name (the converse of down)."""
+        key = name.lower()
+        if not inheritance:
+            return frozenset((key,))
+        names = self.upCache.get(key)
+        if names is None:
+            found = {key}
+            for entity in self.entityTree.entitiesNamed(key):
+                ancestor = entity.getParent()
+                while ancestor is not None and ancestor is not self.entityTree:
+                    candidate = (ancestor.getName() or "").lower()
+                    if key in self.down(candidate, True):
+                        found.add(candidate)
+                    ancestor = ancestor.getParent()
+            names = self.upCache[key] = frozenset(found)
+        return names
+
+    def successors(self, name: str, inheritance: bool, inverse: bool) -> Iterator[Tuple[Step, str]]:
+        """Iterates over the hops from an entity name: (step, lowercase name reached)."""
+        edges = self.bothWays if inverse else self.forward
+        for matched in sorted(self.down(name, inheritance)):
+            yield from edges.get(matched, ())
+
+    def predecessors(self, name: str, inheritance: bool, inverse: bool) -> Set[str]:
+        """Gets the lowercase names with a hop to name (the converse of successors)."""
+        sources = set(self.forwardSources.get(name, ()))
+        if inverse:
+            sources.update(self.backwardSources.get(name, ()))
+        result: Set[str] = set()
+        for source in sources:
+            result.update(self.up(source, inheritance))
+        return result
+
+    def findPaths(self, source: str, target: str, maxHops: int, inheritance: bool = True,
+                  inverse: bool = False, k: Optional[int] = None) -> Iterator[EntityPath]:
+        """
+        Yields the simple paths (no entity visited twice) of 1 to maxHops hops from source to target,
+        shortest first, stopping after k paths if k is given.
+
+        Args:
+            source: The name of the start entity.
+            target: The name of the end entity.
+            maxHops: The maximum number of hops.
+            inheritance: Whether descendants of an entity match it (see the class docstring).
+            inverse: Whether references can also be followed from object to subject.
+            k: The maximum number of paths, or None for all of them.
+
+        Yields:
+            EntityPath: The hops of each path, as (subject, relationship, object) tuples.
+        """
+        if k is not None and k <= 0:
+            return
+        start = source.lower()
+        targets = self.down(target, inheritance)
+        distS: Dict[str, int] = {start: 0}
+        distT: Dict[str, int] = {name: 0 for name in targets}
+        frontS: List[str] = [start]
+        frontT: List[str] = list(targets)
+        radii = [0, 0] # Radius of the source and of the target ball
+
+        def grow(length: int) -> None:
+            # Grow the smaller frontier until the radii cover paths of the given length
+            while radii[0] + radii[1] < length and (frontS or frontT):
+                if frontS and (not frontT or len(frontS) <= len(frontT)):
+                    nextFront = []
+                    for name in frontS:
+                        for _, reached in self.successors(name, inheritance, inverse):
+                            if reached not in distS:
+                                distS[reached] = radii[0] + 1
+                                nextFront.append(reached)
+                    frontS[:] = nextFront
+                    radii[0] += 1
+                else:
+                    nextFront = []
+                    for name in frontT:
+                        for previous in self.predecessors(name, inheritance, inverse):
+                            if previous not in distT:
+                                distT[previous] = radii[1] + 1
+                                nextFront.append(previous)
+                    frontT[:] = nextFront
+                    radii[1] += 1
+
+        produced = 0
+        for length in range(1, maxHops + 1):
+            grow(length)
+            # Every path of this length has a node in both balls whose distances add up to at most length
+            if not any(distS[name] + distT[name] <= length for name in distS.keys() & distT.keys()):
+                continue
+            targetComplete = not frontT
+            onPath: Set[str] = {start}
+            steps: List[Step] = []
+
+            def extend(name: str, remaining: int) -> Iterator[EntityPath]:
+                if remaining == 0:
+                    if name in targets:
+                        yield tuple(steps)
+                    return
+                if (targetComplete or remaining <= radii[1]) and distT.get(name, remaining + 1) > remaining:
+                    return # Too far from the target
+                for step, reached in self.successors(name, inheritance, inverse):
+                    if reached in onPath:
+                        continue
+                    onPath.add(reached)
+                    steps.append(step)
+                    yield from extend(reached, remaining - 1)
+                    steps.pop()
+                    onPath.discard(reached)
+
+            for path in extend(start, length):
+                yield path
+                produced += 1
+                if k is not None and produced >= k:
+                    return
@@ -0,0 +1,117 @@
+from typing import Dict, Iterable, Optional, Set
+
+from .SymbolTable import SymbolTable
+
+
+class PostingIndex:
+    """
+    Posting lists from entity names (case-insensitive) to the names of the relationships holding
+    references to them, with the number of such references, so a posting is dropped exactly when
+    its last reference is removed (see DomainData.subjPostings and objPostings).
+    Entity names are keyed by their ID in the symbol table of the domain.
+
+    Like ReferenceIndex, an index can be layered over a read-only base index shared with other
+    domains (see fork): the postings of a name are copied from the base the first time they change.
+    """
+
+    def __init__(self, symbols: SymbolTable, base: Optional["PostingIndex"] = None):
+        """
+        Initializes an empty index, optionally layered over a shared base index.
+
+        Args:
+            symbols: The symbol table of the domain (it must extend the table of base).
+            base: The read-only index this one starts from, or None.
+        """
+        self.symbols: SymbolTable = symbols
+        self.base: Optional[PostingIndex] = base
+        self.counts: Dict[int, Dict[str, int]] = {} # Entity name ID -> relationship name -> references
+
+    def fork(self, symbols: SymbolTable) -> "PostingIndex":
+        """
+        Creates an index layered over this one, which must not be modified anymore.
+
+        Args:
+            symbols: The symbol table of the new index, layered over the one of this index.
+
+        Returns:
+            PostingIndex: The copy-on-write index.
+        """
+        return PostingIndex(symbols, self)
+
+    def postings(self, name: str) -> Dict[str, int]:
+        """
+        Gets the relationships of an entity name with their reference counts. It must not be modified.
+
+        Args:
+            name: The entity name (any case).
+
+        Returns:
+            Dict[str, int]: Relationship name -> number of references.
+        """
+        nameId = self.symbols.lookup(name)
+        return self.postingsById(nameId) if nameId is not None else {}
+
+    def postingsById(self, nameId: int) -> Dict[str, int]:
+        """Same as postings, for the ID of the entity name. It must not be modified."""
+        counts = self.counts.get(nameId)
+        if counts is None and self.base is not None:
+            return self.base.postingsById(nameId)
+        return counts if counts is not None else {}
+
+    def writableCounts(self, key: int) -> Dict[str, int]:
+        """Gets the postings of a name ID owned by this index, copying them from the base or creating them."""
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = dict(self.base.postingsById(key)) if self.base is not None else {}
+            self.counts[key] = counts
+        return counts
+
+    def add(self, name: str, relName: str) -> None:
+        """
+        Records one more reference of relName involving name.
+
+        Args:
+            name: The subject or object of the reference.
+            relName: The relationship holding the reference.
+        """
+        counts = self.writableCounts(self.symbols.intern(name))
+        counts[relName] = counts.get(relName, 0) + 1
+
+    def discard(self, name: str, relName: str) -> None:
+        """
+        Records that a reference of relName involving name was removed.
+
+        Args:
+            name: The subject or object of the reference.
+            relName: The relationship holding the reference.
+        """
+        if relName not in self.postings(name):
+            return
+        counts = self.writableCounts(self.symbols.intern(name))
+        if counts[relName] > 1:
+            counts[relName] -= 1
+        else:
+            del counts[relName]
+
+    def discardRelationship(self, relName: str) -> None:
+        """
+        Removes every posting of a relationship, e.g. when it is removed from the domain.
+
+        Args:
+            relName: The relationship name.
+        """
+        keys: Set[int] = set(self.counts)
+        if self.base is not None:
+            keys.update(self.base.names())
+        for key in keys:
+            if relName in self.postingsById(key):
+                del self.writableCounts(key)[relName]
+
+    def names(self) -> Iterable[int]:
+        """Iterates over the IDs of the entity names with postings, including the ones of the base index."""
+        seen = set(self.counts)
+        yield from self.counts
+        if self.base is not None:
+            for key in self.base.names():
+                if key not in seen:
+                    yield key
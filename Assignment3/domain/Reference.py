@@ -6,7 +6,8 @@ class Reference:
     The Reference class represents an instance of a relationship, a link between two entities.
     It contains information about the subject, object, and attributes of the reference.
     """
-    
+    shared: bool = False # True for the references of a BaseLayer, shared by the domains forking it
+
     def __init__(self, subject: str, object: str, attributes: Optional[List[Attribute]] = None):
         """
         Constructs a Reference object with the given subject, object, and optionally attributes.
@@ -36,6 +37,7 @@ class Reference:
         Args:
             subject: the subject of the reference
         """
+        self.checkWritable()
         self.subject = subject
     
     def getObject(self) -> str:
@@ -54,6 +56,7 @@ class Reference:
         Args:
             object: the object of the reference
         """
+        self.checkWritable()
         self.object = object
     
     def getAttributes(self) -> Optional[List[Attribute]]:
@@ -72,7 +75,22 @@ class Reference:
         Args:
             attributes: the attributes of the reference
         """
+        self.checkWritable()
         self.attributes = attributes
+
+    def __getstate__(self) -> dict:
+        """A copy of a reference (copy, pickle, e.g. in a snapshot) is not shared."""
+        state = dict(self.__dict__)
+        state.pop("shared", None)
+        return state
+
+    def checkWritable(self) -> None:
+        """
+        Raises a ValueError if the reference is shared by the domains importing the same file
+        (see DomainData.forkBaseLayer): such a reference must be replaced, e.g. with Relationship.addReference.
+        """
+        if self.shared:
+            raise ValueError(f"{self} is shared by the domains importing its file and can't be changed in place")
     
     def __str__(self) -> str:
         """
@@ -0,0 +1,179 @@
+from __future__ import annotations
+from typing import Dict, List, Sequence, Set, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .AncestryIndex import AncestryIndex
+    from .SymbolTable import SymbolTable
+    from .Entity import Entity
+    from .Relationship import Relationship
+
+
+class ReferenceAdjacency:
+    """
+    Read-only compressed sparse row (CSR) view of the references of a domain, for batched queries
+    (see DomainData.getObjsFromSubjRelBatch and getSubjsFromObjRelBatch).
+    Entity names (case-insensitive) and relationships are coded as integers: a row is a
+    (relationship, subject) or (relationship, object) pair and holds the other side of its references,
+    so a whole batch of queries is answered with a few NumPy operations.
+    Inheritance is expanded with the pre-order numbering of the entity tree (AncestryIndex): the
+    descendants of an entity are a contiguous slice of the entities in pre-order.
+
+    The view is a snapshot of the domain: check isUpToDate before using it again.
+    """
+
+    def __init__(self, entityTree: Entity, relationshipTree: Relationship):
+        """
+        Builds the view of the references in relationshipTree, with the inheritance of entityTree.
+
+        Args:
+            entityTree: The root of the entity tree.
+            relationshipTree: The root of the relationship tree.
+        """
+        self.entityAncestry: AncestryIndex = entityTree.getAncestryIndex()
+        self.relationshipAncestry: AncestryIndex = relationshipTree.getAncestryIndex()
+        self.referencesVersion: int = relationshipTree.referencesVersion
+
+        self.symbols: SymbolTable = self.entityAncestry.symbols
+        self.nameCodes: Dict[int, int] = {} # Entity name ID -> code
+        self.values: List[str] = [] # Subjects and objects as written in the references
+        self.valueCodes: Dict[str, int] = {}
+
+        # Code and last descendant of each entity of the tree, by pre-order number
+        entities = list(entityTree.iterSubtree())
+        self.preOrderCodes: np.ndarray = np.array([self.nameCode(e.getName() or "") for e in entities], dtype=np.int64)
+        self.lastDescendants: np.ndarray = np.array([e.lastDescendant for e in entities], dtype=np.int64)
+        # Relationship name ID -> pre-order number of the relationship getRelationship returns
+        self.relationshipNumbers: Dict[int, int] = {}
+        for nameId, numbers in self.relationshipAncestry.byName.items():
+            pre = next((p for p in numbers if p > 0), None)
+            if pre is not None:
+                self.relationshipNumbers[nameId] = pre
+
+        columns: Tuple[List[int], ...] = ([], [], [], [], [])
+        rels, subjects, objects, subjectValues, objectValues = columns
+        for rel in relationshipTree.iterSubtree():
+            for ref in rel.getReferences():
+                subject, object_ref = ref.getSubject(), ref.getObject()
+                if not subject or not object_ref:
+                    continue
+                rels.append(rel.preOrder)
+                subjects.append(self.nameCode(subject))
+                objects.append(self.nameCode(object_ref))
+                subjectValues.append(self.valueCode(subject))
+                objectValues.append(self.valueCode(object_ref))
+
+        self.nCodes: int = max(len(self.nameCodes), 1)
+        self.nValues: int = max(len(self.values), 1)
+        relArray = np.array(rels, dtype=np.int64)
+        self.bySubject: Tuple[np.ndarray, np.ndarray, np.ndarray] = self.buildRows(
+            relArray, np.array(subjects, dtype=np.int64), np.array(objectValues, dtype=np.int64))
+        self.byObject: Tuple[np.ndarray, np.ndarray, np.ndarray] = self.buildRows(
+            relArray, np.array(objects, dtype=np.int64), np.array(subjectValues, dtype=np.int64))
+
+    def nameCode(self, name: str) -> int:
+        """Gets the code of an entity name (case-insensitive), adding it if needed."""
+        return self.nameCodes.setdefault(self.symbols.intern(name), len(self.nameCodes))
+
+    def valueCode(self, value: str) -> int:
+        """Gets the code of a subject or object as written in a reference, adding it if needed."""
+        code = self.valueCodes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.valueCodes[value] = code
+            self.values.append(value)
+        return code
+
+    def buildRows(self, rels: np.ndarray, keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Builds a CSR matrix whose rows are the (relationship, key) pairs.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: The sorted row ids, the row pointers
+            (the values of row i are values[pointers[i]:pointers[i + 1]]) and the values.
+        """
+        rowIds = rels * self.nCodes + keys
+        order = np.argsort(rowIds, kind="stable")
+        uniqueIds, counts = np.unique(rowIds[order], return_counts=True)
+        pointers = np.zeros(len(uniqueIds) + 1, dtype=np.int64)
+        np.cumsum(counts, out=pointers[1:])
+        return uniqueIds, pointers, values[order]
+
+    def isUpToDate(self, entityTree: Entity, relationshipTree: Relationship) -> bool:
+        """
+        Checks that neither tree changed and no reference was added or removed since this view was built.
+
+        Args:
+            entityTree: The root of the entity tree.
+            relationshipTree: The root of the relationship tree.
+
+        Returns:
+            bool: True if the view can still be used.
+        """
+        return (entityTree.ancestryIndex is self.entityAncestry
+                and relationshipTree.ancestryIndex is self.relationshipAncestry
+                and relationshipTree.referencesVersion == self.referencesVersion)
+
+    @staticmethod
+    def expand(starts: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Concatenates the ranges [starts[i], starts[i] + lengths[i]).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: For each element, the index i of its range and its value.
+        """
+        owners = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+        offsets = np.arange(len(owners), dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return owners, starts[owners] + offsets
+
+    def query(self, pairs: Sequence[Tuple[str, str]], bySubject: bool, inheritance: bool = True) -> List[Set[str]]:
+        """
+        Answers a batch of (entity, relationship name) queries in one vectorized pass, with the same
+        matching rules as DomainData.getObjsFromSubjRel and getSubjsFromObjRel.
+
+        Args:
+            pairs: The (subject, relationship) or (object, relationship) pairs.
+            bySubject: True to get the objects of the subjects, False to get the subjects of the objects.
+            inheritance: True to also match references whose entity is a descendant of the given one.
+
+        Returns:
+            List[Set[str]]: The result of each pair, in order.
+        """
+        n = len(pairs)
+        rowIds, pointers, values = self.bySubject if bySubject else self.byObject
+        rels = np.full(n, -1, dtype=np.int64)
+        codes = np.full(n, -1, dtype=np.int64)
+        firsts = np.zeros(n, dtype=np.int64) # Descendants of the entity: pre-order numbers [firsts, ends)
+        ends = np.zeros(n, dtype=np.int64)
+        for i, (name, relName) in enumerate(pairs):
+            rel = self.relationshipNumbers.get(self.relationshipAncestry.symbols.lookup(relName))
+            if rel is None:
+                continue
+            nameId = self.symbols.lookup(name)
+            rels[i] = rel
+            codes[i] = self.nameCodes.get(nameId, -1)
+            if inheritance:
+                # Same entity as findInTree(entityTree, name): the first one in pre-order, root excluded
+                pre = next((p for p in self.entityAncestry.numbersNamed(name) if p > 0), None)
+                if pre is not None:
+                    firsts[i], ends[i] = pre + 1, self.lastDescendants[pre] + 1
+
+        # Keys to look up: the entity itself (when it appears in a reference), then its descendants
+        hasCode = (codes >= 0).astype(np.int64)
+        lengths = np.where(rels >= 0, hasCode + ends - firsts, 0)
+        owners, positions = self.expand(firsts - hasCode, lengths)
+        descendantCodes = self.preOrderCodes[np.clip(positions, 0, len(self.preOrderCodes) - 1)]
+        keys = rels[owners] * self.nCodes + np.where(positions < firsts[owners], codes[owners], descendantCodes)
+
+        rows = np.searchsorted(rowIds, keys)
+        found = rows < len(rowIds)
+        found[found] = rowIds[rows[found]] == keys[found]
+        owners, rows = owners[found], rows[found]
+        valueOwners, valuePositions = self.expand(pointers[rows], pointers[rows + 1] - pointers[rows])
+        matches = np.unique(owners[valueOwners] * self.nValues + values[valuePositions])
+
+        results: List[Set[str]] = [set() for _ in range(n)]
+        for owner, value in zip((matches // self.nValues).tolist(), (matches % self.nValues).tolist()):
+            results[owner].add(self.values[value])
+        return results
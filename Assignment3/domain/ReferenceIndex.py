@@ -0,0 +1,155 @@
+from collections.abc import Mapping
+from typing import Dict, Hashable, Iterator, Optional, Set, Tuple
+
+
+class ReferenceIndex(Mapping):
+    """
+    Index of the references of a domain (Java: Map<String,Vector<String>> kept sorted by addValue).
+    Values are stored in sets, so adding or removing one is O(1); the sorted list of a key is only
+    built when it is read (index[key], get, items) and cached as a tuple until the key changes.
+    Composite keys are tuples, e.g. (subject, relationship), so names containing dots can't collide.
+
+    An index can be layered over a read-only base index shared with other domains (see fork): keys
+    are copied from the base the first time they are modified, and removed keys hide the base ones.
+    The sorted values returned by the index are tuples, so a caller can't desynchronize them from the
+    sets, nor change the values of a base index shared with other domains.
+    """
+
+    def __init__(self, base: Optional["ReferenceIndex"] = None):
+        """
+        Initializes an empty index, optionally layered over a shared base index.
+
+        Args:
+            base: The read-only index this one starts from, or None.
+        """
+        self.base: Optional[ReferenceIndex] = base
+        self.sets: Dict[Hashable, Set[str]] = {}
+        self.removed: Set[Hashable] = set() # Keys of the base index hidden by this one
+        self.sortedViews: Dict[Hashable, Tuple[str, ...]] = {}
+
+    @classmethod
+    def fromMapping(cls, mapping: Mapping) -> "ReferenceIndex":
+        """
+        Builds an index from a mapping of keys to lists of values.
+
+        Args:
+            mapping: The mapping to copy.
+
+        Returns:
+            ReferenceIndex: The new index.
+        """
+        index = cls()
+        for key, values in mapping.items():
+            for value in values:
+                index.add(key, value)
+        return index
+
+    def fork(self) -> "ReferenceIndex":
+        """
+        Creates an index layered over this one, which must not be modified anymore.
+
+        Returns:
+            ReferenceIndex: The copy-on-write index.
+        """
+        return ReferenceIndex(self)
+
+    def valueSet(self, key: Hashable) -> Optional[Set[str]]:
+        """
+        Gets the set of values of key, from this index or from the base one. It must not be modified.
+
+        Args:
+            key: The key.
+
+        Returns:
+            Optional[Set[str]]: The values, or None if the key is not in the index.
+        """
+        values = self.sets.get(key)
+        if values is None and self.base is not None and key not in self.removed:
+            values = self.base.valueSet(key)
+        return values
+
+    def writableSet(self, key: Hashable) -> Set[str]:
+        """Gets the set of values of key owned by this index, copying it from the base or creating it."""
+        values = self.sets.get(key)
+        if values is None:
+            base_values = self.valueSet(key)
+            values = set(base_values) if base_values else set()
+            self.sets[key] = values
+        return values
+
+    def add(self, key: Hashable, value: str) -> None:
+        """
+        Adds a value to key (no duplicates).
+
+        Args:
+            key: The key.
+            value: The value to add.
+        """
+        values = self.valueSet(key)
+        if values is not None and value in values:
+            return
+        self.writableSet(key).add(value)
+        self.sortedViews.pop(key, None)
+
+    def discard(self, key: Hashable, value: str) -> None:
+        """
+        Removes a value from key, if present. Keys left without values are removed.
+
+        Args:
+            key: The key.
+            value: The value to remove.
+        """
+        values = self.valueSet(key)
+        if values is None or value not in values:
+            return
+        values = self.writableSet(key)
+        values.discard(value)
+        self.sortedViews.pop(key, None)
+        if not values:
+            self.pop(key)
+
+    def pop(self, key: Hashable, default: Optional[Tuple[str, ...]] = None) -> Optional[Tuple[str, ...]]:
+        """
+        Removes key with all its values.
+
+        Args:
+            key: The key to remove.
+            default: Returned if key is not in the index.
+
+        Returns:
+            Optional[Tuple[str, ...]]: The sorted values of the removed key, or default.
+        """
+        if key not in self:
+            return default
+        values = self[key]
+        self.sets.pop(key, None)
+        self.sortedViews.pop(key, None)
+        if self.base is not None and key in self.base:
+            self.removed.add(key)
+        return values
+
+    def __getitem__(self, key: Hashable) -> Tuple[str, ...]:
+        """Gets the sorted values of key (built lazily and cached)."""
+        view = self.sortedViews.get(key)
+        if view is None:
+            if key not in self.sets and self.base is not None and key not in self.removed and key in self.base:
+                return self.base[key] # Shared with the base index
+            values = self.sets.get(key)
+            if values is None:
+                raise KeyError(key)
+            view = tuple(sorted(values))
+            self.sortedViews[key] = view
+        return view
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.sets or (self.base is not None and key not in self.removed and key in self.base)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        yield from self.sets
+        if self.base is not None:
+            for key in self.base:
+                if key not in self.sets and key not in self.removed:
+                    yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
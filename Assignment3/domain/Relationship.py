@@ -1,10 +1,11 @@
 from __future__ import annotations
-from typing import List, Optional, Set, TYPE_CHECKING
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 
 # Use TYPE_CHECKING to avoid circular imports for type hints
 if TYPE_CHECKING:
     from .Attribute import Attribute
     from .Reference import Reference
+    from .SymbolTable import SymbolTable
     # No need to import Entity again if it's in the same directory and imported below
 
 from .Entity import Entity
@@ -18,6 +19,10 @@ class Relationship(Entity):
     universalRelationshipName: str = "Relationship"
     inverse: str = None
     references: List[Reference] = []
+    referenceIndex: Dict[Tuple[int, int], Reference] = {} # (subject ID, object ID) -> first such reference
+    referenceSymbols: Optional[SymbolTable] = None # Symbol table the keys of referenceIndex come from
+    referenceIndexShared: bool = False # True while referenceIndex is the one of a base relationship (see shareReferences)
+    referencesVersion: int = 0 # Bumped on the tree root whenever a reference of the tree is added or removed
     parent: Optional[Relationship] = None
     children: List[Relationship] = [] # List of child relationships
     
@@ -39,6 +44,8 @@ class Relationship(Entity):
         super().__init__(name, domain)
         self.inverse: Optional[str] = inverse
         self.references: List[Reference] = []
+        self.referenceIndex: Dict[Tuple[int, int], Reference] = {}
+        self.referenceSymbols: Optional[SymbolTable] = None
         self.parent: Optional[Relationship] = None # Overrides Entity's parent type hint
         self.symmetric: bool = symmetric
 
@@ -65,6 +72,83 @@ class Relationship(Entity):
             references: A list of Reference objects.
         """
         self.references = references
+        self.reindexReferences()
+
+    def referenceKey(self, subject: str, object_ref: str, add: bool = True) -> Optional[Tuple[int, int]]:
+        """
+        Gets the key of a (subject, object) pair in the reference index: the IDs of both names in the
+        symbol table of the tree (case-insensitive).
+
+        Args:
+            subject: The subject name.
+            object_ref: The object name.
+            add: True to intern names seen for the first time, False to get None for them (lookups).
+
+        Returns:
+            Optional[Tuple[int, int]]: The pair of IDs, or None if add is False and a name is unknown.
+        """
+        symbols = self.referenceTable()
+        if add:
+            return (symbols.intern(subject), symbols.intern(object_ref))
+        subjectId, objectId = symbols.lookup(subject), symbols.lookup(object_ref)
+        return (subjectId, objectId) if subjectId is not None and objectId is not None else None
+
+    def referenceTable(self) -> SymbolTable:
+        """
+        Gets the symbol table of the tree, keying the reference index again if it was built with
+        another table (e.g. before this relationship was added to the tree of a domain).
+        """
+        symbols = self.symbolTable()
+        if self.referenceSymbols is None or not symbols.extends(self.referenceSymbols):
+            self.buildReferenceIndex(symbols)
+        return symbols
+
+    def buildReferenceIndex(self, symbols: SymbolTable) -> None:
+        """Builds the (subject, object) index from the list of references, with the IDs of the given table."""
+        self.referenceIndex = {}
+        self.referenceIndexShared = False
+        for r in self.references:
+            self.referenceIndex.setdefault((symbols.intern(r.getSubject()), symbols.intern(r.getObject())), r)
+        self.referenceSymbols = symbols
+
+    def shareReferences(self, base: Relationship) -> None:
+        """
+        Takes the references of a relationship of a shared base layer (see DomainData.forkBaseLayer):
+        the list is copied, while the (subject, object) index of base is shared until this relationship
+        adds or removes a reference (see writableReferenceIndex). The symbol table of this tree must be
+        layered over the one of base (SymbolTable.fork), otherwise the index is built again.
+
+        Args:
+            base: The relationship of the base layer, which must not be modified anymore.
+        """
+        self.references = list(base.references)
+        self.referenceIndex = base.referenceIndex
+        self.referenceSymbols = base.referenceSymbols
+        self.referenceIndexShared = True
+        self.referencesChanged()
+
+    def writableReferenceIndex(self) -> Dict[Tuple[int, int], Reference]:
+        """Gets the reference index owned by this relationship, copying the shared one first."""
+        if self.referenceIndexShared:
+            self.referenceIndex = dict(self.referenceIndex)
+            self.referenceIndexShared = False
+        return self.referenceIndex
+
+    def reindexReferences(self) -> None:
+        """
+        Rebuilds the (subject, object) index from the list of references, keeping the first reference
+        of each pair like the linear scan of getReference does.
+        Needed after changing the subject or object of a reference already in this relationship.
+        """
+        self.buildReferenceIndex(self.symbolTable())
+        self.referencesChanged()
+
+    def referencesChanged(self) -> None:
+        """
+        Bumps the references version of the tree this relationship belongs to, so views built
+        from the references of the tree (ReferenceAdjacency) know they are out of date.
+        """
+        self.getTreeRoot().referencesVersion += 1
 
     def removeRef(self, ref: Reference) -> None:
         """
@@ -73,8 +157,21 @@ class Relationship(Entity):
         Args:
             ref: The Reference object to remove.
         """
-        if ref in self.references:
-            self.references.remove(ref)
+        for i, r in enumerate(self.references):
+            if r is ref:
+                del self.references[i]
+                break
+        else:
+            return
+        self.referencesChanged()
+        key = self.referenceKey(ref.getSubject(), ref.getObject(), add=False)
+        if key is not None and self.referenceIndex.get(key) is ref:
+            # Another reference with the same pair may be left (only through setReferences)
+            index = self.writableReferenceIndex()
+            del index[key]
+            other = next((r for r in self.references if self.referenceKey(r.getSubject(), r.getObject(), add=False) == key), None)
+            if other is not None:
+                index[key] = other
 
     def getReferences(self) -> List[Reference]:
         """
@@ -97,7 +194,8 @@ class Relationship(Entity):
 
     def getReference(self, subject: str, object_ref: str) -> Optional[Reference]:
         """
-        Finds a reference based on the subject and object names (case-insensitive).
+        Finds a reference based on the subject and object names (case-insensitive),
+        using the (subject, object) index instead of scanning the references.
 
         Args:
             subject: The subject name to search for.
@@ -106,11 +204,8 @@ class Relationship(Entity):
         Returns:
             Optional[Reference]: The found Reference object, or None if not found.
         """
-        for r in self.references:
-            # Assuming getSubject() and getObject() return strings
-            if r.getSubject().lower() == subject.lower() and r.getObject().lower() == object_ref.lower():
-                return r
-        return None
+        key = self.referenceKey(subject, object_ref, add=False)
+        return self.referenceIndex.get(key) if key is not None else None
 
     def getObjects(self) -> Set[str]:
         """
@@ -142,7 +237,10 @@ class Relationship(Entity):
         Args:
             refs: A list of Reference objects to remove.
         """
-        self.references = [r for r in self.references if r not in refs]
+        # References have identity equality, so compare ids instead of scanning refs for each reference
+        ref_ids = {id(r) for r in refs}
+        self.references = [r for r in self.references if id(r) not in ref_ids]
+        self.reindexReferences()
 
     def getObj_Subjs(self, object_ref: str) -> List[str]:
         """
@@ -157,21 +255,21 @@ class Relationship(Entity):
         subjects = [r.getSubject() for r in self.references if r.getObject() == object_ref]
         return subjects
 
-    def getAllAttributes(self) -> List[Attribute]:
+    def buildAllAttributes(self) -> Tuple[Attribute, ...]:
         """
-        Gets all attributes of this relationship, including inherited ones and a default 'notes' attribute.
-        Overrides the Entity.getAllAttributes method.
+        Computes all attributes of this relationship, including inherited ones and a default 'notes' attribute.
+        Overrides the Entity.buildAllAttributes method, so getAllAttributes caches the result with 'notes'.
 
         Returns:
-            List[Attribute]: A list of all attributes.
+            Tuple[Attribute, ...]: All attributes.
         """
-        all_attributes = super().getAllAttributes() # Get attributes from Entity hierarchy
+        all_attributes = super().buildAllAttributes() # Get attributes from Entity hierarchy
         # Ensure 'notes' attribute is added only once and is of the correct type
         has_notes = any(attr.getName() == "notes" for attr in all_attributes)
         if not has_notes:
              # Assuming a simple text attribute constructor exists or is handled
             notes_attr = Attribute(name="notes", data_type="text")
-            all_attributes.append(notes_attr)
+            all_attributes += (notes_attr,)
         return all_attributes
 
     # getName is inherited from Entity
@@ -235,6 +333,9 @@ class Relationship(Entity):
         if existing_ref:
             self.removeRef(existing_ref)
         self.references.append(ref)
+        key = self.referenceKey(ref.getSubject(), ref.getObject())
+        self.writableReferenceIndex().setdefault(key, ref)
+        self.referencesChanged()
 
     def getChildrenRelationships(self) -> List[Relationship]:
         """
@@ -257,13 +358,11 @@ class Relationship(Entity):
         Args:
             children: The list of child relationships to set.
         """
-        # Clear existing parent references for removed children
-        for existing_child in self.getChildrenRelationships():
-             if existing_child not in children:
-                 existing_child.setParent(None) # Use Entity's setParent
+        # Remove existing children (clears their parent references and the tree's name index)
+        for existing_child in list(self.children):
+             self.removeChild(existing_child)
 
         # Set new children and update their parent references
-        self.children = [] # Clear existing children list first
         for child in children:
             self.addChild(child) # Use Entity's addChild which sets parent
 
@@ -298,10 +397,8 @@ class Relationship(Entity):
         """
         # Detach from previous parent if exists
         if self.parent and isinstance(self.parent, Relationship):
-             # Use Entity's _removeChild if available and appropriate
-             # Or manage the children list directly if _removeChild is not suitable
-             if self in self.parent.children:
-                 self.parent.children.remove(self)
+             # Entity's detach also keeps the name index of the tree up to date
+             self.detach()
 
         self.parent = parent
         if parent is not None:
@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class SchemaSnapshotCache:
+    """
+    On-disk cache of fully loaded DomainData states.
+    A snapshot is stored under a key made of the content hashes of the root .gbs file and of every
+    file it imported, so any change to one of them makes the old snapshot unreachable.
+    A small manifest per root file remembers which files were imported last time, which is needed
+    to compute the key before loading anything.
+    Snapshots are pickles: only point the cache to a folder you trust.
+    """
+
+    # Bump when the layout of DomainData changes so old snapshots are ignored
+    SNAPSHOT_VERSION: int = 13
+
+    def __init__(self, folder: str | Path):
+        """
+        Initializes the cache on the given folder, creating it if needed.
+
+        Args:
+            folder: The folder where manifests and snapshots are stored.
+        """
+        self.folder: Path = Path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def fileHash(path: str | Path) -> str:
+        """
+        Computes the SHA-256 hash of a file's content.
+
+        Args:
+            path: The file to hash.
+
+        Returns:
+            str: The hex digest of the file content.
+        """
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def manifestPath(self, rootPath: str, domainName: Optional[str]) -> Path:
+        """
+        Gets the manifest file for a root .gbs file loaded with the given (optional) forced domain name.
+
+        Args:
+            rootPath: The absolute path of the root .gbs file.
+            domainName: The domain name forced by the caller, or None.
+
+        Returns:
+            Path: The manifest file path.
+        """
+        name = hashlib.sha256(f"{rootPath}|{domainName}".encode("utf-8")).hexdigest()
+        return self.folder / f"{name}.manifest.json"
+
+    def snapshotKey(self, rootPath: str, domainName: Optional[str], importedFiles: List[str]) -> Optional[str]:
+        """
+        Computes the snapshot key from the content hashes of the root file and of the imported files.
+
+        Args:
+            rootPath: The absolute path of the root .gbs file.
+            domainName: The domain name forced by the caller, or None.
+            importedFiles: The absolute paths of the imported files, in import order.
+
+        Returns:
+            Optional[str]: The key, or None if one of the files can't be read anymore.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{self.SNAPSHOT_VERSION}|{domainName}".encode("utf-8"))
+        try:
+            for path in [rootPath] + list(importedFiles):
+                digest.update(f"|{path}={self.fileHash(path)}".encode("utf-8"))
+        except OSError:
+            return None
+        return digest.hexdigest()
+
+    def load(self, rootPath: str, domainName: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Looks up the snapshot matching the current content of the root file and its imports.
+
+        Args:
+            rootPath: The absolute path of the root .gbs file.
+            domainName: The domain name forced by the caller, or None.
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored DomainData state, or None on a miss.
+        """
+        try:
+            with open(self.manifestPath(rootPath, domainName), "r", encoding="utf-8") as f:
+                importedFiles = json.load(f)["importedFiles"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        key = self.snapshotKey(rootPath, domainName, importedFiles)
+        if key is None:
+            return None
+        try:
+            with open(self.folder / f"{key}.pickle", "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            # A truncated or incompatible snapshot is just a miss
+            print(f"Warning: Ignoring unreadable schema snapshot {key}: {e}")
+            return None
+
+    def store(self, rootPath: str, domainName: Optional[str], importedFiles: List[str], state: Dict[str, Any]) -> None:
+        """
+        Stores a loaded DomainData state and updates the manifest of the root file.
+        Files are written to a temporary name first and then renamed, so concurrent readers never
+        see a partial snapshot.
+
+        Args:
+            rootPath: The absolute path of the root .gbs file.
+            domainName: The domain name forced by the caller, or None.
+            importedFiles: The absolute paths of the imported files, in import order.
+            state: The DomainData state to store.
+        """
+        key = self.snapshotKey(rootPath, domainName, importedFiles)
+        if key is None:
+            return
+        self.writeAtomically(self.folder / f"{key}.pickle",
+                             pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL))
+        self.writeAtomically(self.manifestPath(rootPath, domainName),
+                             json.dumps({"rootPath": rootPath, "importedFiles": list(importedFiles)}).encode("utf-8"))
+
+    def isValidated(self, contentHash: str) -> bool:
+        """
+        Checks if a file with the given content hash was recorded as valid by markValidated.
+
+        Args:
+            contentHash: The content hash of the file (see fileHash).
+
+        Returns:
+            bool: True if the file passed validation before.
+        """
+        return (self.folder / f"{contentHash}.validated").is_file()
+
+    def markValidated(self, contentHash: str) -> None:
+        """
+        Records that a file with the given content hash passed validation, for DomainData's trusted mode.
+
+        Args:
+            contentHash: The content hash of the file (see fileHash).
+        """
+        (self.folder / f"{contentHash}.validated").touch()
+
+    def writeAtomically(self, target: Path, data: bytes) -> None:
+        """
+        Writes data to a temporary file in the cache folder and renames it to target.
+
+        Args:
+            target: The final file path.
+            data: The bytes to write.
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
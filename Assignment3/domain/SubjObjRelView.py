@@ -0,0 +1,99 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Entity import Entity
+    from .Relationship import Relationship
+    from .SymbolTable import SymbolTable
+
+
+class SubjObjRelView:
+    """
+    Materialized view answering DomainData.getRelFromSubjObj with a few dictionary lookups.
+    Entities are identified by integer IDs: the pre-order number of each entity of the tree (see AncestryIndex)
+    and, after those, one ID per name (case-insensitive, see SymbolTable). Every reference (s, o) is expanded once to the ID of its names
+    and to the IDs of all the ancestors of the entities named s and o, and the view maps each resulting pair
+    of IDs to a bitset of the top relationships holding such a reference.
+
+    A query for (subject, object) then reads the pairs made of the name ID and the entity ID of each side:
+    this matches the references whose subject is the subject or one of its descendants, and the same
+    for the object, like the Java loop over every reference does.
+    The view is read-only and is rebuilt for each version of the domain (see DomainData.getSubjObjRelView).
+    """
+
+    def __init__(self, entityTree: Entity, relationships: Iterable[Relationship], tops: Mapping[str, str]):
+        """
+        Builds the view of the references of the given relationships.
+
+        Args:
+            entityTree: The root of the entity tree.
+            relationships: All the relationships of the domain.
+            tops: Relationship name -> name of its top relationship.
+        """
+        self.nEntities: int = entityTree.getAncestryIndex().size
+        self.entityTree: Entity = entityTree
+        self.symbols: SymbolTable = entityTree.symbolTable()
+        self.nameIds: Dict[int, int] = {} # Symbol ID of a name -> ID in the view (after the entity IDs)
+        self.topNames: List[str] = [] # Bit i of a bitset -> top relationship name
+        self.pairs: Dict[Tuple[int, int], int] = {} # (subject ID, object ID) -> bitset of top relationships
+
+        topBits: Dict[str, int] = {}
+        expansions: Dict[str, Tuple[int, ...]] = {}
+        for rel in relationships:
+            top = tops.get(rel.getName(), rel.getName())
+            bit = topBits.get(top)
+            if bit is None:
+                bit = topBits[top] = 1 << len(self.topNames)
+                self.topNames.append(top)
+            for ref in rel.getReferences():
+                subject, object_ref = ref.getSubject(), ref.getObject()
+                if not subject or not object_ref:
+                    continue
+                subjectIds = expansions.get(subject) or expansions.setdefault(subject, self.expand(subject))
+                objectIds = expansions.get(object_ref) or expansions.setdefault(object_ref, self.expand(object_ref))
+                for s in subjectIds:
+                    for o in objectIds:
+                        self.pairs[(s, o)] = self.pairs.get((s, o), 0) | bit
+
+    def nameId(self, name: str, add: bool = False) -> Optional[int]:
+        """Gets the ID of a name (case-insensitive), adding it if add is True."""
+        key = self.symbols.intern(name) if add else self.symbols.lookup(name)
+        nameId = self.nameIds.get(key)
+        if nameId is None and add:
+            nameId = self.nameIds[key] = self.nEntities + len(self.nameIds)
+        return nameId
+
+    def expand(self, name: str) -> Tuple[int, ...]:
+        """
+        Gets the IDs a reference to name matches: the ID of the name and the entity IDs of every
+        ancestor of the entities with that name.
+        """
+        ids: Set[int] = {self.nameId(name, add=True)}
+        for entity in self.entityTree.entitiesNamed(name):
+            ancestor = entity.getParent()
+            while ancestor is not None:
+                ids.add(ancestor.preOrder)
+                ancestor = ancestor.getParent()
+        return tuple(ids)
+
+    def topRelationships(self, subject: str, subjEntity: Optional[Entity], object_ref: str, objEntity: Optional[Entity]) -> Set[str]:
+        """
+        Gets the top relationships with a reference from subject (or a descendant of subjEntity)
+        to object_ref (or a descendant of objEntity).
+
+        Args:
+            subject: The subject name.
+            subjEntity: The entity found for the subject (findInTree), or None.
+            object_ref: The object name.
+            objEntity: The entity found for the object (findInTree), or None.
+
+        Returns:
+            Set[str]: The top relationship names.
+        """
+        subjectIds = [i for i in (self.nameId(subject), subjEntity.preOrder if subjEntity else None) if i is not None]
+        objectIds = [i for i in (self.nameId(object_ref), objEntity.preOrder if objEntity else None) if i is not None]
+        bits = 0
+        for s in subjectIds:
+            for o in objectIds:
+                bits |= self.pairs.get((s, o), 0)
+        return {name for i, name in enumerate(self.topNames) if bits >> i & 1}
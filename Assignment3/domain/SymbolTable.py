@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional
+
+
+class SymbolTable:
+    """
+    Interns the names of a domain (entities, relationships, attributes, subjects and objects of references).
+    Each name is casefolded once and gets a dense integer ID shared by all its spellings ("Person", "person"),
+    so the case-insensitive indexes of the domain are keyed and compared on integers instead of calling
+    lower() on both sides of every comparison. Every spelling is remembered with its ID, so looking up a
+    spelling seen before is a single dictionary lookup, and canonical() shares one string object per spelling.
+
+    Like ReferenceIndex, a table can be layered over a read-only base table shared with other domains
+    (see fork): the IDs of the base stay valid and new names get the IDs after them. The spellings and
+    strings of the base are read from it, so a layered table only stores what its domain adds.
+    The root of each entity and relationship tree keeps the table of its domain (see Entity.symbolTable).
+    """
+
+    def __init__(self, base: Optional["SymbolTable"] = None):
+        """
+        Initializes an empty table, optionally layered over a shared base table.
+
+        Args:
+            base: The read-only table this one starts from, or None.
+        """
+        self.base: Optional[SymbolTable] = base
+        self.offset: int = len(base) if base is not None else 0 # ID of the first name of this layer
+        self.ids: Dict[str, int] = {} # Casefolded name -> ID
+        self.folded: List[str] = [] # ID - offset -> casefolded name
+        self.spellings: Dict[str, int] = {} # Name as written -> ID (cache of casefold + lookup)
+        self.strings: Dict[str, str] = {} # Name as written -> the shared string object
+
+    def fork(self) -> "SymbolTable":
+        """
+        Creates a table layered over this one, which must not get new names anymore.
+
+        Returns:
+            SymbolTable: The layered table.
+        """
+        return SymbolTable(self)
+
+    def __len__(self) -> int:
+        return self.offset + len(self.folded)
+
+    def findFolded(self, folded: str) -> Optional[int]:
+        """Gets the ID of a casefolded name, from this table or from the base one, without adding it."""
+        nameId = self.ids.get(folded)
+        if nameId is None and self.base is not None:
+            nameId = self.base.findFolded(folded)
+        return nameId
+
+    def findSpelling(self, name: str) -> Optional[int]:
+        """Gets the ID of a spelling seen before, by this table or by the base one."""
+        nameId = self.spellings.get(name)
+        if nameId is None and self.base is not None:
+            nameId = self.base.findSpelling(name)
+        return nameId
+
+    def lookup(self, name: str) -> Optional[int]:
+        """
+        Gets the ID of a name (case-insensitive) without adding it, e.g. for a name given to a query.
+
+        Args:
+            name: The name, as written.
+
+        Returns:
+            Optional[int]: The ID, or None if no name of the domain matches.
+        """
+        nameId = self.findSpelling(name)
+        if nameId is None:
+            nameId = self.findFolded(name.casefold())
+            if nameId is not None:
+                self.spellings[name] = nameId
+        return nameId
+
+    def intern(self, name: str) -> int:
+        """
+        Gets the ID of a name (case-insensitive), adding it if it is new.
+
+        Args:
+            name: The name, as written.
+
+        Returns:
+            int: The ID.
+        """
+        nameId = self.findSpelling(name)
+        if nameId is None:
+            folded = name.casefold()
+            nameId = self.findFolded(folded)
+            if nameId is None:
+                nameId = len(self)
+                self.ids[folded] = nameId
+                self.folded.append(folded)
+            self.spellings[name] = nameId
+        return nameId
+
+    def canonical(self, name: str) -> str:
+        """
+        Interns a name and gets the string object shared by all the occurrences of this spelling,
+        so the indexes of the domain don't keep one copy of the name per reference.
+
+        Args:
+            name: The name, as written.
+
+        Returns:
+            str: An equal string, shared with the previous calls.
+        """
+        self.intern(name)
+        table: Optional[SymbolTable] = self
+        while table is not None:
+            shared = table.strings.get(name)
+            if shared is not None:
+                return shared
+            table = table.base
+        self.strings[name] = name
+        return name
+
+    def foldedName(self, nameId: int) -> str:
+        """Gets the casefolded name of an ID."""
+        if nameId < self.offset:
+            return self.base.foldedName(nameId)
+        return self.folded[nameId - self.offset]
+
+    def sameName(self, name: str, other: str) -> bool:
+        """
+        Checks if two names are the same name (case-insensitive), comparing their IDs.
+
+        Args:
+            name: A name.
+            other: Another name.
+
+        Returns:
+            bool: True if they only differ by case.
+        """
+        if name is other:
+            return True
+        nameId = self.lookup(name)
+        if nameId is None:
+            return name.casefold() == other.casefold()
+        return nameId == self.lookup(other)
+
+    def extends(self, other: "SymbolTable") -> bool:
+        """
+        Checks if the IDs of other are valid in this table: it is this table or one of its base tables.
+
+        Args:
+            other: The table the IDs come from.
+
+        Returns:
+            bool: True if the IDs can be used with this table.
+        """
+        table: Optional[SymbolTable] = self
+        while table is not None:
+            if table is other:
+                return True
+            table = table.base
+        return False
+
+
+DEFAULT_SYMBOLS = SymbolTable() # Used by the trees that don't belong to a domain (see Entity.symbolTable)
@@ -1,5 +1,10 @@
+import hashlib
 import io
-from typing import List, Dict, Optional, TYPE_CHECKING
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Set, TextIO, Tuple, TYPE_CHECKING
 
 # Assuming domain classes are in the same directory or package
 from .Attribute import Attribute
@@ -10,30 +15,248 @@ from .Relationship import Relationship
 if TYPE_CHECKING:
     from .TreeNode import TreeNode # Or from appropriate library
 
+translatedDomain: Optional[DomainData] = None # Domain translated by the worker processes, see iterProgramParallel
+
+# Module level so that they can be sent to a ProcessPoolExecutor
+def setTranslatedDomain(domain: DomainData) -> None:
+    """Initializer of the worker processes of TranslatorAPIProlog.iterProgramParallel."""
+    global translatedDomain
+    translatedDomain = domain
+
+def translatePart(part: Tuple[str, int]) -> str:
+    """
+    Worker function of TranslatorAPIProlog.iterProgramParallel: translates the subtree of one top-level
+    entity ("entity", i) or one top-level relationship ("relationship", i) of translatedDomain.
+    """
+    kind, i = part
+    if kind == "entity":
+        entity = translatedDomain.getTopEntities()[i]
+        domain_lower = entity.getDomain().lower() if entity.getDomain() else "unknown_domain"
+        name_lower = entity.getName().lower() if entity.getName() else "unknown_entity"
+        return "".join([*TranslatorAPIProlog.iterAttributes(domain_lower, name_lower, entity.getAttributes()),
+                        *TranslatorAPIProlog.iterChildren(entity, domain_lower, name_lower)])
+    return "".join(TranslatorAPIProlog.iterRelationships((translatedDomain.getTopRelationships()[i],)))
+
 class TranslatorAPIProlog:
 
     serialVersionUID: int = 1  # Placeholder for Java's serialVersionUID
+    FACT_LINE = re.compile(r"fact\((\w+), (.*), 1\)\.") # A line of the program, see readFacts
+    # Predicates of the indexed layout (see writeIndexedProgram) in output order, with their arguments.
+    # The first argument is the one our queries usually bind, so SWI-Prolog's first-argument indexing
+    # selects the clauses; the domain, the same for most facts, comes last.
+    INDEXED_PREDICATES: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+        ("domain", ("Domain",)),
+        ("entity", ("Entity", "Domain")),
+        ("parent", ("Parent", "Child", "Domain")),
+        ("attribute", ("Owner", "Attribute", "DataType", "Domain")),
+        ("values", ("Owner", "Attribute", "Values", "Domain")),
+        ("mandatory", ("Owner", "Attribute", "Domain")),
+        ("display", ("Owner", "Attribute", "Domain")),
+        ("distinguishing", ("Owner", "Attribute", "Domain")),
+        ("target", ("Owner", "Attribute", "Target", "Domain")),
+        ("relationship", ("Subject", "Relationship", "Object", "Domain")),
+        ("inverse", ("Relationship", "Inverse", "Domain")),
+        ("ancestor", ("Entity", "Ancestor", "Domain")),
+        ("inherited_attribute", ("Entity", "Attribute", "DefinedIn", "Domain")),
+        ("top_relationship", ("Relationship", "Top", "Domain")),
+    )
+    CLOSURE_PREDICATES: Tuple[str, ...] = ("ancestor", "inherited_attribute", "top_relationship")
     attributes: Optional[Dict[str, List[Attribute]]] = None
     attributesRel: Optional[Dict[str, List[Attribute]]] = None
     domainName: Optional[str] = None
     recur: str = ""
 
-    def __init__(self, domain: DomainData):
+    def __init__(self, domain: DomainData, printContent: bool = True, out: Optional[TextIO] = None):
         """
         Initializes the TranslatorAPIProlog instance and generates Prolog facts.
-        Mirrors the Java constructor.
+        Mirrors the Java constructor, which prints the program. The facts are streamed one line
+        at a time (see writeProgram), so the program is never held in memory.
+
+        Args:
+            domain: The domain to translate.
+            printContent: False to not print the program, e.g. when it is only written to out.
+            out: A text file-like object the program is also written to, or None.
         """
         if domain.getDomain() is None:
             raise ValueError("Domain name cannot be None")
 
-        content = f"domain({domain.getDomain().lower()}).\n"
-        content += TranslatorAPIProlog.createEntities(domain.getTopEntities())
-        content += TranslatorAPIProlog.createRelationships(domain.getTopRelationships())
+        sinks = [sink for sink in (sys.stdout if printContent else None, out) if sink is not None]
+        self.nFacts: int = 0
+        for line in TranslatorAPIProlog.iterFactsWithId(TranslatorAPIProlog.iterProgram(domain), "id"):
+            for sink in sinks:
+                sink.write(line)
+            self.nFacts += 1
+        if printContent:
+            sys.stdout.write("\n") # print(content) ends with an empty line
 
-        # output originale
-        content = TranslatorAPIProlog.writeFactsWithId(content, "id")
-        print(content)
+    @staticmethod
+    def writeProgram(domain: DomainData, out: TextIO, id_prefix: str = "id", contentIds: bool = False,
+                     workers: int = 1) -> int:
+        """
+        Writes the program of a domain, one fact(id_N, ..., 1). line at a time, to a text file-like object.
+        This is what the constructor prints, without building the string.
+
+        Args:
+            domain: The domain to translate.
+            out: The sink, e.g. an open file or io.StringIO.
+            id_prefix: The prefix of the fact IDs.
+            contentIds: True to derive the ID of each fact from its content (see iterFactsWithContentId)
+                        instead of numbering the facts, so the program can later be updated with writeDelta.
+            workers: The number of processes translating the domain (see iterProgramParallel), 1 to translate
+                     it in this process. The output is the same.
+
+        Returns:
+            int: The number of facts written.
+        """
+        if domain.getDomain() is None:
+            raise ValueError("Domain name cannot be None")
+        addIds = TranslatorAPIProlog.iterFactsWithContentId if contentIds else TranslatorAPIProlog.iterFactsWithId
+        if workers > 1:
+            facts = TranslatorAPIProlog.iterProgramParallel(domain, workers)
+        else:
+            facts = TranslatorAPIProlog.iterProgram(domain)
+        n = 0
+        for line in addIds(facts, id_prefix):
+            out.write(line)
+            n += 1
+        return n
 
+    @staticmethod
+    def iterProgram(domain: DomainData) -> Iterator[str]:
+        """Yields the facts of a domain (without IDs), one line at a time, in the order of the Java program."""
+        yield f"domain({domain.getDomain().lower()}).\n"
+        yield from TranslatorAPIProlog.iterEntities(domain.getTopEntities())
+        yield from TranslatorAPIProlog.iterRelationships(domain.getTopRelationships())
+
+    @staticmethod
+    def writeIndexedProgram(domain: DomainData, out: TextIO, closure: bool = True) -> int:
+        """
+        Writes the domain in the indexed export profile, meant to be consulted and queried directly instead
+        of through fact/3: plain facts grouped by predicate, each group declared :- dynamic (so a delta can
+        assert and retract them) and :- discontiguous, with the arguments in the order of INDEXED_PREDICATES.
+        The facts are the ones of the program of the constructor; with closure, the derived tables
+        ancestor/3 (every proper ancestor of each entity), inherited_attribute/4 (every attribute an entity
+        has, with the entity defining it) and top_relationship/3 (the top of every relationship, itself for
+        a top one) are added, so queries about subclasses and inherited attributes don't recurse on parent/3.
+
+        Args:
+            domain: The domain to translate.
+            out: The sink, e.g. an open file or io.StringIO.
+            closure: False to leave out the derived tables.
+
+        Returns:
+            int: The number of facts written.
+        """
+        if domain.getDomain() is None:
+            raise ValueError("Domain name cannot be None")
+        predicates = [(name, args) for name, args in TranslatorAPIProlog.INDEXED_PREDICATES
+                      if closure or name not in TranslatorAPIProlog.CLOSURE_PREDICATES]
+        groups: Dict[str, List[str]] = {name: [] for name, _ in predicates}
+        for predicate, args in TranslatorAPIProlog.iterIndexedRecords(domain, closure):
+            groups[predicate].append(f"{predicate}({', '.join(args)}).\n")
+
+        out.write(f"% Domain {domain.getDomain().lower()}: indexed export profile\n")
+        for name, args in predicates:
+            out.write(f":- dynamic {name}/{len(args)}.\n")
+            out.write(f":- discontiguous {name}/{len(args)}.\n")
+        n = 0
+        for name, args in predicates:
+            out.write(f"\n% {name}({', '.join(args)})\n")
+            seen = set()
+            for fact in groups[name]:
+                if fact not in seen: # Repeated references, or a derived fact reached twice, are written once
+                    seen.add(fact)
+                    out.write(fact)
+            n += len(seen)
+        return n
+
+    @staticmethod
+    def programArgs(predicate: str, args: Tuple[str, ...]) -> Tuple[str, ...]:
+        """
+        Reorders the arguments of a record of iterIndexedRecords as in the program of the constructor:
+        the domain first, and relationship(Domain, Relationship, Subject, Object).
+        """
+        if predicate == "domain":
+            return args
+        if predicate == "relationship":
+            subject, relationship, object_ref, domain_lower = args
+            return domain_lower, relationship, subject, object_ref
+        return (args[-1],) + args[:-1]
+
+    @staticmethod
+    def iterIndexedRecords(domain: DomainData, closure: bool = True) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        """Yields the facts of writeIndexedProgram as (predicate, arguments) records, not grouped nor deduplicated."""
+        def lower(name: Optional[str], unknown: str) -> str:
+            return name.lower() if name else unknown
+
+        yield "domain", (domain.getDomain().lower(),)
+        for top in domain.getTopEntities():
+            # (entity, its lowercase name and domain, lowercase names of its ancestors, attributes of its path)
+            stack = [(top, [], [])]
+            while stack:
+                entity, ancestors, inherited = stack.pop()
+                domain_lower = lower(entity.getDomain(), "unknown_domain")
+                name_lower = lower(entity.getName(), "unknown_entity")
+                yield "entity", (name_lower, domain_lower)
+                # As in the program of the constructor: all the attributes of a top-level entity, the new ones below
+                attributes = entity.getAttributes() if entity is top else entity.getNewAttributes()
+                for predicate, args in TranslatorAPIProlog.iterAttributeRecords(attributes):
+                    yield predicate, (name_lower,) + args + (domain_lower,)
+                path = inherited + [(a.getName().lower() if a.getName() else "unknown_attr", name_lower)
+                                    for a in entity.getAttributes()]
+                if closure:
+                    for ancestor in ancestors:
+                        yield "ancestor", (name_lower, ancestor, domain_lower)
+                    for attr_name_lower, defined_in in path:
+                        yield "inherited_attribute", (name_lower, attr_name_lower, defined_in, domain_lower)
+                for child in reversed(entity.getChildren() or []):
+                    yield "parent", (name_lower, lower(child.getName(), "unknown_child"), domain_lower)
+                    stack.append((child, [name_lower] + ancestors, path))
+
+        for relation in domain.getTopRelationships():
+            domain_lower = lower(relation.getDomain(), "unknown_domain")
+            rel_name_lower = lower(relation.getName(), "unknown_relation")
+            for ref in relation.getReferences() or ():
+                yield "relationship", (lower(ref.getSubject(), "unknown_subject"), rel_name_lower,
+                                       lower(ref.getObject(), "unknown_object"), domain_lower)
+            yield "inverse", (rel_name_lower, lower(relation.getInverse(), "unknown_inverse"), domain_lower)
+            for predicate, args in TranslatorAPIProlog.iterAttributeRecords(relation.getAttributes() or ()):
+                yield predicate, (rel_name_lower,) + args + (domain_lower,)
+            if closure:
+                for rel in relation.iterSubtree():
+                    yield "top_relationship", (lower(rel.getName(), "unknown_relation"), rel_name_lower,
+                                               lower(rel.getDomain(), "unknown_domain"))
+
+    @staticmethod
+    def iterProgramParallel(domain: DomainData, workers: Optional[int] = None) -> Iterator[str]:
+        """
+        Yields the same facts as iterProgram, translated in a pool of worker processes: one task per
+        top-level entity (its attributes and its subtree) and per top-level relationship. The domain is
+        sent to each worker once (inherited when processes are forked) and the chunks of facts are merged
+        back in the order of iterProgram, so the program is byte-identical to a serial translation.
+
+        Args:
+            domain: The domain to translate.
+            workers: The number of processes, or None for one per CPU.
+
+        Yields:
+            str: Chunks of facts, each made of whole lines.
+        """
+        entities = domain.getTopEntities()
+        relationships = domain.getTopRelationships()
+        yield f"domain({domain.getDomain().lower()}).\n"
+        for entity in entities:
+            domain_lower = entity.getDomain().lower() if entity.getDomain() else "unknown_domain"
+            name_lower = entity.getName().lower() if entity.getName() else "unknown_entity"
+            yield f"entity({domain_lower}, {name_lower}).\n"
+        parts = [("entity", i) for i in range(len(entities))] + [("relationship", i) for i in range(len(relationships))]
+        if not parts:
+            return
+        workers = workers or os.cpu_count() or 1
+        # A few tasks per worker and call, so that many small subtrees don't cost one round trip each
+        chunksize = max(1, len(parts) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers, initializer=setTranslatedDomain, initargs=(domain,)) as executor:
+            yield from executor.map(translatePart, parts, chunksize=chunksize)
 
     @staticmethod
     def writeFactsWithId(content: str, id_prefix: str) -> str:
@@ -41,153 +264,320 @@ class TranslatorAPIProlog:
         Adds a unique ID to each fact string.
         Mirrors the Java static method.
         """
+        return "".join(TranslatorAPIProlog.iterFactsWithId((content,), id_prefix))
+
+    @staticmethod
+    def iterFactsWithId(chunks: Iterable[str], id_prefix: str) -> Iterator[str]:
+        """
+        Streaming version of writeFactsWithId: adds a unique ID to each fact of a sequence of chunks of
+        facts, each made of whole lines (like the ones yielded by iterProgram), and yields the
+        fact(id_N, ..., 1). lines. Numbering goes on across the chunks.
+        """
         id_counter = 0
-        contentWithId = ""
-        # Split carefully, handling potential empty lines
-        facts = [line for line in content.splitlines() if line.strip()]
-        for fact in facts:
-            fact = fact[:-1]
-            # Format with ID
-            fact_with_id = f"fact({id_prefix}_{id_counter}, {fact}, 1).\n"
-            id_counter += 1
-            contentWithId += fact_with_id
-        return contentWithId
+        for chunk in chunks:
+            # Split carefully, handling potential empty lines
+            for fact in chunk.splitlines():
+                if not fact.strip():
+                    continue
+                fact = fact[:-1]
+                # Format with ID
+                yield f"fact({id_prefix}_{id_counter}, {fact}, 1).\n"
+                id_counter += 1
+
+    @staticmethod
+    def iterFactsWithContentId(chunks: Iterable[str], id_prefix: str) -> Iterator[str]:
+        """
+        Like iterFactsWithId, but the ID of a fact is a hash of its text (id_<16 hex digits>), so it does
+        not change when other facts are added or removed before it. The n-th repetition of the same fact
+        (n > 0) gets the suffix _n.
+        """
+        seen: Dict[str, int] = {}
+        for chunk in chunks:
+            for fact in chunk.splitlines():
+                if not fact.strip():
+                    continue
+                fact = fact[:-1]
+                occurrence = seen.get(fact, 0)
+                seen[fact] = occurrence + 1
+                yield f"fact({TranslatorAPIProlog.contentId(fact, occurrence, id_prefix)}, {fact}, 1).\n"
+
+    @staticmethod
+    def contentId(fact: str, occurrence: int, id_prefix: str) -> str:
+        """Gets the content-derived ID of a fact (without its final dot) for its given repetition."""
+        digest = hashlib.sha256(fact.encode("utf-8")).hexdigest()[:16]
+        return f"{id_prefix}_{digest}" if occurrence == 0 else f"{id_prefix}_{digest}_{occurrence}"
+
+    @staticmethod
+    def readFacts(lines: Iterable[str]) -> Dict[str, str]:
+        """
+        Reads a program written by writeProgram (e.g. an open file).
+
+        Args:
+            lines: The lines of the program.
+
+        Returns:
+            Dict[str, str]: Fact ID -> fact, as in fact(ID, fact, 1).
+        """
+        facts: Dict[str, str] = {}
+        for line in lines:
+            match = TranslatorAPIProlog.FACT_LINE.fullmatch(line.strip())
+            if match:
+                facts[match.group(1)] = match.group(2)
+        return facts
 
     @staticmethod
-    def createEntities(entities: List[Entity]) -> str:
+    def factOwner(fact: str) -> Optional[str]:
+        """
+        Gets the lowercase name of the entity or relationship a fact belongs to: the second argument
+        of the fact, or the child for parent facts (they are written with the subtree of the child).
+        The domain fact belongs to no entity.
+        """
+        open_paren = fact.find("(")
+        args = fact[open_paren + 1:].split(", ", 3)
+        position = TranslatorAPIProlog.ownerPosition(fact[:open_paren])
+        if position is None or len(args) <= position:
+            return None
+        return args[position].rstrip(")")
+
+    @staticmethod
+    def ownerPosition(predicate: str) -> Optional[int]:
+        """
+        Gets the position of the argument naming the entity or relationship a fact belongs to (see factOwner),
+        in the order of the program of the constructor: the child for parent/3, the second argument otherwise,
+        None for domain/1.
+        """
+        if predicate == "domain":
+            return None
+        return 2 if predicate == "parent" else 1
+
+    @staticmethod
+    def iterOwnedFacts(domain: DomainData, names: Iterable[str]) -> Iterator[str]:
+        """
+        Yields the facts of iterProgram that belong to the given entities and relationships (see factOwner),
+        without translating the rest of the domain.
+        """
+        for name in names:
+            for entity in domain.entityTree.entitiesNamed(name):
+                domain_lower = entity.getDomain().lower() if entity.getDomain() else "unknown_domain"
+                name_lower = entity.getName().lower() if entity.getName() else "unknown_entity"
+                parent = entity.getParent()
+                if parent is None or parent is domain.entityTree:
+                    attributes = entity.getAttributes()
+                else:
+                    parent_domain = parent.getDomain().lower() if parent.getDomain() else "unknown_domain"
+                    parent_name = parent.getName().lower() if parent.getName() else "unknown_entity"
+                    yield f"parent({parent_domain}, {parent_name}, {name_lower}).\n"
+                    attributes = entity.getNewAttributes()
+                yield f"entity({domain_lower}, {name_lower}).\n"
+                yield from TranslatorAPIProlog.iterAttributes(domain_lower, name_lower, attributes)
+            yield from TranslatorAPIProlog.iterRelationships(
+                rel for rel in domain.getTopRelationships() if (rel.getName() or "").lower() == name.lower())
+
+    @staticmethod
+    def subtreeScope(previous: Mapping[str, str], domain: DomainData, changed: Iterable[str]) -> Set[str]:
+        """
+        Widens the given names (lowercase) to their subtrees, since the facts of an entity are written with
+        its parent: the descendants in the entity tree of the domain, whose facts are translated again, and
+        the descendants recorded by the parent facts of the previous program, whose facts may be retracted.
+        """
+        children: Dict[str, Set[str]] = {}
+        for fact in previous.values():
+            if fact.startswith("parent("):
+                args = fact[len("parent("):].split(", ", 2)
+                if len(args) == 3:
+                    children.setdefault(args[1], set()).add(args[2].rstrip(")"))
+        scope = {name.lower() for name in changed}
+        pending = list(scope)
+        while pending:
+            name = pending.pop()
+            below = set(children.get(name, ()))
+            for entity in domain.entityTree.entitiesNamed(name):
+                below.update(child.getName().lower() for child in entity.getChildren() if child.getName())
+            for child in below - scope:
+                scope.add(child)
+                pending.append(child)
+        return scope
+
+    @staticmethod
+    def diffFacts(previous: Mapping[str, str], domain: DomainData, changed: Optional[Iterable[str]] = None,
+                  id_prefix: str = "id") -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Compares the facts of a program written with content IDs (see readFacts) with the current domain.
+
+        Args:
+            previous: Fact ID -> fact of the previous program.
+            domain: The current domain.
+            changed: The names of the entities and relationships added, removed or modified since the
+                     previous program, or None to compare every fact. Only their facts, and those of
+                     their descendants (see subtreeScope), are translated.
+            id_prefix: The prefix of the fact IDs.
+
+        Returns:
+            Tuple[Dict[str, str], Dict[str, str]]: The added facts and the retracted facts (fact ID -> fact).
+        """
+        if changed is None:
+            scope = None
+            facts = TranslatorAPIProlog.iterProgram(domain)
+        else:
+            scope = TranslatorAPIProlog.subtreeScope(previous, domain, changed)
+            facts = TranslatorAPIProlog.iterOwnedFacts(domain, sorted(scope))
+        current: Dict[str, str] = {}
+        for line in TranslatorAPIProlog.iterFactsWithContentId(facts, id_prefix):
+            match = TranslatorAPIProlog.FACT_LINE.fullmatch(line.strip())
+            if match and (scope is None or TranslatorAPIProlog.factOwner(match.group(2)) in scope):
+                current[match.group(1)] = match.group(2)
+        old = previous if scope is None else {
+            factId: fact for factId, fact in previous.items() if TranslatorAPIProlog.factOwner(fact) in scope}
+        added = {factId: fact for factId, fact in current.items() if factId not in old}
+        retracted = {factId: fact for factId, fact in old.items() if factId not in current}
+        return added, retracted
+
+    @staticmethod
+    def writeDelta(previous: Mapping[str, str], domain: DomainData, out: TextIO,
+                   changed: Optional[Iterable[str]] = None, id_prefix: str = "id") -> Tuple[int, int]:
+        """
+        Writes the changes between a previous program (written by writeProgram with contentIds=True) and the
+        current domain as Prolog directives: a retract for each removed fact, then an assertz for each new one.
+        Consulting the delta after the previous program gives the program of the current domain.
+
+        Args:
+            previous: Fact ID -> fact of the previous program (see readFacts).
+            domain: The current domain.
+            out: The sink of the delta.
+            changed: The names of the entities and relationships that changed, or None (see diffFacts).
+            id_prefix: The prefix of the fact IDs.
+
+        Returns:
+            Tuple[int, int]: The number of facts added and retracted.
+        """
+        if domain.getDomain() is None:
+            raise ValueError("Domain name cannot be None")
+        added, retracted = TranslatorAPIProlog.diffFacts(previous, domain, changed, id_prefix)
+        for factId, fact in retracted.items():
+            out.write(f":- retract(fact({factId}, {fact}, 1)).\n")
+        for factId, fact in added.items():
+            out.write(f":- assertz(fact({factId}, {fact}, 1)).\n")
+        return len(added), len(retracted)
+
+    @staticmethod
+    def createEntities(entities: Sequence[Entity]) -> str:
         """
         Generates Prolog facts for top-level entities and their attributes recursively.
         Mirrors the Java static method.
         """
-        values = ""
-        att = ""
+        return "".join(TranslatorAPIProlog.iterEntities(entities))
+
+    @staticmethod
+    def iterEntities(entities: Sequence[Entity]) -> Iterator[str]:
+        """
+        Streaming version of createEntities. As in Java, the entity facts of all the top-level entities
+        come first, then the attributes and the subtree of each of them.
+        """
+        for entity in entities:
+            domain_lower = entity.getDomain().lower() if entity.getDomain() else "unknown_domain"
+            name_lower = entity.getName().lower() if entity.getName() else "unknown_entity"
+            yield f"entity({domain_lower}, {name_lower}).\n"
         for entity in entities:
             domain_lower = entity.getDomain().lower() if entity.getDomain() else "unknown_domain"
             name_lower = entity.getName().lower() if entity.getName() else "unknown_entity"
-
-            values += f"entity({domain_lower}, {name_lower}).\n"
             # Use getAttributes() for top-level entities as in Java
-            for attr in entity.getAttributes():
-                attr_name_lower = attr.getName().lower() if attr.getName() else "unknown_attr"
-                attr_dtype_lower = attr.getDataType().lower() if attr.getDataType() else "unknown_type"
-
-                att += f"attribute({domain_lower}, {name_lower}, {attr_name_lower}, {attr_dtype_lower}).\n"
-                if attr.getValues(): # Check if list is not empty
-                    # Ensure getValuesToStringToLower exists and returns a Prolog-compatible list string
-                    values_str = attr.getValuesToStringToLower() # Assuming this method exists and formats correctly
-                    if values_str: # Check if the result is not empty
-                         att += f"values({domain_lower}, {name_lower}, {attr_name_lower}, {values_str}).\n"
-
-                if attr.getMandatory():
-                    att += f"mandatory({domain_lower}, {name_lower}, {attr_name_lower}).\n"
-                if attr.isDisplay():
-                    att += f"display({domain_lower}, {name_lower}, {attr_name_lower}).\n"
-                if attr.isDistinguishing():
-                    att += f"distinguishing({domain_lower}, {name_lower}, {attr_name_lower}).\n"
-                if attr.getTarget():
-                    target_lower = attr.getTarget().lower() # type: ignore
-                    att += f"target({domain_lower}, {name_lower}, {attr_name_lower}, {target_lower}).\n"
-
+            yield from TranslatorAPIProlog.iterAttributes(domain_lower, name_lower, entity.getAttributes())
             # Process children recursively
-            children = entity.getChildren()
-            if children:
-                 for e in children:
-                      child_name_lower = e.getName().lower() if e.getName() else "unknown_child"
-                      att += f"parent({domain_lower}, {name_lower}, {child_name_lower}).\n"
-                      # Call writeEntity for children as in Java
-                      att += TranslatorAPIProlog.writeEntity(e)
-        values += att
-        return values
+            yield from TranslatorAPIProlog.iterChildren(entity, domain_lower, name_lower)
 
     @staticmethod
-    def writeEntity(entity: Entity) -> str:
+    def iterAttributes(domain_lower: str, name_lower: str, attributes: Iterable[Attribute]) -> Iterator[str]:
+        """Yields the facts of the attributes of an entity or relationship (attribute, values, mandatory, ...)."""
+        for predicate, args in TranslatorAPIProlog.iterAttributeRecords(attributes):
+            yield f"{predicate}({domain_lower}, {name_lower}, {', '.join(args)}).\n"
+
+    @staticmethod
+    def iterAttributeRecords(attributes: Iterable[Attribute]) -> Iterator[Tuple[str, Tuple[str, ...]]]:
         """
-        Generates Prolog facts for a specific entity and its *new* attributes recursively.
-        Mirrors the Java static method.
+        Yields the facts of the attributes of an entity or relationship as (predicate, arguments) records,
+        without the domain and the entity or relationship, which each layout puts in its own place.
         """
-        att = ""
-        domain_lower = entity.getDomain().lower() if entity.getDomain() else "unknown_domain"
-        name_lower = entity.getName().lower() if entity.getName() else "unknown_entity"
-
-        att += f"entity({domain_lower}, {name_lower}).\n"
-        # Use getNewAttributes() for child entities as in Java
-        for attr in entity.getNewAttributes():
+        for attr in attributes:
             attr_name_lower = attr.getName().lower() if attr.getName() else "unknown_attr"
             attr_dtype_lower = attr.getDataType().lower() if attr.getDataType() else "unknown_type"
 
-            att += f"attribute({domain_lower}, {name_lower}, {attr_name_lower}, {attr_dtype_lower}).\n"
-            if attr.getValues():
-                values_str = attr.getValuesToStringToLower() # Assuming this method exists
-                if values_str:
-                    att += f"values({domain_lower}, {name_lower}, {attr_name_lower}, {values_str}).\n"
+            yield "attribute", (attr_name_lower, attr_dtype_lower)
+            if attr.getValues(): # Check if list is not empty
+                values_str = attr.getValuesToStringToLower()
+                if values_str: # Check if the result is not empty
+                    yield "values", (attr_name_lower, str(values_str))
             if attr.getMandatory():
-                att += f"mandatory({domain_lower}, {name_lower}, {attr_name_lower}).\n"
+                yield "mandatory", (attr_name_lower,)
             if attr.isDisplay():
-                att += f"display({domain_lower}, {name_lower}, {attr_name_lower}).\n"
+                yield "display", (attr_name_lower,)
             if attr.isDistinguishing():
-                att += f"distinguishing({domain_lower}, {name_lower}, {attr_name_lower}).\n"
+                yield "distinguishing", (attr_name_lower,)
             if attr.getTarget():
                 target_lower = attr.getTarget().lower() # type: ignore
-                att += f"target({domain_lower}, {name_lower}, {attr_name_lower}, {target_lower}).\n"
+                yield "target", (attr_name_lower, target_lower)
 
-        # Process children recursively
-        children = entity.getChildren()
-        if children:
-            for e in children:
-                child_name_lower = e.getName().lower() if e.getName() else "unknown_child"
-                att += f"parent({domain_lower}, {name_lower}, {child_name_lower}).\n"
-                att += TranslatorAPIProlog.writeEntity(e)
-        return att
+    @staticmethod
+    def iterChildren(entity: Entity, domain_lower: str, name_lower: str) -> Iterator[str]:
+        """
+        Yields, for each child of an entity, its parent fact followed by its writeEntity facts.
+        The subtree is visited with an explicit stack in the same order as the Java recursion,
+        so deep taxonomies don't hit the recursion limit.
+        """
+        stack = [(e, domain_lower, name_lower) for e in reversed(entity.getChildren() or [])]
+        while stack:
+            e, parent_domain, parent_name = stack.pop()
+            child_name_lower = e.getName().lower() if e.getName() else "unknown_child"
+            yield f"parent({parent_domain}, {parent_name}, {child_name_lower}).\n"
+            e_domain = e.getDomain().lower() if e.getDomain() else "unknown_domain"
+            e_name = e.getName().lower() if e.getName() else "unknown_entity"
+            yield f"entity({e_domain}, {e_name}).\n"
+            # Use getNewAttributes() for child entities as in Java
+            yield from TranslatorAPIProlog.iterAttributes(e_domain, e_name, e.getNewAttributes())
+            stack.extend((child, e_domain, e_name) for child in reversed(e.getChildren() or []))
 
     @staticmethod
-    def createRelationships(relationships: List[Relationship]) -> str:
+    def writeEntity(entity: Entity) -> str:
+        """
+        Generates Prolog facts for a specific entity and its *new* attributes recursively.
+        Mirrors the Java static method.
+        """
+        domain_lower = entity.getDomain().lower() if entity.getDomain() else "unknown_domain"
+        name_lower = entity.getName().lower() if entity.getName() else "unknown_entity"
+        return "".join([f"entity({domain_lower}, {name_lower}).\n",
+                        *TranslatorAPIProlog.iterAttributes(domain_lower, name_lower, entity.getNewAttributes()),
+                        *TranslatorAPIProlog.iterChildren(entity, domain_lower, name_lower)])
+
+    @staticmethod
+    def createRelationships(relationships: Sequence[Relationship]) -> str:
         """
         Generates Prolog facts for relationships, inverses, and attributes.
         Mirrors the Java static method.
         """
-        att = ""
+        return "".join(TranslatorAPIProlog.iterRelationships(relationships))
+
+    @staticmethod
+    def iterRelationships(relationships: Iterable[Relationship]) -> Iterator[str]:
+        """Streaming version of createRelationships."""
         for relation in relationships:
             domain_lower = relation.getDomain().lower() if relation.getDomain() else "unknown_domain"
             rel_name_lower = relation.getName().lower() if relation.getName() else "unknown_relation"
 
             # Relationship facts from references
-            refs = relation.getReferences()
-            if refs:
-                for ref in refs:
-                    subj_lower = ref.getSubject().lower() if ref.getSubject() else "unknown_subject"
-                    obj_lower = ref.getObject().lower() if ref.getObject() else "unknown_object"
-                    att += f"relationship({domain_lower}, {rel_name_lower}, {subj_lower}, {obj_lower}).\n"
+            for ref in relation.getReferences() or ():
+                subj_lower = ref.getSubject().lower() if ref.getSubject() else "unknown_subject"
+                obj_lower = ref.getObject().lower() if ref.getObject() else "unknown_object"
+                yield f"relationship({domain_lower}, {rel_name_lower}, {subj_lower}, {obj_lower}).\n"
 
             # Inverse relationship fact
             inv_lower = relation.getInverse().lower() if relation.getInverse() else "unknown_inverse"
-            att += f"inverse({domain_lower}, {rel_name_lower}, {inv_lower}).\n"
+            yield f"inverse({domain_lower}, {rel_name_lower}, {inv_lower}).\n"
 
             # Attributes of the relationship
-            rel_attrs = relation.getAttributes()
-            if rel_attrs:
-                for attr in rel_attrs:
-                    attr_name_lower = attr.getName().lower() if attr.getName() else "unknown_attr"
-                    attr_dtype_lower = attr.getDataType().lower() if attr.getDataType() else "unknown_type"
-
-                    att += f"attribute({domain_lower}, {rel_name_lower}, {attr_name_lower}, {attr_dtype_lower}).\n"
-                    if attr.getValues():
-                        values_str = attr.getValuesToStringToLower() # Assuming this method exists
-                        if values_str:
-                             att += f"values({domain_lower}, {rel_name_lower}, {attr_name_lower}, {values_str}).\n"
-                    if attr.getMandatory():
-                        att += f"mandatory({domain_lower}, {rel_name_lower}, {attr_name_lower}).\n"
-                    if attr.isDisplay():
-                        att += f"display({domain_lower}, {rel_name_lower}, {attr_name_lower}).\n"
-                    if attr.isDistinguishing():
-                        att += f"distinguishing({domain_lower}, {rel_name_lower}, {attr_name_lower}).\n"
-                    if attr.getTarget():
-                        target_lower = attr.getTarget().lower() # type: ignore
-                        att += f"target({domain_lower}, {rel_name_lower}, {attr_name_lower}, {target_lower}).\n"
-        return att
+            yield from TranslatorAPIProlog.iterAttributes(domain_lower, rel_name_lower, relation.getAttributes() or ())
 
     # --- Instance Methods ---
 
-    def getClassi(self, classi: TreeNode) -> List[str]:
+    def getClassi(self, classi: 'TreeNode') -> List[str]:
         """
         Gets the string representation of the direct children of a TreeNode.
         Requires a TreeNode implementation with getChildren() and __str__.
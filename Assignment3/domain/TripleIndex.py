@@ -0,0 +1,218 @@
+from __future__ import annotations
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .Entity import Entity
+    from .Relationship import Relationship
+    from .SymbolTable import SymbolTable
+
+Triple = Tuple[Optional[str], str, Optional[str]] # (subject, relationship, object) of a reference, as written
+
+
+class QueryPlan:
+    """
+    How TripleIndex answers one pattern: the access path it reads (the most selective bound position,
+    or a scan of all the references when nothing is bound) and the checks made on every reference read.
+    """
+
+    def __init__(self, pattern: Dict[str, Optional[str]], access: str, estimate: int,
+                 candidates: Dict[str, int], filters: List[str], subjectIds: Optional[FrozenSet[int]],
+                 relRange: Optional[Tuple[int, int]], objectIds: Optional[FrozenSet[int]]):
+        """
+        Initializes the plan.
+
+        Args:
+            pattern: Position ("subject", "relationship", "object") -> the name bound to it, or None.
+            access: The access path read: "subject", "object", "relationship" or "scan".
+            estimate: The number of references the access path reads.
+            candidates: Access path -> number of references it would read, for every path considered.
+            filters: The positions checked on every reference read.
+            subjectIds: The symbol IDs the subject matches, or None if it is open.
+            relRange: The rows of the references of the relationship, or None if it is open.
+            objectIds: The symbol IDs the object matches, or None if it is open.
+        """
+        self.pattern: Dict[str, Optional[str]] = pattern
+        self.access: str = access
+        self.estimate: int = estimate
+        self.candidates: Dict[str, int] = candidates
+        self.filters: List[str] = filters
+        self.subjectIds: Optional[FrozenSet[int]] = subjectIds
+        self.relRange: Optional[Tuple[int, int]] = relRange
+        self.objectIds: Optional[FrozenSet[int]] = objectIds
+
+    def explain(self) -> str:
+        """
+        Describes the plan, e.g. for a slow query.
+
+        Returns:
+            str: One line per step of the plan.
+        """
+        bound = ", ".join(f"{position}={name!r}" for position, name in self.pattern.items() if name is not None)
+        path = "full scan" if self.access == "scan" else f"{self.access} index"
+        lines = [f"match({bound or 'all references'})", f"  access: {path}, {self.estimate} reference(s) read"]
+        for access, cost in self.candidates.items():
+            if access != self.access:
+                lines.append(f"  rejected: {access} index, {cost} reference(s)")
+        lines.append(f"  filter: {', '.join(self.filters)}" if self.filters else "  filter: none")
+        return "\n".join(lines)
+
+    def __str__(self) -> str:
+        return self.explain()
+
+
+class TripleIndex:
+    """
+    Pattern matching over the references of a domain (see DomainData.match), with the subject, the
+    relationship and the object of a pattern each bound to a name or left open (None).
+    The references are numbered once, in pre-order of their relationship, and indexed by the symbol ID of
+    their subject and of their object (see SymbolTable); the references of a relationship subtree are then
+    a contiguous range of rows. For each pattern the index reading the fewest references is chosen
+    (see plan) and the other bound positions are checked on the rows read, so a query costs about its
+    most selective position instead of a visit of every reference.
+
+    With inheritance, an entity name matches itself and the names of the descendants of the entity
+    (findInTree(entityTree, name)), like DomainData.isSameOrDescendant; a relationship matches its
+    own references and those of its sub-relationships. Without it, names are compared case-insensitively.
+    The index is a read-only snapshot of the domain, built once per version (memoized by DomainData).
+    """
+
+    def __init__(self, entityTree: Entity, relationshipTree: Relationship):
+        """
+        Numbers and indexes the references of the relationships (the root of the tree excluded).
+
+        Args:
+            entityTree: The root of the entity tree, for inheritance.
+            relationshipTree: The root of the relationship tree.
+        """
+        self.entityTree: Entity = entityTree
+        self.relationshipTree: Relationship = relationshipTree
+        self.symbols: SymbolTable = entityTree.symbolTable()
+        self.subjects: List[Optional[str]] = [] # Row -> subject
+        self.objects: List[Optional[str]] = [] # Row -> object
+        self.relNames: List[str] = [] # Row -> name of the relationship holding the reference
+        self.subjectIds: List[Optional[int]] = [] # Row -> symbol ID of the subject, None if empty
+        self.objectIds: List[Optional[int]] = []
+        self.bySubject: Dict[int, List[int]] = {} # Symbol ID -> rows with that subject, ascending
+        self.byObject: Dict[int, List[int]] = {}
+        self.descendantIds: Dict[int, FrozenSet[int]] = {} # Entity pre-order number -> IDs of its subtree names
+
+        entityTree.getAncestryIndex() # Numbers the entities, for descendantIds
+        relationshipTree.getAncestryIndex() # Numbers the relationships, in the order of iterSubtree
+        self.firstRows: List[int] = [] # Pre-order number -> first row of that relationship
+        for rel in relationshipTree.iterSubtree():
+            self.firstRows.append(len(self.subjects))
+            if rel is relationshipTree:
+                continue # Like getAllRelationships, the root is not a relationship
+            for ref in rel.getReferences():
+                self.addRow(ref.getSubject(), rel, ref.getObject())
+        self.firstRows.append(len(self.subjects))
+
+    def addRow(self, subject: Optional[str], rel: Relationship, object_ref: Optional[str]) -> None:
+        """Numbers one reference and adds it to the subject and object indexes."""
+        row = len(self.subjects)
+        subjectId = self.symbols.intern(subject) if subject else None
+        objectId = self.symbols.intern(object_ref) if object_ref else None
+        self.subjects.append(subject)
+        self.objects.append(object_ref)
+        self.relNames.append(rel.getName())
+        self.subjectIds.append(subjectId)
+        self.objectIds.append(objectId)
+        if subjectId is not None:
+            self.bySubject.setdefault(subjectId, []).append(row)
+        if objectId is not None:
+            self.byObject.setdefault(objectId, []).append(row)
+
+    def nameIds(self, name: str, inheritance: bool) -> FrozenSet[int]:
+        """
+        Gets the symbol IDs an entity name matches: the ID of the name and, with inheritance,
+        the IDs of the names of the descendants of the entity found for it.
+        """
+        nameId = self.symbols.lookup(name)
+        ids = frozenset((nameId,)) if nameId is not None else frozenset()
+        if not inheritance:
+            return ids
+        entity = self.entityTree.findDescendant(name)
+        if entity is None:
+            return ids
+        subtree = self.descendantIds.get(entity.preOrder)
+        if subtree is None:
+            subtree = self.descendantIds[entity.preOrder] = frozenset(
+                e.getNameId(self.symbols) for e in entity.iterSubtree())
+        return ids | subtree
+
+    def relationshipRows(self, name: str, inheritance: bool) -> Tuple[int, int]:
+        """Gets the range of rows of a relationship and, with inheritance, of its sub-relationships."""
+        rel = self.relationshipTree.findDescendant(name)
+        if rel is None:
+            return 0, 0
+        last = rel.lastDescendant if inheritance else rel.preOrder
+        return self.firstRows[rel.preOrder], self.firstRows[last + 1]
+
+    def plan(self, subject: Optional[str] = None, relationship: Optional[str] = None,
+             object_ref: Optional[str] = None, inherit_subject: bool = True, inherit_object: bool = True,
+             inherit_relationship: bool = False) -> QueryPlan:
+        """
+        Chooses the access path of a pattern: the bound position whose index has the fewest rows for it.
+
+        Args:
+            subject: The subject name, or None for any subject.
+            relationship: The relationship name, or None for any relationship.
+            object_ref: The object name, or None for any object.
+            inherit_subject: Whether descendants of the subject entity match it.
+            inherit_object: Whether descendants of the object entity match it.
+            inherit_relationship: Whether references of sub-relationships match the relationship.
+
+        Returns:
+            QueryPlan: The plan, to run with execute or to print with explain.
+        """
+        subjectIds = self.nameIds(subject, inherit_subject) if subject is not None else None
+        objectIds = self.nameIds(object_ref, inherit_object) if object_ref is not None else None
+        relRange = self.relationshipRows(relationship, inherit_relationship) if relationship is not None else None
+
+        candidates: Dict[str, int] = {}
+        if relRange is not None:
+            candidates["relationship"] = relRange[1] - relRange[0]
+        if subjectIds is not None:
+            candidates["subject"] = sum(len(self.bySubject.get(i, ())) for i in subjectIds)
+        if objectIds is not None:
+            candidates["object"] = sum(len(self.byObject.get(i, ())) for i in objectIds)
+        if not candidates:
+            candidates["scan"] = len(self.subjects)
+        access = min(candidates, key=candidates.__getitem__) # First of the cheapest, in the order above
+        filters = [position for position in candidates if position not in (access, "scan")]
+        pattern = {"subject": subject, "relationship": relationship, "object": object_ref}
+        return QueryPlan(pattern, access, candidates[access], candidates, filters, subjectIds, relRange, objectIds)
+
+    def execute(self, plan: QueryPlan) -> Iterator[Triple]:
+        """
+        Yields the references matching a plan, as they are read from its access path.
+
+        Args:
+            plan: A plan made by plan() on this index.
+
+        Yields:
+            Triple: The (subject, relationship, object) of each matching reference.
+        """
+        if plan.access == "relationship" or plan.access == "scan":
+            rows: Iterable[int] = range(*plan.relRange) if plan.access == "relationship" else range(len(self.subjects))
+        else:
+            ids, index = (plan.subjectIds, self.bySubject) if plan.access == "subject" else (plan.objectIds, self.byObject)
+            rows = (row for i in sorted(ids) for row in index.get(i, ()))
+        subjectIds = plan.subjectIds if "subject" in plan.filters else None
+        objectIds = plan.objectIds if "object" in plan.filters else None
+        first, end = plan.relRange if "relationship" in plan.filters else (0, len(self.subjects))
+        for row in rows:
+            if not first <= row < end: # Rows of a relationship subtree are contiguous
+                continue
+            if subjectIds is not None and self.subjectIds[row] not in subjectIds:
+                continue
+            if objectIds is not None and self.objectIds[row] not in objectIds:
+                continue
+            yield self.subjects[row], self.relNames[row], self.objects[row]
+
+    def match(self, subject: Optional[str] = None, relationship: Optional[str] = None,
+              object_ref: Optional[str] = None, inherit_subject: bool = True, inherit_object: bool = True,
+              inherit_relationship: bool = False) -> Iterator[Triple]:
+        """Yields the references matching a pattern (see plan for the arguments), as they are read."""
+        return self.execute(self.plan(subject, relationship, object_ref, inherit_subject, inherit_object,
+                                      inherit_relationship))
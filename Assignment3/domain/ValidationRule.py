@@ -0,0 +1,44 @@
+from typing import FrozenSet, Iterable, Iterator, List
+
+
+class ValidationRule:
+    """
+    Compiled list of the names (tags or XML attributes) allowed in one context of a .gbs file.
+    Membership is checked on a frozenset, while the original order is kept for error messages,
+    which look exactly like the ones built from the plain lists used by Java.
+    """
+    __slots__ = ("allowed", "expected")
+
+    def __init__(self, *names: str):
+        """
+        Initializes the rule with the allowed names, in the order used by error messages.
+
+        Args:
+            names: The allowed names.
+        """
+        self.allowed: FrozenSet[str] = frozenset(names)
+        self.expected: List[str] = list(names)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self.allowed
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.expected)
+
+    def __len__(self) -> int:
+        return len(self.expected)
+
+    def __repr__(self) -> str:
+        return repr(self.expected)
+
+    def allows(self, names: Iterable[str]) -> bool:
+        """
+        Checks that all the given names are allowed.
+
+        Args:
+            names: The names to check (e.g. the XML attributes of a tag).
+
+        Returns:
+            bool: True if no name is outside the rule.
+        """
+        return self.allowed.issuperset(names)
@@ -0,0 +1,103 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+ASSIGNMENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ASSIGNMENT_DIR) # The modules are imported as domain.X, like test.py does
+
+from domain.DomainData import DomainData
+
+GENERAL_GBS = os.path.join(ASSIGNMENT_DIR, "general.gbs")
+
+
+@pytest.fixture
+def general() -> DomainData:
+    """A fresh copy of the general domain shipped with the assignment."""
+    return DomainData(GENERAL_GBS)
+
+
+@pytest.fixture
+def generalPath() -> str:
+    """The path of general.gbs."""
+    return GENERAL_GBS
+
+
+EXTRA_GBS = """<?xml version="1.0"?>
+<domain name="extra">
+  <imports><import schema="general"/></imports>
+  <entities>
+    <entity name="Agent">
+      <entity name="Robot"><attribute name="model" datatype="string" mandatory="true"/></entity>
+    </entity>
+  </entities>
+  <relationships>
+    <relationship name="built" inverse="builtBy">
+      <reference subject="Robot" object="Artifact"/>
+      <reference subject="Person" object="Robot"/>
+    </relationship>
+  </relationships>
+</domain>
+"""
+
+TOP_GBS = """<?xml version="1.0"?>
+<domain name="top">
+  <imports>
+    <import schema="general"/>
+    <import schema="extra"/>
+    <deleted><entity name="Material"/><relationship name="aliasOf"/></deleted>
+  </imports>
+  <entities>
+    <entity name="Agent"><entity name="Person">
+      <entity name="Student"><attribute name="school" datatype="entity" target="Organization"/></entity>
+    </entity></entity>
+  </entities>
+  <relationships>
+    <relationship name="knows" inverse="knows">
+      <reference subject="Student" object="Robot"/>
+      <relationship name="mentors" inverse="mentoredBy">
+        <reference subject="Robot" object="Student"><attribute name="since" datatype="date"/></reference>
+      </relationship>
+    </relationship>
+  </relationships>
+  <axioms>
+    <axiom name="noLoop" formalism="datalog" rule=":- parent(D, X, X)."/>
+  </axioms>
+</domain>
+"""
+
+
+@pytest.fixture
+def importTree(tmp_path) -> str:
+    """A folder with top.gbs, which imports general.gbs and extra.gbs (which imports general.gbs too)."""
+    shutil.copy(GENERAL_GBS, tmp_path / "general.gbs")
+    (tmp_path / "extra.gbs").write_text(EXTRA_GBS, encoding="utf-8")
+    (tmp_path / "top.gbs").write_text(TOP_GBS, encoding="utf-8")
+    return str(tmp_path)
+
+
+def fingerprint(domain: DomainData) -> dict:
+    """What a load produces and what the queries answer, to compare the load modes."""
+    def tree(root):
+        return [(e.getName(), e.getParent().getName(), e.getDomain(), e.isAbstract(),
+                 [(a._name, a.getDataType(), a.isMandatory(), a.getTarget(), list(a.getValues())) for a in e.getAttributes()],
+                 [(r.getSubject(), r.getObject(), len(r.getAttributes() or ())) for r in getattr(e, "references", [])])
+                for e in root.iterSubtree() if e is not root]
+    names = [e.getName() for e in domain.getAllEntities()]
+    return dict(
+        domain=domain.getDomain(),
+        imported=[os.path.basename(path) for path in domain.importedFiles],
+        entities=tree(domain.entityTree),
+        relationships=tree(domain.relationshipTree),
+        axioms=sorted((a.getName(), a.getExpression()) for a in domain.getAxioms()),
+        types=[(t._name, t.getDataType(), list(t.getValues())) for t in domain.types],
+        relSubjs={rel: list(values) for rel, values in domain.getRelSubjs().items()},
+        withSubj={name: sorted(domain.getRelationshipsWithSubj(name)) for name in names},
+        objects={name: sorted(domain.getObjsFromSubj(name)) for name in names},
+    )
+
+
+@pytest.fixture(name="fingerprint")
+def fingerprintFixture():
+    return fingerprint
@@ -0,0 +1,52 @@
+import random
+
+from domain.Entity import Entity
+
+
+def randomTree(rng, size):
+    root = Entity("Entity")
+    entities = [root]
+    for i in range(size):
+        child = Entity(rng.choice(["Node", "node", "Leaf"]) + str(i % 7))
+        rng.choice(entities).addChild(child)
+        entities.append(child)
+    return root, entities
+
+
+def isDescendantByWalk(entity, ancestor):
+    parent = entity.getParent()
+    while parent is not None:
+        if parent is ancestor:
+            return True
+        parent = parent.getParent()
+    return False
+
+
+def test_intervals_match_parent_walks():
+    rng = random.Random(9)
+    root, entities = randomTree(rng, 60)
+    for _ in range(3):
+        index = root.getAncestryIndex()
+        for ancestor in entities:
+            for entity in entities:
+                assert index.isDescendant(entity, ancestor) == isDescendantByWalk(entity, ancestor)
+            for name in ("node3", "LEAF5", "missing"):
+                expected = any(e.getName().lower() == name.lower() for e in ancestor.iterSubtree() if e is not ancestor)
+                assert index.hasDescendantNamed(ancestor, name) == expected
+        # Move a subtree: the index is rebuilt on next use
+        moved = rng.choice(entities[1:])
+        target = rng.choice([e for e in entities if e is not moved and not isDescendantByWalk(e, moved)])
+        moved.detach()
+        target.addChild(moved)
+        assert root.getAncestryIndex() is not index
+
+
+def test_domain_inheritance_checks(general):
+    entities = general.getAllEntities()
+    rng = random.Random(4)
+    for _ in range(500):
+        target = rng.choice(entities)
+        entity = rng.choice(list(target.iterSubtree()) if rng.random() < 0.5 else entities)
+        expected = entity.getName().lower() == target.getName().lower() or any(
+            e.getName().lower() == entity.getName().lower() for e in target.iterSubtree() if e is not target)
+        assert general.isSameOrDescendant(entity.getName(), target.getName(), target) == expected
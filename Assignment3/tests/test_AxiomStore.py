@@ -0,0 +1,44 @@
+import pickle
+
+from domain.Axiom import Axiom
+from domain.AxiomStore import AxiomStore
+
+
+def datalog(name, expression):
+    return Axiom(name, "datalog", expression, "general")
+
+
+def test_axioms_are_identified_by_name():
+    store = AxiomStore([datalog("a", ":- entity(D, agent)."), datalog("a", ":- entity(D, robot).")])
+    assert len(store) == 1 and store.get("a").getExpression() == ":- entity(D, agent)."
+    store.add(Axiom("b", "owl", "Person and Robot", "other"))
+    assert [a.getName() for a in store.forDomain("general")] == ["a"]
+    store.discard(Axiom("a", "", "", ""))
+    assert "a" not in {a.getName() for a in store} and store.forDomain("general") == []
+    assert pickle.loads(pickle.dumps(store)).get("b").getExpression() == "Person and Robot"
+
+
+def test_only_a_variable_owner_reads_every_element():
+    mentioned, heads, wildcard = AxiomStore.dependencies(datalog("a", ":- attribute(D, person, A, T), T = blob."))
+    assert "person" in mentioned and not wildcard
+    for expression in (":- relationship(D, R, S, S).", "kid(D, C) :- parent(D, agent, C).",
+                       ":- target(D, person, A, T), \\+ entity(D, T)."):
+        assert AxiomStore.dependencies(datalog("a", expression))[2], expression
+    assert AxiomStore.dependencies(Axiom("o", "owl", "Person and Robot", "general"))[0] == {"person", "and", "robot"}
+
+
+def test_affected_follows_derived_predicates():
+    store = AxiomStore([
+        datalog("kids", "agentKid(D, C) :- parent(D, agent, C)."),
+        datalog("noPersonKid", ":- agentKid(D, person)."),
+        datalog("noRobot", ":- entity(D, robot)."),
+        datalog("personName", ":- entity(D, person), \\+ mandatory(D, person, name)."),
+    ])
+    assert store.affected([]) == set()
+    assert store.affected(["Robot"]) == {"noRobot", "kids", "noPersonKid"} # kids reads every child of agent
+    assert store.affected(["person"]) == {"personName", "noPersonKid", "kids"}
+    assert store.required({"noPersonKid"}) == {"noPersonKid", "kids"}
+    version = store.version
+    store.discard(datalog("kids", ""))
+    assert store.version > version
+    assert store.affected(["Robot"]) == {"noRobot"}
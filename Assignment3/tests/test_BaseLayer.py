@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from domain.BaseLayer import BaseLayer
+from domain.DomainData import DomainData
+from domain.Reference import Reference
+
+
+@pytest.fixture(autouse=True)
+def noLayers():
+    BaseLayer.clear()
+    yield
+    BaseLayer.clear()
+
+
+def firstWithAttributes(entity):
+    if entity.getAttributes():
+        return entity
+    for child in entity.getChildren():
+        found = firstWithAttributes(child)
+        if found is not None:
+            return found
+    return None
+
+
+def test_shared_imports_match_the_private_load(importTree, fingerprint):
+    top = os.path.join(importTree, "top.gbs")
+    extra = os.path.join(importTree, "extra.gbs")
+    expected = fingerprint(DomainData(top)), fingerprint(DomainData(extra))
+    assert (fingerprint(DomainData(top, sharedImports=True)), fingerprint(DomainData(extra, sharedImports=True))) == expected
+    assert os.path.join(importTree, "general.gbs") in BaseLayer.layers
+    # The layers are reused by the next domains
+    assert (fingerprint(DomainData(top, sharedImports=True)), fingerprint(DomainData(extra, sharedImports=True))) == expected
+
+
+def test_forks_do_not_share_attributes(importTree):
+    extra = os.path.join(importTree, "extra.gbs")
+    first, second = DomainData(extra, sharedImports=True), DomainData(extra, sharedImports=True)
+    entity = next(filter(None, map(firstWithAttributes, first.getTopEntities())))
+    attribute = entity.getAttributes()[0]
+    other = second.getEntity(entity.getName()).getAttributes()[0]
+    assert attribute is not other
+    mandatory = other.getMandatory()
+    attribute.setMandatory(not mandatory)
+    assert other.getMandatory() == mandatory
+    layer = BaseLayer.layers[os.path.join(importTree, "general.gbs")]
+    assert layer.data.getEntity(entity.getName()).getAttributes()[0].getMandatory() == mandatory
+
+
+def test_layer_is_rebuilt_when_its_file_changes(importTree):
+    general = os.path.join(importTree, "general.gbs")
+    DomainData(os.path.join(importTree, "extra.gbs"), sharedImports=True)
+    layer = BaseLayer.layers[general]
+    assert layer.isUpToDate() and not hasattr(layer, "document")
+    with open(general, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert not layer.isUpToDate()
+    DomainData(os.path.join(importTree, "extra.gbs"), sharedImports=True)
+    assert BaseLayer.layers[general] is not layer
+
+
+def test_forks_do_not_share_mutable_values(importTree):
+    extra = DomainData(os.path.join(importTree, "extra.gbs"), sharedImports=True)
+    top = DomainData(os.path.join(importTree, "top.gbs"), sharedImports=True)
+    subjects = top.getRelSubjs()["attributeOf"]
+    with pytest.raises(AttributeError):
+        extra.getRelSubjs()["attributeOf"].append("LEAK")
+    assert top.getRelSubjs()["attributeOf"] == subjects
+
+    relationship = extra.getRelationship("attributeOf") # From general.gbs
+    shared = relationship.getReferences()[0]
+    with pytest.raises(ValueError, match="shared"):
+        shared.setSubject("LEAK")
+    # Replacing a reference copies the (subject, object) index of the relationship in that domain only
+    other = top.getRelationship(relationship.getName())
+    replacement = Reference(shared.getSubject(), shared.getObject())
+    relationship.addReference(replacement)
+    assert relationship.getReference(shared.getSubject(), shared.getObject()) is replacement
+    assert other.getReference(shared.getSubject(), shared.getObject()) is shared
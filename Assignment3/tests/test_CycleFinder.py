@@ -0,0 +1,88 @@
+import itertools
+import random
+
+import pytest
+
+from domain.CycleFinder import CycleFinder
+
+
+def bruteForceCycles(finder, maxLength=None):
+    """Every elementary cycle, found by trying each permutation of the nodes, normalized like CycleFinder does."""
+    result = set()
+    for length in range(1, len(finder.nodes) + 1):
+        if maxLength is not None and length > maxLength:
+            break
+        if not finder.directed and length < 3:
+            continue
+        for nodes in itertools.permutations(finder.nodes, length):
+            if all(nodes[(i + 1) % length] in finder.successors[nodes[i]] for i in range(length)):
+                result.add(finder.normalize(list(nodes)))
+    return result
+
+
+def test_directed_and_undirected_triangle():
+    arcs = [("a", "b"), ("b", "c"), ("c", "a")]
+    assert list(CycleFinder(arcs).cycles()) == [("a", "b", "c")]
+    assert list(CycleFinder(arcs, directed=False).cycles()) == [("a", "b", "c")]
+    assert list(CycleFinder([("a", "b"), ("b", "a")], directed=False).cycles()) == []
+
+
+@pytest.mark.parametrize("seed", range(40))
+@pytest.mark.parametrize("directed", [True, False])
+def test_cycles_match_brute_force(seed, directed):
+    rng = random.Random(seed)
+    n = rng.randint(1, 6)
+    arcs = [(rng.randrange(n), rng.randrange(n)) for _ in range(rng.randint(0, 12))]
+    finder = CycleFinder(arcs, directed)
+    for maxLength in (None, 3):
+        found = list(finder.cycles(maxLength))
+        assert len(found) == len(set(found))
+        assert set(found) == bruteForceCycles(finder, maxLength)
+
+
+def test_simple_cycles_have_no_shortcut():
+    # a-b-c-d-a has the chord b-d, so only the two triangles are simple
+    arcs = [("a", "b"), ("b", "c"), ("c", "d"), ("d", "a"), ("b", "d")]
+    assert sorted(CycleFinder(arcs, directed=False).simpleCycles()) == [("a", "b", "d"), ("b", "c", "d")]
+
+
+# The graphs of setup_test_graph(1-4) in Assignment4/simpleCycle.pl (directed) and simpleCycleUndirected.pl
+PROLOG_TEST_GRAPHS = {
+    1: [("a", "b"), ("b", "c"), ("c", "a")],
+    2: [("a", "b"), ("b", "c"), ("c", "d"), ("d", "a"), ("b", "d")],
+    3: [("a", "b"), ("b", "a"), ("c", "d"), ("d", "e"), ("e", "c"), ("d", "f"), ("f", "g"), ("g", "d")],
+    4: [("a", "b"), ("b", "c"), ("c", "d"), ("d", "a"), ("b", "e"), ("e", "d"), ("d", "c"), ("c", "b"), ("a", "d")],
+}
+
+
+@pytest.mark.parametrize("case, directed, expected", [
+    (1, True, [("a", "b", "c")]),
+    (1, False, [("a", "b", "c")]),
+    (2, True, [("a", "b", "d")]),
+    (2, False, [("a", "b", "d"), ("b", "c", "d")]),
+    (3, True, [("a", "b"), ("c", "d", "e"), ("d", "f", "g")]),
+    (3, False, [("c", "d", "e"), ("d", "f", "g")]),
+    (4, True, [("a", "d"), ("b", "c"), ("c", "d")]),
+    (4, False, [("a", "b", "c", "d"), ("a", "b", "e", "d"), ("b", "c", "d", "e")]),
+])
+def test_simple_cycles_match_the_prolog_test_cases(case, directed, expected):
+    assert sorted(CycleFinder(PROLOG_TEST_GRAPHS[case], directed).simpleCycles()) == expected
+
+
+def test_cancel_stops_the_enumeration():
+    finder = CycleFinder([(i, j) for i in range(6) for j in range(6) if i != j])
+    calls = [0]
+
+    def cancel():
+        calls[0] += 1
+        return calls[0] > 20
+
+    assert len(list(finder.cycles(cancel=cancel))) < len(list(finder.cycles()))
+
+
+def test_domain_cycles_follow_the_references(general):
+    arcs = {(ref.getSubject().lower(), ref.getObject().lower())
+            for rel in general.getAllRelationships() for ref in rel.getReferences()}
+    for cycle in general.findCycles(maxLength=3):
+        lowered = [name.lower() for name in cycle]
+        assert all((lowered[i], lowered[(i + 1) % len(lowered)]) in arcs for i in range(len(lowered)))
@@ -0,0 +1,115 @@
+import random
+
+import pytest
+
+from domain.Axiom import Axiom
+from domain.DatalogEngine import DatalogEngine
+from domain.Entity import Entity
+
+
+def closure(edges):
+    """Transitive closure by brute force, to compare with the semi-naive evaluation."""
+    result = set(edges)
+    while True:
+        new = {(x, z) for (x, y) in result for (y2, z) in result if y == y2} - result
+        if not new:
+            return result
+        result |= new
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_transitive_closure_matches_brute_force(seed):
+    rng = random.Random(seed)
+    edges = {(str(rng.randrange(8)), str(rng.randrange(8))) for _ in range(14)}
+    engine = DatalogEngine()
+    for edge in edges:
+        engine.addFact("edge", edge)
+    engine.addRules("path(X, Y) :- edge(X, Y). path(X, Z) :- path(X, Y), edge(Y, Z).")
+    assert engine.relation("path", 2) == closure(edges)
+
+
+def test_negation_reads_the_complete_lower_stratum():
+    engine = DatalogEngine()
+    for n in "abcd":
+        engine.addFact("node", (n,))
+    for edge in [("a", "b"), ("b", "c")]:
+        engine.addFact("edge", edge)
+    engine.addRules("""
+        path(X, Y) :- edge(X, Y).
+        path(X, Z) :- path(X, Y), edge(Y, Z).
+        unreachable(X, Y) :- node(X), node(Y), \\+ path(X, Y).
+        leaf(X) :- node(X), \\+ edge(X, _).
+    """)
+    nodes = {(x, y) for x in "abcd" for y in "abcd"}
+    assert engine.relation("unreachable", 2) == nodes - {("a", "b"), ("b", "c"), ("a", "c")}
+    assert engine.relation("leaf", 1) == {("c",), ("d",)}
+
+
+def test_constraints_and_queries():
+    engine = DatalogEngine()
+    engine.addFact("edge", ("a", "a"))
+    engine.addFact("edge", ("a", "b"))
+    engine.addRules(":- edge(X, X).", name="noLoop")
+    assert engine.violations() == {"noLoop": [{"X": "a"}]}
+    assert sorted(b["Y"] for b in engine.query("edge(a, Y), Y \\= a")) == ["b"]
+
+
+def test_negation_inside_recursion_is_rejected():
+    engine = DatalogEngine()
+    engine.addFact("q", ("a",))
+    engine.addRules("p(X) :- q(X), \\+ p(X).")
+    with pytest.raises(ValueError, match="not stratifiable"):
+        engine.evaluate()
+
+
+@pytest.mark.parametrize("rule", ["p(X, Y) :- q(X).", "p(X) :- q(X), \\+ r(Y).", "p(X) :- q(X), X \\= Y."])
+def test_unsafe_rules_are_rejected(rule):
+    with pytest.raises(ValueError, match="Unsafe rule"):
+        DatalogEngine().addRules(rule)
+
+
+def test_invalid_syntax_is_rejected():
+    with pytest.raises(ValueError):
+        DatalogEngine().addRules("p(X :- q.")
+
+
+def test_domain_facts_follow_the_translation(general):
+    engine = DatalogEngine.fromDomain(general)
+    engine.addRules("anc(D, E, A) :- parent(D, A, E). anc(D, E, A) :- parent(D, P, E), anc(D, P, A).")
+    assert engine.relation("anc", 3) == DatalogEngine.fromDomain(general, closure=True).relation("ancestor", 3)
+
+
+def test_axioms_added_to_the_store_invalidate_the_engine(general):
+    assert general.checkAxioms() == {}
+    general.getAxioms().add(Axiom("noSelfLoop", "datalog", ":- relationship(D, R, S, S).", "general"))
+    general.getAxioms().add(Axiom("noRobot", "datalog", ":- entity(D, robot).", "general"))
+    full = general.checkAxioms()
+    assert "noRobot" not in full
+    assert general.checkAxioms(["robot"]) == full
+    general.getAxioms().discard(Axiom("noSelfLoop", "", "", ""))
+    assert "noSelfLoop" not in general.getDatalogEngine().violations()
+
+
+def test_incremental_check_keeps_the_other_results(general):
+    general.getAxioms().add(Axiom("noSelfLoop", "datalog", ":- relationship(D, R, S, S).", "general"))
+    general.getAxioms().add(Axiom("noRobot", "datalog", ":- entity(D, robot).", "general"))
+    before = general.checkAxioms()
+    machine = Entity("Machine", "general")
+    machine.addChild(Entity("Robot", "general"))
+    general.entityTree.addChild(machine)
+    after = general.checkAxioms(["Machine"]) # Robot is checked again as a descendant of Machine
+    assert set(after) == set(before) | {"noRobot"}
+    assert after == general.getDatalogEngine().violations()
+
+
+def test_prolog_axioms_outside_datalog_are_skipped(general):
+    general.getAxioms().add(Axiom("longName", "prolog", "bad(X) :- entity(D, X), atom_length(X, L), L > 20.", "general"))
+    general.getAxioms().add(Axiom("unsafe", "prolog", "big(X, Y) :- entity(D, X).", "general"))
+    general.getAxioms().add(Axiom("noRobot", "prolog", ":- entity(D, robot).", "general"))
+    assert not DatalogEngine.isCompiled(general.getAxioms().get("longName"))
+    assert not DatalogEngine.isCompiled(general.getAxioms().get("unsafe"))
+    assert DatalogEngine.isCompiled(general.getAxioms().get("noRobot"))
+    assert general.checkAxioms() == {}
+    assert general.checkAxioms(["Person"]) == {}
+    with pytest.raises(ValueError):
+        DatalogEngine().addAxiom(Axiom("longName", "datalog", "bad(X) :- entity(D, X), L > 20.", "general"))
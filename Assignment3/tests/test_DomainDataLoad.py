@@ -0,0 +1,22 @@
+import os
+
+from domain.DomainData import DomainData
+
+
+def test_streaming_load_matches_the_tree_load(importTree, fingerprint):
+    top = os.path.join(importTree, "top.gbs")
+    assert fingerprint(DomainData(top, streaming=True)) == fingerprint(DomainData(top))
+    general = os.path.join(importTree, "general.gbs")
+    assert fingerprint(DomainData(general, streaming=True)) == fingerprint(DomainData(general))
+
+
+def test_parallel_imports_match_the_sequential_load(importTree, fingerprint):
+    top = os.path.join(importTree, "top.gbs")
+    expected = fingerprint(DomainData(top))
+    assert fingerprint(DomainData(top, parallelImports="thread", importWorkers=2)) == expected
+    assert fingerprint(DomainData(top, parallelImports="process", importWorkers=2)) == expected
+
+
+def test_trusted_load_matches_the_validated_load(importTree, fingerprint):
+    top = os.path.join(importTree, "top.gbs")
+    assert fingerprint(DomainData(top, trusted=True)) == fingerprint(DomainData(top))
@@ -0,0 +1,53 @@
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from domain.Entity import Entity
+from domain.Relationship import Relationship
+
+GETTERS = ("getAllEntities", "getAllEntitiesToString", "getAllRelationships", "getAllRelationshipsToString",
+           "getSubjects", "getObjects", "getnSubEntities", "getTopRelationships")
+
+
+def snapshot(domain):
+    """What the memoized getters answer, with the entities by identity."""
+    values = {}
+    for getter in GETTERS:
+        value = getattr(domain, getter)()
+        values[getter] = tuple(id(v) if isinstance(v, Entity) else v for v in value) if isinstance(value, tuple) else value
+    return values
+
+
+def addReference(domain):
+    knows = domain.findInTree(domain.relationshipTree, "knows")
+    domain.parseReference(ET.fromstring('<reference subject="Robot" object="Unicorn"/>'), knows)
+
+
+MUTATIONS = {
+    "addEntity": (lambda d: d.addEntity(Entity("Machine", "general")),
+                  {"getAllEntities", "getAllEntitiesToString"}),
+    "addChild": (lambda d: d.getEntity("Agent").addChild(Entity("Android", "general")),
+                 {"getAllEntities", "getAllEntitiesToString", "getnSubEntities"}),
+    "setName": (lambda d: d.getEntity("Person").setName("Human"), {"getAllEntitiesToString"}),
+    "removeEntity": (lambda d: d.removeEntity("Person"),
+                     {"getAllEntities", "getAllEntitiesToString", "getnSubEntities"}),
+    "addRelationship": (lambda d: d.addRelationship(Relationship("likes", "general", "likedBy")),
+                        {"getAllRelationships", "getAllRelationshipsToString", "getTopRelationships"}),
+    "removeRelationship": (lambda d: d.removeRelationship("aliasOf"),
+                           {"getAllRelationships", "getAllRelationshipsToString", "getTopRelationships"}),
+    "renameRelationship": (lambda d: d.findInTree(d.relationshipTree, "knows").setName("meets"),
+                           {"getAllRelationshipsToString"}),
+    "parseReference": (addReference, {"getSubjects", "getObjects"}),
+}
+
+
+@pytest.mark.parametrize("mutation", MUTATIONS)
+def test_memoized_getters_follow_mutations(general, mutation):
+    mutate, changed = MUTATIONS[mutation]
+    before = snapshot(general)
+    assert snapshot(general) == before # Served from the memo
+    mutate(general)
+    after = snapshot(general)
+    assert {getter for getter in GETTERS if after[getter] != before[getter]} == changed
+    general.memo.clear()
+    assert snapshot(general) == after
@@ -0,0 +1,83 @@
+import pytest
+
+from domain.Attribute import Attribute
+from domain.Entity import Entity
+from domain.EntityShape import EntityShape
+
+
+def makeAttribute(name, dataType="string", mandatory=False, values=None):
+    attribute = Attribute(name, dataType, mandatory, values=values)
+    attribute.setName(name) # getName reads Tag.name, which the constructor leaves unset
+    return attribute
+
+
+@pytest.fixture
+def student():
+    root, person, student = Entity("Entity"), Entity("Person"), Entity("Student")
+    root.addChild(person)
+    person.addChild(student)
+    person.addAttribute(makeAttribute("name", mandatory=True))
+    student.addAttribute(makeAttribute("level", "select", values=["bachelor", "master"]))
+    return student
+
+
+def test_shape_includes_inherited_attributes(student):
+    shape = EntityShape(student)
+    assert shape.attributeNames == ("name", "level")
+    assert shape.mandatory == {"name"}
+    assert shape.selectValues["level"] == {"bachelor", "master"}
+    with pytest.raises(AttributeError):
+        shape.name = "Other"
+
+
+def test_validate(student):
+    shape = EntityShape(student)
+    assert shape.validate({"name": "Ada", "level": "master"}) == []
+    assert shape.validate({"level": "phd", "age": "3"}) == [
+        'Missing mandatory attribute "name" for entity "Student"',
+        'Invalid value "phd" for attribute "level" of entity "Student", where one of [\'bachelor\', \'master\'] was expected',
+        'Attribute "age" is not defined for entity "Student"',
+    ]
+
+
+def test_domain_shapes_are_rebuilt_after_attribute_edits(general):
+    person = next(entity for entity in general.getTopEntities() if entity.getChildren())
+    child = person.getChildren()[0]
+    attribute = makeAttribute("nickname")
+    person.addAttribute(attribute)
+    shape = general.getEntityShape(child.getName())
+    assert general.getEntityShape(child.getName()) is shape
+    assert "nickname" not in shape.mandatory
+    attribute.setMandatory(True)
+    assert "nickname" in general.getEntityShape(child.getName()).mandatory
+    attribute.addValue("x")
+    assert general.getEntityShape(child.getName()) is not shape
+
+
+def test_inherited_attributes_follow_the_ancestors(student):
+    def names(entity):
+        return tuple(a.getName() for a in entity.getAllAttributes())
+
+    person = student.getParent()
+    assert names(student) == ("name", "level")
+    assert student.getAllAttributes() is student.getAllAttributes()
+    person.addAttribute(makeAttribute("age"))
+    assert names(student) == ("name", "age", "level")
+    person.removeAttribute("name")
+    assert names(student) == ("age", "level")
+    person.getTreeRoot().setAttributes([makeAttribute("id")])
+    assert names(student) == ("id", "age", "level")
+
+    robot = Entity("Robot")
+    robot.addAttribute(makeAttribute("model"))
+    person.getParent().addChild(robot)
+    student.detach()
+    assert names(student) == ("level",)
+    robot.addChild(student)
+    assert names(student) == ("id", "model", "level")
+
+    other = Entity("Entity") # Moved to another tree
+    other.addChild(Entity("Agent"))
+    student.detach()
+    other.getChildren()[0].addChild(student)
+    assert names(student) == ("level",)
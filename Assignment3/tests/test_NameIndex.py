@@ -0,0 +1,51 @@
+import random
+
+from domain.Entity import Entity
+
+NAMES = ["Node", "node", "NODE", "Leaf", "leaf", "Root"]
+
+
+def scanNamed(entity, name):
+    """entitiesNamed by visiting the whole tree."""
+    root = entity.getTreeRoot()
+    return [e for e in root.iterSubtree() if e is not root and e.getName().casefold() == name.casefold()]
+
+
+def scanDescendant(entity, name):
+    """findDescendant by visiting the subtree in depth-first order."""
+    return next((e for e in entity.iterSubtree() if e is not entity and e.getName().casefold() == name.casefold()), None)
+
+
+def checkIndexes(entities):
+    for entity in entities:
+        for name in NAMES:
+            assert sorted(map(id, entity.entitiesNamed(name))) == sorted(map(id, scanNamed(entity, name)))
+            assert entity.findDescendant(name) is scanDescendant(entity, name)
+
+
+def test_name_index_follows_every_change():
+    rng = random.Random(5)
+    entities = [Entity("Entity"), Entity("Entity")]
+    for _ in range(40):
+        child = Entity(rng.choice(NAMES))
+        rng.choice(entities).addChild(child)
+        entities.append(child)
+    checkIndexes(entities)
+
+    for step in range(200):
+        action = step % 5
+        entity = rng.choice(entities)
+        others = [e for e in entities if e.getTreeRoot() is not entity.getTreeRoot()]
+        if action == 0 and others: # Move a subtree, or a whole tree, under an entity of another tree
+            moved = rng.choice(others)
+            moved.detach()
+            entity.addChild(moved)
+        elif action == 1:
+            entity.detach()
+        elif action == 2 and entity.getChildren():
+            entity.removeChild(rng.choice(entity.getChildren()))
+        elif action == 3 and entity.getChildren():
+            entity.removeChild(rng.choice(entity.getChildren()).getName().swapcase()) # By name, case-insensitive
+        else:
+            entity.setName(rng.choice(NAMES))
+        checkIndexes(entities)
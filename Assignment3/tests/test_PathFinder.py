@@ -0,0 +1,60 @@
+import random
+
+from domain.Entity import Entity
+from domain.PathFinder import PathFinder
+from domain.Reference import Reference
+from domain.Relationship import Relationship
+
+
+def bruteForcePaths(finder, source, target, maxHops, inheritance, inverse):
+    """Every simple path, by depth-first search over the hops of the finder."""
+    targets = finder.down(target, inheritance)
+    found = []
+
+    def walk(name, path, seen):
+        if path and name in targets:
+            found.append(tuple(path))
+        if len(path) == maxHops:
+            return
+        for step, nextName in finder.successors(name, inheritance, inverse):
+            if nextName not in seen:
+                walk(nextName, path + [step], seen | {nextName})
+
+    walk(source.lower(), [], {source.lower()})
+    return found
+
+
+def smallDomain():
+    root = Entity("Entity")
+    person, place, city = Entity("Person"), Entity("Place"), Entity("City")
+    root.addChild(person)
+    root.addChild(place)
+    place.addChild(city)
+    bornIn, livesIn = Relationship("bornIn", inverse="birthplaceOf"), Relationship("livesIn")
+    bornIn.addReference(Reference("Person", "City"))
+    livesIn.addReference(Reference("Person", "Place"))
+    return root, [bornIn, livesIn]
+
+
+def test_inheritance_reaches_descendants_of_the_target():
+    finder = PathFinder(*smallDomain())
+    assert sorted(finder.findPaths("Person", "Place", 1)) == [
+        (("Person", "bornIn", "City"),), (("Person", "livesIn", "Place"),)]
+    assert list(finder.findPaths("Person", "Place", 1, inheritance=False)) == [(("Person", "livesIn", "Place"),)]
+    assert list(finder.findPaths("City", "Person", 1, inverse=True)) == [(("City", "birthplaceOf", "Person"),)]
+
+
+def test_paths_match_brute_force(general):
+    names = [entity.getName() for entity in general.getAllEntities()]
+    list(general.findPaths(names[0], names[1], 1))
+    finder = general.memo["pathFinder"][1]
+    rng = random.Random(11)
+    for _ in range(60):
+        source, target = rng.choice(names), rng.choice(names)
+        maxHops, inheritance, inverse = rng.randint(1, 3), rng.random() < 0.7, rng.random() < 0.5
+        found = list(general.findPaths(source, target, maxHops, inheritance, inverse))
+        assert sorted(found) == sorted(bruteForcePaths(finder, source, target, maxHops, inheritance, inverse))
+        assert [len(path) for path in found] == sorted(len(path) for path in found)
+        k = rng.randint(1, 4)
+        shortest = list(general.findPaths(source, target, maxHops, inheritance, inverse, k=k))
+        assert [len(path) for path in shortest] == [len(path) for path in found[:k]]
@@ -0,0 +1,61 @@
+import random
+
+from domain.PostingIndex import PostingIndex
+from domain.Reference import Reference
+from domain.SymbolTable import SymbolTable
+
+
+def scanRelationshipsWith(domain, name, bySubject):
+    """What Java does: visit every reference of every relationship."""
+    entity = domain.findInTree(domain.entityTree, name)
+    names = {name.lower()} | ({sub.lower() for sub in entity.getAllSubclassNames(subclassRestriction=False)} if entity else set())
+    return {rel.getTop() for rel in domain.getAllRelationships() for ref in rel.getReferences()
+            if (ref.getSubject() if bySubject else ref.getObject()).lower() in names}
+
+
+def assertPostingsMatchScan(domain, names):
+    for name in names:
+        assert domain.getRelationshipsWithSubj(name) == scanRelationshipsWith(domain, name, True)
+        assert domain.getRelationshipsWithObj(name) == scanRelationshipsWith(domain, name, False)
+
+
+def test_counts_drop_a_posting_with_its_last_reference():
+    index = PostingIndex(SymbolTable())
+    index.add("Person", "knows")
+    index.add("person", "knows")
+    index.discard("Person", "knows")
+    assert index.postings("PERSON") == {"knows": 1}
+    index.discard("Person", "knows")
+    assert index.postings("Person") == {}
+
+
+def test_fork_copies_on_write():
+    symbols = SymbolTable()
+    base = PostingIndex(symbols)
+    base.add("Person", "knows")
+    forked = base.fork(symbols.fork())
+    forked.add("Person", "likes")
+    forked.discardRelationship("knows")
+    assert base.postings("Person") == {"knows": 1}
+    assert forked.postings("Person") == {"likes": 1}
+
+
+def test_postings_match_a_scan_of_the_references(general):
+    names = [entity.getName() for entity in general.getAllEntities()]
+    assertPostingsMatchScan(general, names)
+    rng = random.Random(7)
+    for entity in rng.sample(names, 3):
+        general.removeEntity(entity)
+    relationship = rng.choice(general.getTopRelationships())
+    general.removeRelationship(relationship.getName())
+    assertPostingsMatchScan(general, [entity.getName() for entity in general.getAllEntities()])
+
+
+def test_references_added_on_a_relationship_are_seen(general):
+    relationship = general.getRelationship(sorted(general.getRelationshipsWithSubj("Person"))[0])
+    assert general.getRelationshipsWithSubj("Robot") == set()
+    relationship.addReference(Reference("Robot", "Person"))
+    assert general.getRelationshipsWithSubj("Robot") == {relationship.getTop()}
+    relationship.removeRef(relationship.getReference("Robot", "Person"))
+    assert general.getRelationshipsWithSubj("Robot") == set()
+    assertPostingsMatchScan(general, ["Person", "Robot"])
@@ -0,0 +1,83 @@
+import io
+import random
+import re
+
+from domain.Attribute import Attribute
+from domain.Entity import Entity
+from domain.Reference import Reference
+from domain.TranslatorAPIProlog import TranslatorAPIProlog
+
+DIRECTIVE = re.compile(r":- (retract|assertz)\(fact\((\w+), (.*), 1\)\)\.")
+
+
+def program(domain):
+    """The facts of the program with content IDs, by fact ID."""
+    out = io.StringIO()
+    TranslatorAPIProlog.writeProgram(domain, out, contentIds=True)
+    return TranslatorAPIProlog.readFacts(out.getvalue().splitlines())
+
+
+def applyDelta(previous, domain, changed=None):
+    """Consults the delta of writeDelta after the previous program, like Prolog would."""
+    out = io.StringIO()
+    TranslatorAPIProlog.writeDelta(previous, domain, out, changed=changed)
+    facts = dict(previous)
+    for line in out.getvalue().splitlines():
+        action, factId, fact = DIRECTIVE.fullmatch(line).groups()
+        if action == "retract":
+            assert facts.pop(factId) == fact
+        else:
+            assert factId not in facts
+            facts[factId] = fact
+    return facts
+
+
+def test_empty_delta_without_changes(general):
+    previous = program(general)
+    out = io.StringIO()
+    assert TranslatorAPIProlog.writeDelta(previous, general, out) == (0, 0)
+    assert out.getvalue() == ""
+
+
+def test_scoped_delta_covers_the_subtree_of_an_added_or_removed_entity(general):
+    previous = program(general)
+    machine, robot = Entity("Machine", "general"), Entity("Robot", "general")
+    machine.addChild(robot)
+    robot.addChild(Entity("Android", "general"))
+    general.entityTree.addChild(machine)
+    assert applyDelta(previous, general, changed=["Machine"]) == program(general)
+
+    previous = program(general)
+    general.removeEntity("Machine")
+    assert applyDelta(previous, general, changed=["Machine"]) == program(general)
+
+
+def test_random_edits(general):
+    rng = random.Random(5)
+    for step in range(30):
+        previous = program(general)
+        entities, relationships = list(general.getAllEntities()), list(general.getTopRelationships())
+        changed = set()
+        operation = step % 4
+        if operation == 0:
+            entity = rng.choice(entities)
+            changed |= {entity.getName()} | {rel.getName() for rel in relationships}
+            general.removeEntity(entity.getName())
+        elif operation == 1:
+            child = Entity(f"New{step}", "general")
+            child.addChild(Entity(f"Sub{step}", "general"))
+            rng.choice(entities).addChild(child)
+            changed.add(child.getName())
+        elif operation == 2:
+            entity = rng.choice(entities)
+            attribute = Attribute()
+            attribute.setDataType("string")
+            entity.addAttribute(attribute)
+            changed.add(entity.getName())
+        else:
+            relationship = rng.choice(relationships)
+            relationship.addReference(Reference(rng.choice(entities).getName(), rng.choice(entities).getName()))
+            changed.add(relationship.getName())
+        current = program(general)
+        assert applyDelta(previous, general) == current
+        assert applyDelta(previous, general, changed=changed) == current
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy") # Only the batch queries need it (see requirements.txt)
+
+from domain.Reference import Reference
+
+
+def randomPairs(domain, rng, count):
+    entities = [entity.getName() for entity in domain.getAllEntities()] + ["nope", "Entity"]
+    relationships = list(domain.getAllRelationshipsToString()) + ["norel"]
+    return [(rng.choice(entities).upper() if rng.random() < 0.2 else rng.choice(entities), rng.choice(relationships))
+            for _ in range(count)]
+
+
+def assertBatchMatchesScalar(domain, pairs):
+    assert domain.getObjsFromSubjRelBatch(pairs) == [domain.getObjsFromSubjRel(s, r) for s, r in pairs]
+    assert domain.getSubjsFromObjRelBatch(pairs) == [domain.getSubjsFromObjRel(o, r) for o, r in pairs]
+
+
+def test_batch_queries_match_scalar_queries(general):
+    assertBatchMatchesScalar(general, randomPairs(general, random.Random(3), 500))
+
+
+def test_batch_queries_see_later_edits(general):
+    rng = random.Random(5)
+    assertBatchMatchesScalar(general, randomPairs(general, rng, 100))
+    entities = general.getAllEntities()
+    for entity in rng.sample(entities, 3):
+        general.removeEntity(entity.getName())
+    relationships, entities = general.getAllRelationships(), general.getAllEntities()
+    for _ in range(20):
+        rng.choice(relationships).addReference(Reference(rng.choice(entities).getName(), rng.choice(entities).getName()))
+    assertBatchMatchesScalar(general, randomPairs(general, rng, 300))
@@ -0,0 +1,43 @@
+import pytest
+
+from domain.ReferenceIndex import ReferenceIndex
+
+
+def test_values_are_read_sorted_and_deduplicated():
+    index = ReferenceIndex()
+    for value in ("b", "a", "b"):
+        index.add(("person", "knows"), value)
+    assert index[("person", "knows")] == ("a", "b")
+    index.discard(("person", "knows"), "a")
+    index.discard(("person", "knows"), "b")
+    assert ("person", "knows") not in index
+    assert len(index) == 0
+
+
+def test_fork_copies_on_write_and_hides_removed_keys():
+    base = ReferenceIndex.fromMapping({"knows": ["Person"], "likes": ["Person", "Robot"]})
+    forked = base.fork()
+    forked.add("knows", "Robot")
+    assert forked.pop("likes") == ("Person", "Robot")
+    assert dict(forked.items()) == {"knows": ("Person", "Robot")}
+    assert dict(base.items()) == {"knows": ("Person",), "likes": ("Person", "Robot")}
+
+
+def test_views_are_immutable():
+    index = ReferenceIndex.fromMapping({"knows": ["Robot", "Person"]})
+    view = index["knows"]
+    with pytest.raises(AttributeError):
+        view.append("Student")
+    index.add("knows", "Student")
+    assert index["knows"] == ("Person", "Robot", "Student") and view == ("Person", "Robot")
+
+
+def test_domain_indexes_match_the_references(general):
+    for rel in general.getAllRelationships():
+        subjects = {ref.getSubject() for ref in rel.getReferences()}
+        objects = {ref.getObject() for ref in rel.getReferences()}
+        assert set(general.getRelSubjs().get(rel.getName(), [])) == subjects
+        assert set(general.getRelObjs().get(rel.getName(), [])) == objects
+    removed = general.getAllRelationships()[0].getName()
+    general.removeRelationship(removed)
+    assert removed not in general.getRelSubjs()
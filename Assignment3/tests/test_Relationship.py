@@ -0,0 +1,29 @@
+from domain.Reference import Reference
+from domain.Relationship import Relationship
+
+
+def test_addReference_replaces_the_same_pair_in_any_case():
+    relationship = Relationship("wrote", "general", "writtenBy")
+    first, other = Reference("Person", "Book"), Reference("Person", "Article")
+    relationship.addReferences([first, other])
+    assert relationship.getReference("person", "BOOK") is first
+
+    replacement = Reference("PERSON", "book")
+    relationship.addReference(replacement)
+    assert len(relationship.getReferences()) == 2
+    assert not any(r is first for r in relationship.getReferences())
+    assert relationship.getReference("Person", "Book") is replacement
+    assert relationship.getReference("person", "article") is other
+
+    relationship.removeRef(replacement)
+    assert relationship.getReference("Person", "Book") is None
+    assert relationship.getReferences() == [other]
+
+
+def test_setReferences_keeps_the_first_of_a_pair():
+    relationship = Relationship("wrote", "general", "writtenBy")
+    first, second = Reference("Person", "Book"), Reference("person", "book")
+    relationship.setReferences([first, second])
+    assert relationship.getReference("Person", "Book") is first
+    relationship.removeRef(first)
+    assert relationship.getReference("Person", "Book") is second
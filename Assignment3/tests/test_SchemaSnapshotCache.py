@@ -0,0 +1,54 @@
+import shutil
+
+import pytest
+
+from domain.DomainData import DomainData
+from domain.SchemaSnapshotCache import SchemaSnapshotCache
+
+
+def summary(domain):
+    """What a load produces: the entity tree, the references and the posting lists."""
+    entities = [(e.getName(), e.getParent().getName(), [a._name for a in e.getAttributes()]) for e in domain.getAllEntities()]
+    references = sorted((rel.getName(), ref.getSubject(), ref.getObject())
+                        for rel in domain.getAllRelationships() for ref in rel.getReferences())
+    return entities, references, sorted(domain.getRelationshipsWithSubj("Person")), sorted(a.getName() for a in domain.getAxioms())
+
+
+@pytest.fixture
+def gbs(tmp_path, generalPath):
+    """A copy of general.gbs that the test can edit."""
+    path = tmp_path / "general.gbs"
+    shutil.copy(generalPath, path)
+    return path
+
+
+def test_second_load_comes_from_the_snapshot(gbs, tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    parsed = DomainData(str(gbs), cacheFolder=cache)
+    assert len(list(cache.glob("*.pickle"))) == 1
+
+    def fail(*args):
+        raise AssertionError("parsed again")
+
+    monkeypatch.setattr(DomainData, "loadImportClosure", fail)
+    restored = DomainData(str(gbs), cacheFolder=cache)
+    assert summary(restored) == summary(parsed)
+
+
+def test_edited_file_misses_the_snapshot(gbs, tmp_path):
+    cache = tmp_path / "cache"
+    DomainData(str(gbs), cacheFolder=cache)
+    gbs.write_text(gbs.read_text(encoding="utf-8").replace('name="Person"', 'name="Human"', 1), encoding="utf-8")
+    edited = DomainData(str(gbs), cacheFolder=cache)
+    assert edited.getEntity("Human") is not None
+    assert len(list(cache.glob("*.pickle"))) == 2
+
+
+def test_unreadable_snapshot_is_a_miss(gbs, tmp_path):
+    cache = SchemaSnapshotCache(tmp_path / "cache")
+    assert cache.load(str(gbs), None) is None
+    cache.store(str(gbs), None, [], {"domain": "general"})
+    assert cache.load(str(gbs), None) == {"domain": "general"}
+    for snapshot in (tmp_path / "cache").glob("*.pickle"):
+        snapshot.write_bytes(b"truncated")
+    assert cache.load(str(gbs), None) is None
@@ -0,0 +1,27 @@
+import random
+
+from domain.Reference import Reference
+
+
+def scanRelFromSubjObj(domain, subject, object_ref):
+    """What Java does: visit every reference and keep the top relationship of the matching ones."""
+    subjEntity = domain.findInTree(domain.entityTree, subject)
+    objEntity = domain.findInTree(domain.entityTree, object_ref)
+    return {rel.getTop() for rel in domain.getAllRelationships() for ref in rel.getReferences()
+            if domain.isSameOrDescendant(ref.getSubject(), subject, subjEntity)
+            and domain.isSameOrDescendant(ref.getObject(), object_ref, objEntity)}
+
+
+def test_view_matches_a_scan_of_the_references(general):
+    rng = random.Random(2)
+    for step in range(3):
+        names = [e.getName() for e in general.getAllEntities()] + ["zzz"]
+        for _ in range(200):
+            subject, object_ref = rng.choice(names), rng.choice(names)
+            if rng.random() < 0.2:
+                subject = subject.lower()
+            assert general.getRelFromSubjObj(subject, object_ref) == scanRelFromSubjObj(general, subject, object_ref)
+        entities = general.getAllEntities()
+        general.removeEntity(rng.choice(entities).getName())
+        rng.choice(general.getAllRelationships()).addReference(
+            Reference(rng.choice(entities).getName(), rng.choice(entities).getName()))
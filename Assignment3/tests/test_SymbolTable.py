@@ -0,0 +1,31 @@
+from domain.SymbolTable import SymbolTable
+
+
+def test_spellings_share_one_id():
+    table = SymbolTable()
+    person = table.intern("Person")
+    assert table.intern("PERSON") == person
+    assert table.lookup("person") == person
+    assert table.lookup("Place") is None
+    assert table.foldedName(person) == "person"
+    assert table.sameName("Person", "pErSoN")
+    assert not table.sameName("Person", "Place")
+    assert table.canonical("Person" + "") is table.canonical("Person")
+
+
+def test_forked_table_keeps_the_ids_of_its_base():
+    base = SymbolTable()
+    person = base.intern("Person")
+    forked = base.fork()
+    place = forked.intern("Place")
+    assert forked.lookup("person") == person
+    assert place == len(base)
+    assert base.lookup("Place") is None
+    assert forked.extends(base) and not base.extends(forked)
+
+
+def test_domain_trees_share_the_table_of_the_domain(general):
+    assert general.entityTree.symbolTable() is general.symbols
+    assert general.relationshipTree.symbolTable() is general.symbols
+    for entity in general.getAllEntities():
+        assert general.findInTree(general.entityTree, entity.getName().upper()) is not None
@@ -0,0 +1,105 @@
+import io
+import os
+
+from domain.DomainData import DomainData
+from domain.TranslatorAPIProlog import TranslatorAPIProlog
+
+
+def written(domain, **options):
+    """The program of writeProgram, with the number of facts it returned."""
+    out = io.StringIO()
+    n = TranslatorAPIProlog.writeProgram(domain, out, **options)
+    return out.getvalue(), n
+
+
+def test_parallel_program_is_the_serial_one(importTree):
+    top = DomainData(os.path.join(importTree, "top.gbs"))
+    serial, n = written(top, workers=1)
+    assert n > 0
+    assert written(top, workers=2) == (serial, n)
+
+
+def test_constructor_prints_the_written_program(general, capsys):
+    program, n = written(general)
+    out = io.StringIO()
+    translator = TranslatorAPIProlog(general, out=out)
+    assert capsys.readouterr().out == program + "\n"
+    assert out.getvalue() == program
+    assert translator.nFacts == n
+
+
+def test_constructor_without_printContent_prints_nothing(general, capsys):
+    out = io.StringIO()
+    TranslatorAPIProlog(general, printContent=False, out=out)
+    assert capsys.readouterr().out == ""
+    assert out.getvalue() == written(general)[0]
+
+
+def indexedGroups(text):
+    """The header and the facts of each group of writeIndexedProgram, by predicate."""
+    header, *sections = text.split("\n% ")
+    groups = {}
+    for section in sections:
+        title, *facts = section.splitlines()
+        groups[title.split("(")[0]] = (title, facts)
+    return header.splitlines(), groups
+
+
+def test_indexed_program_layout(importTree):
+    top = DomainData(os.path.join(importTree, "top.gbs"))
+    out = io.StringIO()
+    n = TranslatorAPIProlog.writeIndexedProgram(top, out)
+    header, groups = indexedGroups(out.getvalue())
+
+    predicates = TranslatorAPIProlog.INDEXED_PREDICATES
+    assert header[0] == "% Domain top: indexed export profile"
+    assert header[1:] == [f":- {directive} {name}/{len(args)}." for name, args in predicates
+                          for directive in ("dynamic", "discontiguous")]
+    assert list(groups) == [name for name, _ in predicates]
+    for name, args in predicates:
+        title, facts = groups[name]
+        assert title == f"{name}({', '.join(args)})"
+        assert len(set(facts)) == len(facts)
+        assert all(fact.startswith(f"{name}(") and fact.count(",") >= len(args) - 1 for fact in facts)
+    assert sum(len(facts) for _, facts in groups.values()) == n
+
+    out = io.StringIO()
+    TranslatorAPIProlog.writeIndexedProgram(top, out, closure=False)
+    _, groups = indexedGroups(out.getvalue())
+    assert list(groups) == [name for name, _ in predicates if name not in TranslatorAPIProlog.CLOSURE_PREDICATES]
+
+
+def test_indexed_closure_matches_the_tree(importTree):
+    top = DomainData(os.path.join(importTree, "top.gbs"))
+    out = io.StringIO()
+    TranslatorAPIProlog.writeIndexedProgram(top, out)
+    facts = set(out.getvalue().splitlines())
+
+    def lower(name, unknown):
+        return name.lower() if name else unknown
+
+    for name in ("Student", "Robot", "Company", "Agent"):
+        entity = next(e for e in top.getAllEntities() if e.getName() == name)
+        chain = [] # The entity and its ancestors up to its top-level entity
+        node = entity
+        while node is not top.entityTree:
+            chain.append(node)
+            node = node.getParent()
+        row = name.lower()
+        for ancestor in chain[1:]:
+            assert f"ancestor({row}, {ancestor.getName().lower()}, top)." in facts
+        assert sum(fact.startswith(f"ancestor({row},") for fact in facts) == len(chain) - 1
+
+        inherited = set()
+        for attribute in entity.getAllAttributes()[len(top.entityTree.getAttributes()):]:
+            owner = next(e for e in chain if any(a is attribute for a in e.getAttributes()))
+            inherited.add(f"inherited_attribute({row}, {lower(attribute.getName(), 'unknown_attr')}, "
+                          f"{owner.getName().lower()}, top).")
+        assert {fact for fact in facts if fact.startswith(f"inherited_attribute({row},")} == inherited
+
+    mentors = next(r for r in top.getAllRelationships() if r.getName() == "mentors")
+    assert "top_relationship(mentors, knows, top)." in facts
+    assert "top_relationship(knows, knows, top)." in facts
+    assert mentors.getParent().getName() == "knows"
+    for relationship in top.getTopRelationships():
+        assert sum(fact.startswith(f"top_relationship({relationship.getName().lower()},") for fact in facts) == 1
@@ -0,0 +1,57 @@
+import random
+
+from domain.Reference import Reference
+
+
+def scanReferences(domain, relationship, inheritRelationship):
+    relationships = domain.getAllRelationships()
+    if relationship is not None:
+        rel = domain.getRelationship(relationship)
+        relationships = [] if rel is None else (list(rel.iterSubtree()) if inheritRelationship else [rel])
+    for rel in relationships:
+        for ref in rel.getReferences():
+            yield ref.getSubject(), rel.getName(), ref.getObject()
+
+
+def matches(domain, name, pattern, inherit):
+    if pattern is None:
+        return True
+    if inherit:
+        return domain.isSameOrDescendant(name, pattern, domain.findInTree(domain.entityTree, pattern))
+    return bool(name) and name.casefold() == pattern.casefold()
+
+
+def scanMatch(domain, subject, relationship, object_ref, inheritSubject, inheritObject, inheritRelationship):
+    """What the Java loops do: visit every reference and check each bound position."""
+    return sorted((triple for triple in scanReferences(domain, relationship, inheritRelationship)
+                   if matches(domain, triple[0], subject, inheritSubject) and matches(domain, triple[2], object_ref, inheritObject)),
+                  key=repr)
+
+
+def test_match_equals_a_scan(general):
+    rng = random.Random(11)
+    for step in range(4):
+        names = [e.getName() for e in general.getAllEntities()] + ["zzz", None]
+        relationships = [r.getName() for r in general.getAllRelationships()] + ["nope", None]
+        for _ in range(150):
+            subject, object_ref, relationship = rng.choice(names), rng.choice(names), rng.choice(relationships)
+            if subject and rng.random() < 0.2:
+                subject = subject.upper()
+            flags = [rng.random() < 0.6 for _ in range(3)]
+            assert sorted(general.match(subject, relationship, object_ref, *flags), key=repr) == \
+                scanMatch(general, subject, relationship, object_ref, *flags)
+        entities = general.getAllEntities()
+        general.removeEntity(rng.choice(entities).getName())
+        rng.choice(general.getAllRelationships()).addReference(
+            Reference(rng.choice(entities).getName(), rng.choice(entities).getName()))
+
+
+def test_explain_reads_the_most_selective_index(general):
+    person = next(e.getName() for e in general.getAllEntities() if general.getRelationshipsWithSubj(e.getName()))
+    relationship = sorted(general.getRelationshipsWithSubj(person))[0]
+    plan = general.getTripleIndex().plan(person, relationship, None)
+    assert plan.access in ("subject", "relationship")
+    assert plan.estimate == min(plan.candidates.values())
+    assert general.explain(person, relationship).splitlines()[0] == f"match(subject={person!r}, relationship={relationship!r})"
+    assert "full scan" in general.explain()
+
@@ -0,0 +1,33 @@
+import pytest
+
+from domain.DomainData import DomainData
+from domain.ValidationRule import ValidationRule
+
+INVALID_GBS = """<?xml version="1.0"?>
+<domain name="invalid">
+  <entities>
+    <entity name="Agent"><entity name="Person" color="red"/></entity>
+  </entities>
+</domain>
+"""
+
+
+def test_rule_behaves_like_the_list_it_replaces():
+    rule = ValidationRule("relationship", "attribute", "reference")
+    assert "attribute" in rule and "entity" not in rule and None not in rule
+    assert list(rule) == ["relationship", "attribute", "reference"] and len(rule) == 3
+    assert repr(rule) == repr(["relationship", "attribute", "reference"])
+    assert rule.allows(["reference", "relationship"]) and rule.allows([])
+    assert not rule.allows(["reference", "value"])
+    assert ValidationRule().allows([]) and not ValidationRule().allows(["name"])
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_invalid_attribute_message_keeps_the_rule_order(tmp_path, streaming):
+    path = tmp_path / "invalid.gbs"
+    path.write_text(INVALID_GBS, encoding="utf-8")
+    with pytest.raises(ValueError) as error:
+        DomainData(str(path), streaming=streaming)
+    message = str(error.value)
+    assert message.startswith('Invalid attribute "color" found in <entity name=\'Person\'> where one of [')
+    assert message.endswith(f"{list(DomainData.ATTRS_ENTITY)} was expected")